@@ -0,0 +1,26 @@
+"""add partial index on unread notifications
+
+Revision ID: a4b5c6d7e8f9
+Revises: e3f4a5b6c7d8
+Create Date: 2026-01-08 00:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "a4b5c6d7e8f9"
+down_revision = "e3f4a5b6c7d8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_notifications_user_id_unread "
+        "ON notifications (user_id) WHERE read IS FALSE"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_notifications_user_id_unread")
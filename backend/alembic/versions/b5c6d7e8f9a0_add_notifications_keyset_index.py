@@ -0,0 +1,32 @@
+"""add notifications keyset pagination and retention indexes
+
+Revision ID: b5c6d7e8f9a0
+Revises: a4b5c6d7e8f9
+Create Date: 2026-01-09 00:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b5c6d7e8f9a0"
+down_revision = "a4b5c6d7e8f9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_notifications_user_id_created_at_id "
+        "ON notifications (user_id, created_at, id)"
+    )
+    # The retention job deletes read rows past a cutoff; only read rows are indexed.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_notifications_created_at_read "
+        "ON notifications (created_at) WHERE read"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_notifications_created_at_read")
+    op.execute("DROP INDEX IF EXISTS ix_notifications_user_id_created_at_id")
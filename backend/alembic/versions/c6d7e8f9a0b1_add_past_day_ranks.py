@@ -0,0 +1,34 @@
+"""add past day ranks
+
+Revision ID: c6d7e8f9a0b1
+Revises: b5c6d7e8f9a0
+Create Date: 2026-01-12 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c6d7e8f9a0b1"
+down_revision = "b5c6d7e8f9a0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "past_day_ranks" in inspector.get_table_names():
+        return
+    op.create_table(
+        "past_day_ranks",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("feed", sa.String(length=20), primary_key=True),
+        sa.Column("rank", sa.Integer(), primary_key=True),
+        sa.Column("post_id", sa.Integer(), sa.ForeignKey("posts.id"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("past_day_ranks")
@@ -1,20 +1,35 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 import hashlib
+import time
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 import os
 from schemas import TokenData
 import cache
+from auth.revocation import (
+    CLAIMS_CACHE_SIZE,
+    REVOCATION_CHANNEL,
+    REVOCATION_KEY_PREFIX,
+    DecodedClaimsCache,
+    RevocationFilter,
+)
+
+# passlib/bcrypt and python-jose are imported on first use so API and worker
+# cold starts do not pay for them.
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; existing hashes keep verifying when the cost factor changes.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+@lru_cache(maxsize=None)
+def _pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 # JWT settings
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -29,6 +44,8 @@ COOKIE_SECURE = (
 )
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -38,11 +55,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+revocation_filter = RevocationFilter(default_ttl_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+claims_cache = DecodedClaimsCache(CLAIMS_CACHE_SIZE)
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
 def _revocation_key(token: str) -> str:
-    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
-    return f"revoked:{token_hash}"
+    return f"{REVOCATION_KEY_PREFIX}{_token_hash(token)}"
 
 def revoke_token(token: str) -> None:
+    from jose import JWTError, jwt
+
     try:
         claims = jwt.get_unverified_claims(token)
     except JWTError:
@@ -55,20 +79,39 @@ def revoke_token(token: str) -> None:
         now = datetime.utcnow().timestamp()
         ttl_seconds = max(int(exp - now), 1)
 
+    token_hash = _token_hash(token)
+    expires_at = time.time() + ttl_seconds
     cache.redis_setex(_revocation_key(token), ttl_seconds, "1")
+    # Update this process immediately; other processes learn about it over pub/sub.
+    revocation_filter.add(token_hash, expires_at)
+    claims_cache.discard(token)
+    cache.redis_publish(REVOCATION_CHANNEL, f"{token_hash} {expires_at}")
 
 def is_token_revoked(token: str) -> bool:
-    return cache.redis_get(_revocation_key(token)) is not None
+    token_hash = _token_hash(token)
+    if not revocation_filter.might_be_revoked(token_hash):
+        return False
+    return cache.redis_get(f"{REVOCATION_KEY_PREFIX}{token_hash}") is not None
+
+def _decode_claims(token: str, credentials_exception) -> dict:
+    claims = claims_cache.get(token)
+    if claims is not None:
+        return claims
+
+    from jose import JWTError, jwt
 
-def verify_token(token: str, credentials_exception):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        if is_token_revoked(token):
-            raise credentials_exception
-        token_data = TokenData(username=username)
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         raise credentials_exception
-    return token_data
+    claims_cache.put(token, claims)
+    return claims
+
+def verify_token(token: str, credentials_exception):
+    payload = _decode_claims(token, credentials_exception)
+    username: str = payload.get("sub")
+    if username is None:
+        raise credentials_exception
+    if is_token_revoked(token):
+        raise credentials_exception
+    return TokenData(username=username)
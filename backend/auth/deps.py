@@ -26,6 +26,18 @@ def _enforce_csrf(request: Request) -> None:
         )
 
 
+def _resolve_user(request: Request, db: Session, token_value: str, credentials_exception: HTTPException):
+    # Authenticated routes depend on both get_current_user and the rate limiter's
+    # get_current_user_optional; look the user up once per request.
+    cached = getattr(request.state, "auth_user", None)
+    if cached is not None and cached[0] == token_value:
+        return cached[1]
+    token_data = verify_token(token_value, credentials_exception)
+    user = UserService.get_user_by_username(db, username=token_data.username)
+    request.state.auth_user = (token_value, user)
+    return user
+
+
 def get_current_user_optional(
     request: Request,
     token: str | None = Depends(oauth2_scheme_optional),
@@ -40,9 +52,7 @@ def get_current_user_optional(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    token_data = verify_token(token_value, credentials_exception)
-    user = UserService.get_user_by_username(db, username=token_data.username)
-    return user
+    return _resolve_user(request, db, token_value, credentials_exception)
 
 
 def get_current_user(
@@ -61,8 +71,7 @@ def get_current_user(
         raise credentials_exception
     if source == "cookie" and request.method in {"POST", "PUT", "PATCH", "DELETE"}:
         _enforce_csrf(request)
-    token_data = verify_token(token_value, credentials_exception)
-    user = UserService.get_user_by_username(db, username=token_data.username)
+    user = _resolve_user(request, db, token_value, credentials_exception)
     if user is None:
         raise credentials_exception
     return user
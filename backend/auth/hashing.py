@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from auth import get_password_hash, verify_password
+from metrics import registry
+
+
+LOGGER = logging.getLogger("password_hashing")
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+PASSWORD_HASH_SLOW_QUEUE_MS = float(os.getenv("PASSWORD_HASH_SLOW_QUEUE_MS", "1000"))
+
+
+class PasswordHashPool:
+    """Bounded executor for bcrypt so login storms cannot starve the request threadpool.
+
+    bcrypt releases the GIL, so a small dedicated thread pool caps CPU spent on
+    hashing while every other endpoint keeps the shared threadpool to itself.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self._workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.stats = {
+            "completed": 0,
+            "rejected": 0,
+            "in_flight": 0,
+            "queue_wait_ms_total": 0.0,
+            "queue_wait_ms_max": 0.0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._workers,
+                        thread_name_prefix="password-hash",
+                    )
+        return self._executor
+
+    def _record_queue_wait(self, waited_ms: float) -> None:
+        with self._lock:
+            self.stats["completed"] += 1
+            self.stats["queue_wait_ms_total"] += waited_ms
+            self.stats["queue_wait_ms_max"] = max(self.stats["queue_wait_ms_max"], waited_ms)
+        if waited_ms >= PASSWORD_HASH_SLOW_QUEUE_MS:
+            LOGGER.warning("Password hashing queued for %.0fms", waited_ms)
+
+    async def run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests",
+                headers={"Retry-After": "1"},
+            )
+
+        enqueued_at = time.perf_counter()
+
+        def job():
+            self._record_queue_wait((time.perf_counter() - enqueued_at) * 1000)
+            return func(*args)
+
+        with self._lock:
+            self.stats["in_flight"] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), job)
+        finally:
+            with self._lock:
+                self.stats["in_flight"] -= 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+
+def _collect_pool_metrics():
+    stats = dict(password_hash_pool.stats)
+    return [
+        ("hn_password_hash_completed_total", "counter", "Password hash/verify jobs run.",
+         [({}, stats["completed"])]),
+        ("hn_password_hash_rejected_total", "counter", "Password jobs rejected with 503 because the pool was full.",
+         [({}, stats["rejected"])]),
+        ("hn_password_hash_in_flight", "gauge", "Password jobs queued or running.",
+         [({}, stats["in_flight"])]),
+        ("hn_password_hash_queue_wait_seconds_total", "counter", "Time password jobs spent waiting for a worker.",
+         [({}, stats["queue_wait_ms_total"] / 1000)]),
+    ]
+
+
+registry.add_collector(_collect_pool_metrics)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hash_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
@@ -0,0 +1,133 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cache
+
+
+LOGGER = logging.getLogger("token_revocation")
+
+REVOCATION_CHANNEL = os.getenv("REVOCATION_CHANNEL", "hn:revocations")
+REVOCATION_KEY_PREFIX = "revoked:"
+CLAIMS_CACHE_SIZE = int(os.getenv("CLAIMS_CACHE_SIZE", "10000"))
+
+
+class RevocationFilter:
+    """Process-local set of revoked token hashes kept in sync over Redis pub/sub.
+
+    While the subscription is live, a miss here means the token was never revoked
+    and the per-request Redis GET is skipped. Until the filter is bootstrapped (or
+    after the subscription drops) every lookup falls back to Redis.
+    """
+
+    def __init__(self, default_ttl_seconds: int) -> None:
+        self._default_ttl_seconds = default_ttl_seconds
+        self._revoked: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def add(self, token_hash: str, expires_at: float | None = None) -> None:
+        with self._lock:
+            self._revoked[token_hash] = expires_at or time.time() + self._default_ttl_seconds
+
+    def might_be_revoked(self, token_hash: str) -> bool:
+        self.start()
+        if not self.ready:
+            return True
+        with self._lock:
+            return token_hash in self._revoked
+
+    def prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            self._revoked = {key: expiry for key, expiry in self._revoked.items() if expiry > now}
+
+    def start(self) -> None:
+        if self._thread is not None or not cache.REDIS_ENABLED or cache.redis_client is None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="revocation-filter", daemon=True)
+                self._thread.start()
+
+    def handle_message(self, data: str) -> None:
+        token_hash, _, expires_at = data.partition(" ")
+        try:
+            self.add(token_hash, float(expires_at) if expires_at else None)
+        except ValueError:
+            self.add(token_hash)
+
+    def _bootstrap(self) -> None:
+        for key in cache.redis_client.scan_iter(match=f"{REVOCATION_KEY_PREFIX}*", count=1000):
+            self.add(key[len(REVOCATION_KEY_PREFIX):])
+
+    def _run(self) -> None:
+        while True:
+            pubsub = cache.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                # Subscribe before scanning so no revocation slips between the two.
+                pubsub.subscribe(REVOCATION_CHANNEL)
+                self._bootstrap()
+                self._ready.set()
+                last_prune = time.monotonic()
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self.handle_message(message["data"])
+                    if time.monotonic() - last_prune >= 60:
+                        self.prune()
+                        last_prune = time.monotonic()
+            except Exception:
+                self._ready.clear()
+                LOGGER.warning("Revocation subscription failed; falling back to Redis lookups", exc_info=True)
+                time.sleep(1)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+class DecodedClaimsCache:
+    """Small LRU of verified JWT claims so hot tokens skip jwt.decode."""
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> dict | None:
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is None:
+                return None
+            exp = claims.get("exp")
+            if exp is not None and exp <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        if self._max_size <= 0:
+            return
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
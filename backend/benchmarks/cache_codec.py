@@ -0,0 +1,147 @@
+"""Size and decode cost of cached comment threads per layout and codec.
+
+Builds synthetic threads in memory (no database) and, for each thread size,
+reports the stored bytes, bytes per comment and p50 encode/decode time of the
+``post:{id}:comments:v{n}`` value for the nested and the compact row layout,
+each plain and zlib-compressed. With ``--redis-url`` it also stores every
+value and reports Redis ``MEMORY USAGE`` for the key. Run from ``backend/``::
+
+    python benchmarks/cache_codec.py --sizes 50,500,5000
+    python benchmarks/cache_codec.py --output codec.json --compare baseline.json
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.stats import compare_reports, load_report, percentile, write_report  # noqa: E402
+
+WORDS = (
+    "the a to of and in is that it for on with as this was but be are not have you they at or from "
+    "rust python latency cache thread index query kernel compiler memory startup pricing database "
+    "scaling benchmark regression release feature bug patch review design interface hardware"
+).split()
+
+
+def synthetic_thread_rows(size: int, seed: int) -> list:
+    """(Comment, username) rows shaped like a busy thread: short chains under a few roots."""
+    from models import Comment
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for comment_id in range(1, size + 1):
+        parent_id = None if comment_id == 1 or rng.random() < 0.15 else rng.randint(max(1, comment_id - 50), comment_id - 1)
+        created_at = now - timedelta(seconds=size - comment_id)
+        comment = Comment(
+            id=comment_id,
+            text=" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 60))),
+            user_id=rng.randint(1, 5000),
+            post_id=1,
+            parent_id=parent_id,
+            root_id=comment_id if parent_id is None else 1,
+            is_deleted=rng.random() < 0.02,
+            points=rng.randint(1, 40),
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        rows.append((comment, f"user{comment.user_id}"))
+    return rows
+
+
+def _timed(fn, runs: int) -> tuple[object, float]:
+    samples = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, percentile(sorted(samples), 50)
+
+
+def measure(size: int, runs: int, seed: int, redis_client=None) -> dict[str, dict]:
+    import cache_codec
+    import database  # noqa: F401  (models have to load through database first)
+    from services.comment_service import CommentService
+
+    thread = CommentService._build_thread(synthetic_thread_rows(size, seed))
+    default = CommentService._serialize_datetime
+    layouts = {
+        "nested": (lambda: thread, lambda value: value),
+        "compact": (lambda: CommentService._pack_thread(thread), lambda value: CommentService._unpack_thread(value, 1)),
+    }
+    results = {}
+    for layout, (pack, unpack) in layouts.items():
+        for codec in cache_codec.CODECS.values():
+            encoded, encode_ms = _timed(lambda: codec.encode(pack(), default=default), runs)
+            _, decode_ms = _timed(lambda: unpack(cache_codec.decode(encoded)), runs)
+            result = {
+                "comments": size,
+                "bytes": len(encoded),
+                "bytes_per_comment": round(len(encoded) / size, 1),
+                "encode_ms": round(encode_ms, 3),
+                "decode_ms": round(decode_ms, 3),
+            }
+            if redis_client is not None:
+                key = f"bench:codec:{layout}:{codec.name}:{size}"
+                redis_client.set(key, encoded)
+                result["redis_memory_bytes"] = redis_client.memory_usage(key)
+                redis_client.delete(key)
+            results[f"{layout}_{codec.name}_{size}"] = result
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="50,500,5000", help="comma separated comments per thread")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--redis-url", help="also report MEMORY USAGE from this Redis")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to diff this run against")
+    args = parser.parse_args(argv)
+
+    # Importing the services builds the engine and auth settings; nothing is queried.
+    os.environ.setdefault("POSTGRES_URL", "sqlite:///:memory:")
+    os.environ.setdefault("SECRET_KEY", "cache-codec-benchmark")
+    os.environ.setdefault("REDIS_ENABLED", "0")
+
+    redis_client = None
+    if args.redis_url:
+        import redis
+
+        redis_client = redis.Redis.from_url(args.redis_url, decode_responses=True)
+
+    import cache_codec
+
+    results = {}
+    for size in (int(value) for value in args.sizes.split(",") if value.strip()):
+        results.update(measure(size, args.runs, args.seed, redis_client))
+    for name, result in results.items():
+        memory = f" redis {result['redis_memory_bytes']:>9}B" if "redis_memory_bytes" in result else ""
+        print(
+            f"{name:<22} {result['bytes']:>10}B {result['bytes_per_comment']:>7.1f}B/comment "
+            f"encode {result['encode_ms']:>8.3f}ms decode {result['decode_ms']:>8.3f}ms{memory}"
+        )
+
+    report = {
+        "meta": {"runs": args.runs, "compress_min_bytes": cache_codec.CACHE_COMPRESS_MIN_BYTES},
+        "scenarios": results,
+    }
+    if args.output:
+        write_report(report, args.output)
+    if args.compare:
+        metrics = ("bytes", "encode_ms", "decode_ms")
+        print("\n".join(compare_reports(load_report(args.compare), report, metrics)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Seed a benchmark database with power-law users, posts, threads and votes.
+
+A handful of users write most posts, a handful of posts draw most comments and
+votes, and threads nest by replying to earlier comments in the same post. The
+generator is deterministic for a given seed so runs are comparable across commits.
+"""
+import random
+from itertools import accumulate
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from auth import get_password_hash
+from models import Comment, CommentVote, Post, User, Vote
+
+BENCHMARK_PASSWORD = "Benchmark1!"
+INSERT_CHUNK_SIZE = 5000
+POST_TYPES = ("story", "ask", "show", "job")
+POST_TYPE_WEIGHTS = (0.8, 0.1, 0.08, 0.02)
+
+
+class SeededDataset:
+    """Ids and sampling weights the load-test scenarios draw targets from."""
+
+    def __init__(self, usernames: list[str], post_ids: list[int], post_weights: list[float], counts: dict) -> None:
+        self.usernames = usernames
+        self.post_ids = post_ids
+        self.post_weights = post_weights
+        self.counts = counts
+        self._cum_weights = list(accumulate(post_weights))
+
+    def hot_post_ids(self, limit: int) -> list[int]:
+        ranked = sorted(zip(self.post_weights, self.post_ids), reverse=True)
+        return [post_id for _, post_id in ranked[:limit]]
+
+    def pick_post(self, rng: random.Random) -> int:
+        return rng.choices(self.post_ids, cum_weights=self._cum_weights)[0]
+
+
+def zipf_weights(count: int, exponent: float) -> list[float]:
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def _sample_pairs(
+    rng: random.Random,
+    user_ids: list[int],
+    user_weights: list[float],
+    target_ids: list[int],
+    target_weights: list[float],
+    count: int,
+) -> set[tuple[int, int]]:
+    """Draw up to ``count`` distinct (user, target) pairs; hot targets saturate early."""
+    user_cum = list(accumulate(user_weights))
+    target_cum = list(accumulate(target_weights))
+    pairs: set[tuple[int, int]] = set()
+    for _ in range(3):
+        missing = count - len(pairs)
+        if missing <= 0:
+            break
+        users = rng.choices(user_ids, cum_weights=user_cum, k=missing * 2)
+        targets = rng.choices(target_ids, cum_weights=target_cum, k=missing * 2)
+        for pair in zip(users, targets):
+            pairs.add(pair)
+            if len(pairs) >= count:
+                break
+    return pairs
+
+
+def _insert_chunked(db: Session, model, rows: list[dict]) -> None:
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.execute(insert(model), rows[start:start + INSERT_CHUNK_SIZE])
+
+
+def _sync_sequences(db: Session) -> None:
+    # Ids are assigned up front so threads can reference parents; move the
+    # Postgres sequences past them so API inserts do not collide.
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in ("users", "posts", "comments", "votes", "comment_votes"):
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def seed_dataset(
+    db: Session,
+    users: int = 1000,
+    posts: int = 2000,
+    comments: int = 20000,
+    votes: int = 50000,
+    comment_votes: int | None = None,
+    days: int = 30,
+    exponent: float = 1.1,
+    reply_ratio: float = 0.6,
+    seed: int = 1234,
+) -> SeededDataset:
+    """Insert a synthetic dataset into an empty schema and return its sampling weights."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    if comment_votes is None:
+        comment_votes = votes // 4
+
+    hashed_password = get_password_hash(BENCHMARK_PASSWORD)
+    usernames = [f"bench_user_{user_id}" for user_id in range(1, users + 1)]
+    user_ids = list(range(1, users + 1))
+    user_weights = zipf_weights(users, exponent)
+    _insert_chunked(db, User, [
+        {
+            "id": user_id,
+            "username": username,
+            "email": f"{username}@example.com",
+            "hashed_password": hashed_password,
+            "created_at": now - timedelta(days=days + 1),
+        }
+        for user_id, username in zip(user_ids, usernames)
+    ])
+
+    post_ids = list(range(1, posts + 1))
+    # Popularity is independent of id so hot posts are spread across days.
+    popularity_order = post_ids[:]
+    rng.shuffle(popularity_order)
+    post_weight_by_id = dict(zip(popularity_order, zipf_weights(posts, exponent)))
+    post_weights = [post_weight_by_id[post_id] for post_id in post_ids]
+
+    post_rows = []
+    post_created_at: dict[int, datetime] = {}
+    authors = rng.choices(user_ids, user_weights, k=posts)
+    for post_id, author_id in zip(post_ids, authors):
+        post_type = rng.choices(POST_TYPES, POST_TYPE_WEIGHTS)[0]
+        created_at = now - timedelta(seconds=rng.uniform(0, days * 86400))
+        post_created_at[post_id] = created_at
+        post_rows.append({
+            "id": post_id,
+            "title": f"Benchmark {post_type} {post_id}",
+            "url": f"https://example.com/{post_id}" if post_type == "story" else None,
+            "text": None if post_type == "story" else f"Body of benchmark post {post_id}",
+            "post_type": post_type,
+            "points": 0,
+            "user_id": author_id,
+            "created_at": created_at,
+        })
+
+    comment_rows = []
+    thread_members: dict[int, list[tuple[int, int]]] = {}
+    thread_clock: dict[int, datetime] = {}
+    comment_posts = rng.choices(post_ids, post_weights, k=comments)
+    comment_authors = rng.choices(user_ids, user_weights, k=comments)
+    for comment_id, (post_id, author_id) in enumerate(zip(comment_posts, comment_authors), start=1):
+        members = thread_members.setdefault(post_id, [])
+        parent_id = root_id = None
+        if members and rng.random() < reply_ratio:
+            parent_id, root_id = rng.choice(members)
+        root_id = root_id or comment_id
+        members.append((comment_id, root_id))
+        # Replies trail the thread's previous comment so parents always come first.
+        created_at = min(
+            thread_clock.get(post_id, post_created_at[post_id]) + timedelta(seconds=rng.expovariate(1 / 600)),
+            now,
+        )
+        thread_clock[post_id] = created_at
+        comment_rows.append({
+            "id": comment_id,
+            "text": f"Benchmark comment {comment_id}",
+            "points": 0,
+            "user_id": author_id,
+            "post_id": post_id,
+            "parent_id": parent_id,
+            "root_id": root_id,
+            "is_deleted": False,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+
+    post_points = dict.fromkeys(post_ids, 0)
+    vote_pairs = _sample_pairs(rng, user_ids, user_weights, post_ids, post_weights, votes)
+    for _, post_id in vote_pairs:
+        post_points[post_id] += 1
+    for row in post_rows:
+        row["points"] = post_points[row["id"]]
+
+    comment_vote_pairs: set[tuple[int, int]] = set()
+    if comment_rows:
+        comment_ids = [row["id"] for row in comment_rows]
+        comment_weights = [post_weight_by_id[row["post_id"]] for row in comment_rows]
+        comment_vote_pairs = _sample_pairs(
+            rng, user_ids, user_weights, comment_ids, comment_weights, comment_votes
+        )
+        comment_points: dict[int, int] = {}
+        for _, comment_id in comment_vote_pairs:
+            comment_points[comment_id] = comment_points.get(comment_id, 0) + 1
+        for row in comment_rows:
+            row["points"] = comment_points.get(row["id"], 0)
+
+    _insert_chunked(db, Post, post_rows)
+    _insert_chunked(db, Comment, comment_rows)
+    _insert_chunked(db, Vote, [{"user_id": u, "post_id": p} for u, p in sorted(vote_pairs)])
+    _insert_chunked(db, CommentVote, [{"user_id": u, "comment_id": c} for u, c in sorted(comment_vote_pairs)])
+    _sync_sequences(db)
+    db.commit()
+
+    counts = {
+        "users": users,
+        "posts": posts,
+        "comments": len(comment_rows),
+        "votes": len(vote_pairs),
+        "comment_votes": len(comment_vote_pairs),
+    }
+    return SeededDataset(usernames, post_ids, post_weights, counts)
@@ -0,0 +1,87 @@
+"""Measure API cold-start import cost with ``python -X importtime``.
+
+Run from ``backend/``::
+
+    python benchmarks/import_time.py --runs 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# Heavy modules that must stay off the API import path; they load on first use.
+LAZY_MODULES = ("passlib", "jose", "alembic")
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2500"))
+
+
+def measure_import(module: str = "main") -> dict[str, tuple[int, int]]:
+    """Import ``module`` in a fresh interpreter and return {name: (self_us, cumulative_us)}."""
+    env = os.environ.copy()
+    env.setdefault("SECRET_KEY", "import-time-benchmark")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_part, cumulative_us, name = line.split("|")
+        self_us = self_part.removeprefix("import time:")
+        timings.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    return timings
+
+
+def best_of(module: str = "main", runs: int = 3) -> tuple[float, dict[str, tuple[int, int]]]:
+    """Return the fastest total import time in ms across ``runs`` cold interpreters."""
+    best_ms = float("inf")
+    best_timings: dict[str, tuple[int, int]] = {}
+    for _ in range(runs):
+        timings = measure_import(module)
+        total_ms = timings[module][1] / 1000
+        if total_ms < best_ms:
+            best_ms, best_timings = total_ms, timings
+    return best_ms, best_timings
+
+
+def eagerly_imported(timings: dict[str, tuple[int, int]], prefixes=LAZY_MODULES) -> list[str]:
+    return sorted(
+        name for name in timings
+        if any(name == prefix or name.startswith(f"{prefix}.") for prefix in prefixes)
+    )
+
+
+def format_report(module: str, total_ms: float, timings: dict[str, tuple[int, int]], top: int = 15) -> str:
+    lines = [f"import {module}: {total_ms:.1f}ms (budget {IMPORT_TIME_BUDGET_MS:.0f}ms)"]
+    heaviest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    for name, (self_us, cumulative_us) in heaviest:
+        lines.append(f"  {self_us / 1000:8.1f}ms self {cumulative_us / 1000:8.1f}ms cumulative  {name}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default="main")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    total_ms, timings = best_of(args.module, args.runs)
+    print(format_report(args.module, total_ms, timings))
+    leaked = eagerly_imported(timings)
+    if leaked:
+        print(f"Eagerly imported lazy modules: {', '.join(leaked)}")
+    return 1 if leaked or total_ms > IMPORT_TIME_BUDGET_MS else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
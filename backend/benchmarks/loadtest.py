@@ -0,0 +1,275 @@
+"""Replay scripted load scenarios against the API in process.
+
+Seeds a throwaway database with ``benchmarks.dataset``, drives the ASGI app
+through httpx without a network hop and reports p50/p95/p99 latency and RPS per
+scenario. Run from ``backend/``::
+
+    python benchmarks/loadtest.py --redis fake --output before.json
+    python benchmarks/loadtest.py --redis fake --output after.json --compare before.json
+    python benchmarks/loadtest.py --diff before.json after.json
+
+``--redis fake`` needs the ``fakeredis`` package; ``--redis url`` uses
+``REDIS_URL`` and ``--redis off`` runs with caching disabled and synchronous
+writes. Non-SQLite databases are dropped and recreated, so they require ``--reset``.
+"""
+import argparse
+import asyncio
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.stats import compare_reports, format_summary, load_report, summarize, write_report  # noqa: E402
+
+SCENARIOS = ("front_page", "hot_thread", "vote_storm", "comment_burst")
+HOT_POST_COUNT = 20
+BURST_POST_COUNT = 5
+
+
+def configure_environment(database_url: str, redis_mode: str) -> None:
+    """Point the app at the benchmark database and Redis before any app module is imported."""
+    os.environ["POSTGRES_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "loadtest")
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    # Every scenario request comes from one client address; the limiter would
+    # otherwise turn most of the run into 429s.
+    os.environ.setdefault("RATE_LIMIT_PER_USER", "1000000000")
+    os.environ.setdefault("RATE_LIMIT_PER_IP", "1000000000")
+    os.environ["REDIS_ENABLED"] = "0" if redis_mode == "off" else "1"
+    os.environ.setdefault("WRITE_QUEUE_MODE", "sync" if redis_mode == "off" else "redis")
+
+    import cache
+
+    if redis_mode == "fake":
+        try:
+            import fakeredis
+        except ImportError:
+            raise SystemExit("--redis fake needs the fakeredis package (pip install fakeredis)")
+        cache.redis_client = fakeredis.FakeRedis(decode_responses=True)
+
+
+def reset_database(seed_options: dict):
+    from database import Base, SessionLocal, engine
+    from benchmarks.dataset import seed_dataset
+
+    # The engine echoes SQL by default, which would dominate the timings.
+    engine.echo = False
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        return seed_dataset(db, **seed_options), engine.dialect.name
+
+
+class LoadContext:
+    def __init__(self, dataset, auth_users: int, days: int) -> None:
+        from auth import create_access_token
+
+        self.dataset = dataset
+        self.hot_posts = dataset.hot_post_ids(HOT_POST_COUNT)
+        self.days = days
+        self.today = date.today()
+        self.auth_headers = [
+            {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+            for username in dataset.usernames[:auth_users]
+        ]
+
+
+def _front_page(rng: random.Random, ctx: LoadContext):
+    if rng.random() < 0.2:
+        day = ctx.today - timedelta(days=rng.randint(1, ctx.days))
+        return "GET", f"/posts/?sort=past&day={day.isoformat()}&limit=30", None, None
+    # Readers rarely go past the first couple of pages.
+    page = min(int(rng.paretovariate(1.5)) - 1, 9)
+    return "GET", f"/posts/?sort=new&limit=30&skip={page * 30}", None, None
+
+
+def _hot_thread(rng: random.Random, ctx: LoadContext):
+    return "GET", f"/posts/{ctx.dataset.pick_post(rng)}/comments", None, None
+
+
+def _vote_storm(rng: random.Random, ctx: LoadContext):
+    post_id = rng.choice(ctx.hot_posts)
+    return "POST", f"/posts/{post_id}/vote", {"vote_type": 1}, rng.choice(ctx.auth_headers)
+
+
+def _comment_burst(rng: random.Random, ctx: LoadContext):
+    post_id = rng.choice(ctx.hot_posts[:BURST_POST_COUNT])
+    payload = {"text": f"Load test comment {rng.getrandbits(32):08x}"}
+    return "POST", f"/posts/{post_id}/comments", payload, rng.choice(ctx.auth_headers)
+
+
+SCENARIO_BUILDERS = {
+    "front_page": _front_page,
+    "hot_thread": _hot_thread,
+    "vote_storm": _vote_storm,
+    "comment_burst": _comment_burst,
+}
+
+
+async def run_scenario(client, build, ctx: LoadContext, requests: int, concurrency: int, rng: random.Random):
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    issued = 0
+
+    async def worker() -> None:
+        nonlocal issued
+        while issued < requests:
+            issued += 1
+            method, url, payload, headers = build(rng, ctx)
+            started = time.perf_counter()
+            response = await client.request(method, url, json=payload, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, statuses)
+
+
+def drain_write_queue() -> dict | None:
+    """Apply everything the scenario enqueued with the worker's batch processor."""
+    from services.queue_service import queue_writes_enabled, write_stream_keys
+
+    if not queue_writes_enabled():
+        return None
+
+    from cache import redis_client
+    from workers.write_queue_worker import WRITE_BATCH_SIZE, _process_events
+
+    events_total = batches = failed_batches = 0
+    last_ids = {stream: "0-0" for stream in write_stream_keys()}
+    started = time.perf_counter()
+    while True:
+        response = redis_client.xread(last_ids, count=WRITE_BATCH_SIZE)
+        if not response:
+            break
+        events = []
+        for stream, messages in response:
+            last_ids[stream] = messages[-1][0]
+            events.extend(fields | {"id": message_id} for message_id, fields in messages)
+        if not _process_events(events):
+            failed_batches += 1
+        events_total += len(events)
+        batches += 1
+    duration_s = time.perf_counter() - started
+    redis_client.delete(*last_ids)
+    return {
+        "events": events_total,
+        "batches": batches,
+        "failed_batches": failed_batches,
+        "duration_s": round(duration_s, 3),
+        "events_per_s": round(events_total / duration_s, 1) if duration_s > 0 else 0.0,
+    }
+
+
+async def run_load(ctx: LoadContext, scenarios, requests: int, warmup: int, concurrency: int, seed: int) -> dict:
+    import httpx
+    from main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        for name in scenarios:
+            build = SCENARIO_BUILDERS[name]
+            rng = random.Random(f"{seed}:{name}")
+            if warmup:
+                await run_scenario(client, build, ctx, warmup, concurrency, rng)
+                drain_write_queue()
+            summary = await run_scenario(client, build, ctx, requests, concurrency, rng)
+            drain = drain_write_queue()
+            if drain and drain["events"]:
+                summary["drain"] = drain
+            results[name] = summary
+            print(format_summary(name, summary), flush=True)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--reset", action="store_true", help="allow dropping a non-SQLite database")
+    parser.add_argument("--redis", choices=("fake", "url", "off"), default="fake")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--votes", type=int, default=50000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--auth-users", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to diff this run against")
+    parser.add_argument("--diff", nargs=2, metavar=("BASE", "HEAD"), help="diff two reports and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.diff:
+        print("\n".join(compare_reports(load_report(args.diff[0]), load_report(args.diff[1]))))
+        return 0
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    database_url = args.database_url
+    if database_url is None:
+        database_path = Path(tempfile.gettempdir()) / "hn_loadtest.db"
+        database_path.unlink(missing_ok=True)
+        database_url = f"sqlite:///{database_path}"
+    elif not database_url.startswith("sqlite") and not args.reset:
+        raise SystemExit("Refusing to drop a non-SQLite database without --reset")
+
+    configure_environment(database_url, args.redis)
+    seed_started = time.perf_counter()
+    dataset, dialect = reset_database({
+        "users": args.users,
+        "posts": args.posts,
+        "comments": args.comments,
+        "votes": args.votes,
+        "days": args.days,
+        "seed": args.seed,
+    })
+    print(f"Seeded {dataset.counts} in {time.perf_counter() - seed_started:.1f}s", flush=True)
+
+    ctx = LoadContext(dataset, args.auth_users, args.days)
+    results = asyncio.run(run_load(ctx, scenarios, args.requests, args.warmup, args.concurrency, args.seed))
+
+    from services.queue_service import WRITE_QUEUE_MODE
+
+    report = {
+        "meta": {
+            "database": dialect,
+            "redis": args.redis,
+            "write_queue": WRITE_QUEUE_MODE,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+            "dataset": dataset.counts,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        write_report(report, args.output)
+    if args.compare:
+        print("\n".join(compare_reports(load_report(args.compare), report)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Latency summaries and report diffs shared by the benchmark scripts."""
+import json
+from pathlib import Path
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def summarize(latencies_ms: list[float], duration_s: float, statuses: dict[int, int] | None = None) -> dict:
+    ordered = sorted(latencies_ms)
+    statuses = statuses or {}
+    summary = {
+        "requests": len(ordered),
+        "errors": sum(count for status, count in statuses.items() if int(status) >= 400),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "duration_s": round(duration_s, 3),
+        "rps": round(len(ordered) / duration_s, 1) if duration_s > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(ordered, pct), 2)
+    return summary
+
+
+def load_report(path: str | Path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def write_report(report: dict, path: str | Path) -> None:
+    Path(path).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def format_summary(name: str, summary: dict) -> str:
+    return (
+        f"{name:<16} {summary['requests']:>7} req {summary['rps']:>9.1f} rps "
+        f"p50 {summary['p50_ms']:>8.2f}ms p95 {summary['p95_ms']:>8.2f}ms "
+        f"p99 {summary['p99_ms']:>8.2f}ms errors {summary['errors']}"
+    )
+
+
+def _delta(base: float, head: float) -> str:
+    if not base:
+        return "   n/a"
+    return f"{(head - base) / base * 100:+6.1f}%"
+
+
+def compare_reports(base: dict, head: dict, metrics=("rps", "p50_ms", "p95_ms", "p99_ms")) -> list[str]:
+    """One line per scenario present in both reports with the relative change per metric."""
+    lines = []
+    for name, head_summary in head.get("scenarios", {}).items():
+        base_summary = base.get("scenarios", {}).get(name)
+        if base_summary is None:
+            lines.append(f"{name:<16} (new)")
+            continue
+        parts = [
+            f"{metric} {base_summary.get(metric, 0)} -> {head_summary.get(metric, 0)} "
+            f"({_delta(base_summary.get(metric, 0), head_summary.get(metric, 0))})"
+            for metric in metrics
+        ]
+        lines.append(f"{name:<16} " + "  ".join(parts))
+    return lines
@@ -0,0 +1,222 @@
+"""Replay a synthetic write stream through the queue worker at fixed rates.
+
+A producer thread enqueues a mix of votes and comments at each offered rate
+while the worker consumes with the given batch size and block time. For every
+combination the report shows consumed events/s, enqueue-to-ack lag percentiles
+and per-stage ms per batch; a rate counts as sustained when p95 lag stays under
+``--max-lag-ms``. The batch size ``auto`` runs the worker's adaptive
+controller instead of a fixed count. Run from ``backend/``::
+
+    python benchmarks/write_worker.py --rates 200,500,1000 --batch-sizes 50,200,500,auto
+    python benchmarks/write_worker.py --output worker.json --compare baseline.json
+"""
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.loadtest import configure_environment, reset_database  # noqa: E402
+from benchmarks.stats import compare_reports, load_report, percentile, write_report  # noqa: E402
+
+# Roughly what the API enqueues: mostly votes, a steady trickle of comments.
+EVENT_MIX = (
+    ("post.vote.add", 0.5),
+    ("post.vote.remove", 0.05),
+    ("comment.vote.add", 0.15),
+    ("comment.vote.remove", 0.02),
+    ("comment.add", 0.28),
+)
+
+
+class SyntheticProducer(threading.Thread):
+    def __init__(self, dataset, rate: float, duration_s: float, seed: int) -> None:
+        super().__init__(name="synthetic-producer", daemon=True)
+        self.dataset = dataset
+        self.rate = rate
+        self.duration_s = duration_s
+        self.rng = random.Random(seed)
+        self.produced = 0
+
+    def _event(self) -> tuple[str, dict]:
+        event_type = self.rng.choices([t for t, _ in EVENT_MIX], [w for _, w in EVENT_MIX])[0]
+        user_id = self.rng.randint(1, self.dataset.counts["users"])
+        if event_type.startswith("post.vote"):
+            return event_type, {"user_id": user_id, "post_id": self.dataset.pick_post(self.rng)}
+        if event_type.startswith("comment.vote"):
+            return event_type, {"user_id": user_id, "comment_id": self.rng.randint(1, self.dataset.counts["comments"])}
+        return event_type, {
+            "user_id": user_id,
+            "post_id": self.dataset.pick_post(self.rng),
+            "text": f"Replay comment {self.produced}",
+        }
+
+    def run(self) -> None:
+        from services.queue_service import enqueue_write
+
+        started = time.perf_counter()
+        while True:
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.duration_s:
+                return
+            due = int(elapsed * self.rate)
+            while self.produced < due:
+                enqueue_write(*self._event())
+                self.produced += 1
+            time.sleep(0.002)
+
+
+def run_replay(
+    dataset, rate: float, duration_s: float, batch_size: int | None, block_ms: int, drain_s: float, seed: int
+) -> dict:
+    import cache
+    from services.queue_service import write_stream_keys
+    from workers import write_queue_worker as worker
+
+    cache.redis_client.delete(*write_stream_keys())
+    worker._ensure_consumer_group()
+    worker.stats.reset()
+    worker.batching = worker.BatchController()
+
+    producer = SyntheticProducer(dataset, rate, duration_s, seed)
+    lags_ms: list[float] = []
+    consumed = 0
+    started = time.perf_counter()
+    producer.start()
+    deadline = None
+    while True:
+        message_ids, _ = worker._consume_batch(batch_size, block_ms)
+        acked_ms = time.time() * 1000
+        lags_ms.extend(acked_ms - int(message_id.split("-", 1)[0]) for message_id in message_ids)
+        consumed += len(message_ids)
+        if producer.is_alive():
+            continue
+        if consumed >= producer.produced:
+            break
+        deadline = deadline or time.perf_counter() + drain_s
+        if time.perf_counter() > deadline:
+            break
+    elapsed = time.perf_counter() - started
+
+    lags_ms.sort()
+    snapshot = worker.stats.snapshot()
+    batches = snapshot.get("batches", 0)
+    return {
+        "offered_rate": rate,
+        "batch_size": batch_size or "auto",
+        "final_batch_size": worker.batching.size if batch_size is None else batch_size,
+        "block_ms": block_ms,
+        "produced": producer.produced,
+        "consumed": consumed,
+        "backlog": producer.produced - consumed,
+        "failed_batches": snapshot.get("failed_batches", 0),
+        "batches": batches,
+        "avg_batch": round(consumed / batches, 1) if batches else 0.0,
+        "duration_s": round(elapsed, 3),
+        "rps": round(consumed / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(lags_ms, 50), 1),
+        "p95_ms": round(percentile(lags_ms, 95), 1),
+        "p99_ms": round(percentile(lags_ms, 99), 1),
+        "max_ms": round(lags_ms[-1], 1) if lags_ms else 0.0,
+        "stage_ms_per_batch": {
+            name.removeprefix("stage_seconds."): round(value * 1000 / batches, 2)
+            for name, value in sorted(snapshot.items())
+            if name.startswith("stage_seconds.") and batches
+        },
+    }
+
+
+def _parse_list(raw: str, cast):
+    return [cast(value) for value in raw.split(",") if value.strip()]
+
+
+def _batch_size(raw: str) -> int | None:
+    return None if raw.strip() == "auto" else int(raw)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--reset", action="store_true", help="allow dropping a non-SQLite database")
+    parser.add_argument("--redis", choices=("fake", "url"), default="fake")
+    parser.add_argument("--rates", default="200,500,1000", help="offered events/s, comma separated")
+    parser.add_argument("--batch-sizes", default="200", help="WRITE_BATCH_SIZE values to try, or auto")
+    parser.add_argument("--block-ms", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of production per run")
+    parser.add_argument("--drain", type=float, default=30.0, help="seconds allowed to drain the backlog")
+    parser.add_argument("--max-lag-ms", type=float, default=1000.0)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--votes", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to diff this run against")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url
+    if database_url is None:
+        database_path = Path(tempfile.gettempdir()) / "hn_worker_bench.db"
+        database_path.unlink(missing_ok=True)
+        database_url = f"sqlite:///{database_path}"
+    elif not database_url.startswith("sqlite") and not args.reset:
+        raise SystemExit("Refusing to drop a non-SQLite database without --reset")
+
+    configure_environment(database_url, args.redis)
+    dataset, dialect = reset_database({
+        "users": args.users,
+        "posts": args.posts,
+        "comments": args.comments,
+        "votes": args.votes,
+        "seed": args.seed,
+    })
+
+    results = {}
+    sustained: dict[str, float] = {}
+    for batch_size in _parse_list(args.batch_sizes, _batch_size):
+        label = str(batch_size or "auto")
+        for rate in _parse_list(args.rates, float):
+            result = run_replay(dataset, rate, args.duration, batch_size, args.block_ms, args.drain, args.seed)
+            result["sustained"] = result["backlog"] == 0 and result["p95_ms"] <= args.max_lag_ms
+            if result["sustained"]:
+                sustained[label] = max(sustained.get(label, 0.0), rate)
+            results[f"batch{label}_rate{rate:g}"] = result
+            print(
+                f"batch {label:>5} rate {rate:>7g}/s -> {result['rps']:>8.1f} events/s "
+                f"lag p50 {result['p50_ms']:>8.1f}ms p95 {result['p95_ms']:>8.1f}ms "
+                f"backlog {result['backlog']} final size {result['final_batch_size']} "
+                f"{'ok' if result['sustained'] else 'FALLING BEHIND'}",
+                flush=True,
+            )
+            print(f"    ms/batch {result['stage_ms_per_batch']}", flush=True)
+
+    for batch_size, rate in sorted(sustained.items()):
+        print(f"Highest sustained rate with batch size {batch_size}: {rate:g} events/s")
+
+    report = {
+        "meta": {
+            "database": dialect,
+            "redis": args.redis,
+            "block_ms": args.block_ms,
+            "duration_s": args.duration,
+            "max_lag_ms": args.max_lag_ms,
+            "dataset": dataset.counts,
+            "sustained_rate": sustained,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        write_report(report, args.output)
+    if args.compare:
+        print("\n".join(compare_reports(load_report(args.compare), report)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,48 +1,492 @@
 import os
+import threading
+import time
+from collections.abc import Callable
+
 import redis
 
+from metrics import CACHE_ERRORS, CACHE_REQUESTS, REDIS_CIRCUIT_OPEN, REDIS_SHORT_CIRCUITS, cache_family
+
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379")
 REDIS_ENABLED = os.getenv("REDIS_ENABLED", "1").lower() not in {"0", "false", "no", "off"}
+# Without timeouts an unreachable Redis stalls every call for the OS TCP timeout.
+REDIS_SOCKET_TIMEOUT_SECONDS = float(os.getenv("REDIS_SOCKET_TIMEOUT_SECONDS", "1.0"))
+REDIS_CONNECT_TIMEOUT_SECONDS = float(os.getenv("REDIS_CONNECT_TIMEOUT_SECONDS", "0.5"))
+REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", "5"))
+REDIS_BREAKER_COOLDOWN_SECONDS = float(os.getenv("REDIS_BREAKER_COOLDOWN_SECONDS", "10"))
 
 # Use decode_responses so cached JSON strings are returned as str.
 redis_client = (
-    redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    redis.Redis.from_url(
+        REDIS_URL,
+        decode_responses=True,
+        socket_timeout=REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT_SECONDS,
+    )
     if REDIS_ENABLED
     else None
 )
 
 
+class CircuitBreaker:
+    """Process-local breaker in front of the Redis client.
+
+    After ``failures`` consecutive connection errors or timeouts the circuit
+    opens and callers get an immediate miss for ``cooldown_seconds``. The next
+    call after the cool-down is let through as a probe: success closes the
+    circuit, another failure re-opens it for a fresh cool-down. Any other
+    Redis error (a bad command, a wrong type) proves the server answered.
+    """
+
+    def __init__(self, failures: int, cooldown_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.failures = max(failures, 1)
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._consecutive = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+        REDIS_CIRCUIT_OPEN.set(0)
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or self._clock() - self._opened_at < self.cooldown_seconds:
+                REDIS_SHORT_CIRCUITS.inc()
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        if self._consecutive == 0 and self._opened_at is None:
+            return
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._probing = False
+            REDIS_CIRCUIT_OPEN.set(0)
+
+    def record_error(self, exc: BaseException) -> None:
+        if not isinstance(exc, (redis.ConnectionError, redis.TimeoutError)):
+            self.record_success()
+            return
+        with self._lock:
+            self._consecutive += 1
+            if self._probing or self._consecutive >= self.failures:
+                self._opened_at = self._clock()
+                self._probing = False
+                REDIS_CIRCUIT_OPEN.set(1)
+
+
+redis_breaker = CircuitBreaker(REDIS_BREAKER_FAILURES, REDIS_BREAKER_COOLDOWN_SECONDS)
+
+
+def _redis_ready() -> bool:
+    return REDIS_ENABLED and redis_client is not None and redis_breaker.allow()
+
+
 def redis_get(key: str):
-    if not REDIS_ENABLED or redis_client is None:
+    if not _redis_ready():
         return None
     try:
-        return redis_client.get(key)
-    except redis.RedisError:
+        value = redis_client.get(key)
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_REQUESTS.inc(family=cache_family(key), result="error")
         return None
+    CACHE_REQUESTS.inc(family=cache_family(key), result="hit" if value is not None else "miss")
+    return value
 
 
 def redis_setex(key: str, ttl_seconds: int, value: str) -> None:
-    if not REDIS_ENABLED or redis_client is None:
+    if not _redis_ready():
         return None
     try:
         redis_client.setex(key, ttl_seconds, value)
-    except redis.RedisError:
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="setex")
         return None
 
 
+def redis_set_nx(key: str, value: str, ttl_seconds: int) -> bool | None:
+    """SET key only if it does not exist; None when Redis could not answer."""
+    if not _redis_ready():
+        return None
+    try:
+        created = redis_client.set(key, value, ex=ttl_seconds, nx=True)
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="set_nx")
+        return None
+    return bool(created)
+
+
 def redis_incr(key: str) -> int | None:
-    if not REDIS_ENABLED or redis_client is None:
+    if not _redis_ready():
         return None
     try:
-        return int(redis_client.incr(key))
-    except redis.RedisError:
+        value = int(redis_client.incr(key))
+        redis_breaker.record_success()
+        return value
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="incr")
         return None
 
 
 def redis_expire(key: str, ttl_seconds: int) -> None:
-    if not REDIS_ENABLED or redis_client is None:
+    if not _redis_ready():
         return None
     try:
         redis_client.expire(key, ttl_seconds)
-    except redis.RedisError:
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="expire")
+        return None
+
+
+# Only adjust counters that are already cached; a missing key is rebuilt from the DB on read.
+_INCRBY_IF_EXISTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+
+def redis_incrby_if_exists(key: str, amount: int) -> int | None:
+    if not _redis_ready():
+        return None
+    try:
+        result = redis_client.eval(_INCRBY_IF_EXISTS_SCRIPT, 1, key, amount)
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="incrby_if_exists")
+        return None
+    return int(result) if result is not None else None
+
+
+def redis_publish(channel: str, message: str) -> None:
+    if not _redis_ready():
+        return None
+    try:
+        redis_client.publish(channel, message)
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="publish")
+        return None
+
+
+def redis_hset(key: str, mapping: dict, ttl_seconds: int | None = None) -> None:
+    if not mapping or not _redis_ready():
+        return None
+    try:
+        redis_client.hset(key, mapping=mapping)
+        if ttl_seconds:
+            redis_client.expire(key, ttl_seconds)
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="hset")
+        return None
+
+
+def redis_scan_keys(pattern: str, count: int = 500) -> list[str]:
+    if not _redis_ready():
+        return []
+    try:
+        keys = list(redis_client.scan_iter(match=pattern, count=count))
+        redis_breaker.record_success()
+        return keys
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="scan")
+        return []
+
+
+def redis_hgetall(key: str) -> dict:
+    if not _redis_ready():
+        return {}
+    try:
+        values = redis_client.hgetall(key)
+        redis_breaker.record_success()
+        return values
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="hgetall")
+        return {}
+
+
+def redis_smismember(key: str, members: list) -> list[bool] | None:
+    if not members or not _redis_ready():
+        return None
+    try:
+        flags = redis_client.smismember(key, members)
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_REQUESTS.inc(family=cache_family(key), result="error")
+        return None
+    CACHE_REQUESTS.inc(family=cache_family(key), result="hit" if any(flags) else "miss")
+    return [bool(flag) for flag in flags]
+
+
+def redis_sadd(key: str, members: list, ttl_seconds: int | None = None) -> None:
+    if not members or not _redis_ready():
+        return None
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.sadd(key, *members)
+        if ttl_seconds:
+            pipe.expire(key, ttl_seconds)
+        pipe.execute()
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="sadd")
+        return None
+
+
+def redis_pipeline(queue: Callable[[redis.client.Pipeline], None], operation: str = "pipeline") -> list | None:
+    """Send the commands ``queue`` adds to a non-transactional pipeline in one round trip.
+
+    Returns one result per command, with None for any command Redis rejected,
+    or None when Redis is disabled or the round trip itself failed.
+    """
+    if not _redis_ready():
+        return None
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        queue(pipe)
+        results = pipe.execute(raise_on_error=False)
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation=operation)
+        return None
+    failed = sum(1 for result in results if isinstance(result, Exception))
+    if failed:
+        CACHE_ERRORS.inc(failed, operation=operation)
+    return [None if isinstance(result, Exception) else result for result in results]
+
+
+def redis_mget(keys: list[str]) -> list:
+    if not keys or not _redis_ready():
+        return [None] * len(keys)
+    try:
+        values = redis_client.mget(keys)
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        for key in keys:
+            CACHE_REQUESTS.inc(family=cache_family(key), result="error")
+        return [None] * len(keys)
+    for key, value in zip(keys, values):
+        CACHE_REQUESTS.inc(family=cache_family(key), result="hit" if value is not None else "miss")
+    return values
+
+
+def redis_setex_many(values: dict[str, str], ttl_seconds: int) -> None:
+    if not values:
+        return None
+    redis_pipeline(
+        lambda pipe: [pipe.setex(key, ttl_seconds, value) for key, value in values.items()],
+        operation="setex",
+    )
+    return None
+
+
+def redis_delete(keys: list[str]) -> None:
+    if not keys or not _redis_ready():
         return None
+    try:
+        redis_client.delete(*keys)
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="delete")
+    return None
+
+
+def redis_incr_many(keys: list[str]) -> list[int | None]:
+    if not keys:
+        return []
+    results = redis_pipeline(lambda pipe: [pipe.incr(key) for key in keys], operation="incr")
+    if results is None:
+        return [None] * len(keys)
+    return [int(result) if result is not None else None for result in results]
+
+
+def redis_incr_expire(key: str, ttl_seconds: int) -> int | None:
+    """INCR a window counter and start its TTL on first use, in one round trip."""
+    results = redis_pipeline(
+        lambda pipe: (pipe.incr(key), pipe.expire(key, ttl_seconds, nx=True)),
+        operation="incr",
+    )
+    if not results or results[0] is None:
+        return None
+    return int(results[0])
+
+
+def redis_incrby_if_exists_many(amounts: dict[str, int]) -> list[int | None]:
+    if not amounts:
+        return []
+
+    def queue(pipe):
+        for key, amount in amounts.items():
+            pipe.eval(_INCRBY_IF_EXISTS_SCRIPT, 1, key, amount)
+
+    results = redis_pipeline(queue, operation="incrby_if_exists")
+    if results is None:
+        return [None] * len(amounts)
+    return [int(result) if result is not None else None for result in results]
+
+
+def redis_hgetall_many(keys: list[str]) -> list[dict]:
+    if not keys:
+        return []
+    results = redis_pipeline(lambda pipe: [pipe.hgetall(key) for key in keys], operation="hgetall")
+    if results is None:
+        return [{} for _ in keys]
+    return [result or {} for result in results]
+
+
+def redis_update_sets(
+    changes: dict[str, tuple[list, list]],
+    ttl_seconds: int | None = None,
+    version_keys: list[str] | None = None,
+) -> None:
+    """Apply ``{key: (added, removed)}`` to many sets in one round trip.
+
+    The TTL is refreshed only on keys that gained members. ``version_keys``
+    are INCRed before any set changes, so a ``redis_rebuild_set`` racing this
+    write sees the bump and leaves the set alone.
+    """
+    changes = {key: (added, removed) for key, (added, removed) in changes.items() if added or removed}
+    if not changes:
+        return None
+
+    def queue(pipe):
+        for key in version_keys or []:
+            pipe.incr(key)
+            if ttl_seconds:
+                pipe.expire(key, ttl_seconds)
+        for key, (added, removed) in changes.items():
+            if added:
+                pipe.sadd(key, *added)
+                if ttl_seconds:
+                    pipe.expire(key, ttl_seconds)
+            if removed:
+                pipe.srem(key, *removed)
+
+    redis_pipeline(queue, operation="update_sets")
+    return None
+
+
+def redis_rebuild_set(key: str, version_key: str, seen_version, members: list, ttl_seconds: int) -> bool:
+    """Replace a set with ``members`` read from the database, unless a write raced the read.
+
+    ``seen_version`` is ``version_key`` as read before the database query.
+    Writers bump it before changing the set, so any other value means the read
+    may be stale and the set is left alone. The new set is built under a
+    staging key and RENAMEd into place in one transaction under WATCH.
+    Returns whether the set was replaced.
+    """
+    if not members or not _redis_ready():
+        return False
+    staging_key = f"{key}:rebuild"
+    replaced = False
+
+    def swap(pipe):
+        nonlocal replaced
+        replaced = pipe.get(version_key) == seen_version
+        if not replaced:
+            pipe.unwatch()
+            return
+        pipe.multi()
+        pipe.delete(staging_key)
+        pipe.sadd(staging_key, *members)
+        pipe.expire(staging_key, ttl_seconds)
+        pipe.rename(staging_key, key)
+
+    try:
+        redis_client.transaction(swap, version_key)
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="rebuild_set")
+        return False
+    return replaced
+
+
+def redis_push_ids(key: str, ids: list, max_length: int) -> None:
+    """Push ``ids`` (oldest first) onto the head of a capped id list, dropping earlier copies."""
+    if not ids:
+        return None
+
+    def queue(pipe):
+        for value in ids:
+            pipe.lrem(key, 0, value)
+            pipe.lpush(key, value)
+        pipe.ltrim(key, 0, max_length - 1)
+
+    redis_pipeline(queue, operation="push_ids")
+    return None
+
+
+def redis_id_list_range(key: str, complete_key: str, start: int, stop: int) -> list[str] | None:
+    """LRANGE an id list; None unless ``complete_key`` marks it as rebuilt in full, or on failure."""
+    results = redis_pipeline(lambda pipe: (pipe.exists(complete_key), pipe.lrange(key, start, stop)), operation="lrange")
+    if results is None:
+        return None
+    hit = bool(results[0]) and results[1] is not None
+    CACHE_REQUESTS.inc(family=cache_family(key), result="hit" if hit else "miss")
+    return results[1] if hit else None
+
+
+def redis_rebuild_id_list(key: str, complete_key: str, ids: list, max_length: int, ttl_seconds: int) -> None:
+    """Replace an id list with ``ids`` (newest first) read from the database and mark it complete.
+
+    Ids pushed while the list was incomplete stay at its head, since the
+    caller's read may have missed them; WATCH retries the swap when a push
+    lands while it runs. The list and its marker expire at the same instant.
+    """
+    if not _redis_ready():
+        return None
+    values = [str(value) for value in ids]
+    known = set(values)
+    oldest = min((int(value) for value in values), default=0)
+    expires_at_ms = int((time.time() + ttl_seconds) * 1000)
+
+    def swap(pipe):
+        # Ids below the read's oldest are left over from an earlier list, not new pushes.
+        pushed = [value for value in pipe.lrange(key, 0, -1) if value not in known and int(value) > oldest]
+        merged = (list(dict.fromkeys(pushed)) + values)[:max_length]
+        pipe.multi()
+        pipe.delete(key)
+        if merged:
+            pipe.rpush(key, *merged)
+            pipe.pexpireat(key, expires_at_ms)
+        pipe.set(complete_key, "1", pxat=expires_at_ms)
+
+    try:
+        redis_client.transaction(swap, key)
+        redis_breaker.record_success()
+    except redis.RedisError as exc:
+        redis_breaker.record_error(exc)
+        CACHE_ERRORS.inc(operation="rebuild_id_list")
+    return None
@@ -0,0 +1,65 @@
+"""Encoding for JSON values stored in Redis.
+
+``CACHE_CODEC`` picks how new entries are written: ``zlib`` (the default)
+compresses payloads of at least ``CACHE_COMPRESS_MIN_BYTES`` and stores the
+rest as plain JSON; ``json`` never compresses. ``decode`` reads every format
+regardless of the setting, so switching codecs or rolling a deploy does not
+invalidate entries that are already cached.
+
+The Redis client decodes responses to ``str``, so compressed bytes are stored
+base64-encoded behind a ``z:`` prefix that JSON text can never start with.
+"""
+import base64
+import json
+import os
+import zlib
+from collections.abc import Callable
+
+CACHE_CODEC = os.getenv("CACHE_CODEC", "zlib").lower()
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "2048"))
+CACHE_COMPRESS_LEVEL = 6
+
+ZLIB_PREFIX = "z:"
+
+
+class JsonCodec:
+    name = "json"
+
+    def encode(self, value, default: Callable | None = None) -> str:
+        return json.dumps(value, default=default, separators=(",", ":"))
+
+    def decode(self, raw: str):
+        return decode(raw)
+
+
+class ZlibCodec(JsonCodec):
+    name = "zlib"
+
+    def __init__(self, min_bytes: int = CACHE_COMPRESS_MIN_BYTES, level: int = CACHE_COMPRESS_LEVEL) -> None:
+        self.min_bytes = min_bytes
+        self.level = level
+
+    def encode(self, value, default: Callable | None = None) -> str:
+        text = super().encode(value, default)
+        if len(text) < self.min_bytes:
+            return text
+        compressed = zlib.compress(text.encode("utf-8"), self.level)
+        return ZLIB_PREFIX + base64.b64encode(compressed).decode("ascii")
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec(), ZlibCodec())}
+codec = CODECS.get(CACHE_CODEC, CODECS["zlib"])
+
+
+def encode(value, default: Callable | None = None) -> str:
+    return codec.encode(value, default)
+
+
+def decode(raw: str):
+    """Inverse of any codec's ``encode``; raises ValueError on a corrupt entry."""
+    if raw.startswith(ZLIB_PREFIX):
+        try:
+            raw = zlib.decompress(base64.b64decode(raw[len(ZLIB_PREFIX):])).decode("utf-8")
+        except (zlib.error, ValueError) as exc:
+            raise ValueError("corrupt compressed cache entry") from exc
+    return json.loads(raw)
@@ -1,23 +1,42 @@
-from contextlib import asynccontextmanager
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import os
 
-# Import database and create tables on startup
 from sqlalchemy import text
-from database import engine, Base
+from database import engine
+from realtime import broker
+from auth.hashing import password_hash_pool
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, instrument_engine, multiprocess_enabled, push_loop, render_metrics
+from startup import LOGGER as STARTUP_LOGGER, prepare_schema, startup_timings
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Serialize schema creation across multiple workers to avoid enum race.
-    with engine.begin() as conn:
-        conn.execute(text("SELECT pg_advisory_lock(2147483647)"))
-        try:
-            Base.metadata.create_all(bind=conn)
-        finally:
-            conn.execute(text("SELECT pg_advisory_unlock(2147483647)"))
+    with startup_timings.measure("engine_connect"):
+        conn = engine.connect()
+    with conn:
+        with startup_timings.measure("first_query"):
+            conn.execute(text("SELECT 1"))
+        with startup_timings.measure("schema"):
+            prepare_schema(conn)
+        conn.commit()
+    app.state.startup_timings = dict(startup_timings.timings)
+    STARTUP_LOGGER.info("Startup timings: %s", startup_timings.report())
+    metrics_pusher = asyncio.create_task(push_loop()) if multiprocess_enabled() else None
     yield
+    if metrics_pusher is not None:
+        metrics_pusher.cancel()
+        with suppress(asyncio.CancelledError):
+            await metrics_pusher
+    await broker.stop()
+    password_hash_pool.shutdown()
 
 app = FastAPI(
     title="Hacker News Clone API",
@@ -39,6 +58,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
 
 # Import routers
 from routers import (
@@ -49,7 +70,8 @@ from routers import (
     comment_actions_router,
     notifications_router,
     comments_feed_router,
-    comment_votes_router
+    comment_votes_router,
+    items_router
 )
 
 # Include routers with prefixes
@@ -61,7 +83,16 @@ app.include_router(comments_feed_router, prefix="/comments", tags=["comments"])
 app.include_router(comment_actions_router, prefix="/comments", tags=["comments"])
 app.include_router(comment_votes_router, prefix="/comments", tags=["comments"])
 app.include_router(notifications_router, prefix="/notifications", tags=["notifications"])
+app.include_router(items_router, prefix="/items", tags=["items"])
 
 @app.get("/")
 def read_root():
     return {"message": "Hacker News Clone API", "version": "1.0.0"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics, summed across API workers when Redis is available."""
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+startup_timings.record("import", (time.perf_counter() - _IMPORT_STARTED) * 1000)
+
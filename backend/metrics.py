@@ -0,0 +1,475 @@
+"""Lightweight Prometheus metrics registry.
+
+Each process keeps its own counters, gauges and histograms. With
+``METRICS_MULTIPROCESS`` on (the default) every API worker pushes a snapshot to
+Redis every ``METRICS_PUSH_SECONDS`` and ``/metrics`` on any worker renders the
+sum across live workers, so one scrape target covers ``uvicorn --workers N``.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable
+
+LOGGER = logging.getLogger("metrics")
+
+METRICS_MULTIPROCESS = os.getenv("METRICS_MULTIPROCESS", "1").lower() not in {"0", "false", "no", "off"}
+METRICS_PUSH_SECONDS = float(os.getenv("METRICS_PUSH_SECONDS", "5"))
+METRICS_KEY_PREFIX = "hn:metrics:proc:"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+# (name, kind, help, [(labels, value), ...]) produced on demand by a collector.
+CollectedFamily = tuple[str, str, str, list[tuple[dict, float]]]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def family(self) -> dict:
+        with self._lock:
+            samples = [[list(key), value if not isinstance(value, list) else list(value)]
+                       for key, value in self._values.items()]
+        return {
+            "kind": self.kind,
+            "doc": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(float(bound) for bound in buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            # Per-bucket (non-cumulative) counts plus sum and count at the end.
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0
+
+    def family(self) -> dict:
+        family = super().family()
+        family["buckets"] = list(self.buckets)
+        return family
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], list[CollectedFamily]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], list[CollectedFamily]]) -> None:
+        """Register a callback whose samples are read at snapshot time (e.g. pool stats)."""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict[str, dict]:
+        families = {name: metric.family() for name, metric in self._metrics.items()}
+        for collector in self._collectors:
+            try:
+                collected = collector()
+            except Exception:
+                LOGGER.warning("Metrics collector failed", exc_info=True)
+                continue
+            families.update(collected_families(collected))
+        return families
+
+    def clear(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+def collected_families(collected: list[CollectedFamily]) -> dict[str, dict]:
+    families = {}
+    for name, kind, documentation, samples in collected:
+        labelnames = sorted({label for labels, _ in samples for label in labels})
+        families[name] = {
+            "kind": kind,
+            "doc": documentation,
+            "labelnames": labelnames,
+            "samples": [[[str(labels.get(label, "")) for label in labelnames], value] for labels, value in samples],
+        }
+    return families
+
+
+def merge_snapshots(snapshots: Iterable[dict[str, dict]]) -> dict[str, dict]:
+    """Sum samples with the same labels across processes (gauges included)."""
+    merged: dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(name, {**family, "samples": {}})
+            for labelvalues, value in family["samples"]:
+                key = tuple(labelvalues)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    target["samples"][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target["samples"][key] = current + value
+    for family in merged.values():
+        family["samples"] = [[list(key), value] for key, value in family["samples"].items()]
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: tuple[str, str] | None = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _bucket_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def render(families: dict[str, dict]) -> str:
+    """Prometheus text exposition format (0.0.4)."""
+    lines: list[str] = []
+    for name in sorted(families):
+        family = families[name]
+        lines.append(f"# HELP {name} {family['doc']}")
+        lines.append(f"# TYPE {name} {family['kind']}")
+        labelnames = family["labelnames"]
+        for labelvalues, value in sorted(family["samples"], key=lambda sample: sample[0]):
+            if family["kind"] != "histogram":
+                lines.append(f"{name}{_labels(labelnames, labelvalues)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(family["buckets"] + [float("inf")], value[:-2]):
+                cumulative += bucket_count
+                lines.append(
+                    f"{name}_bucket{_labels(labelnames, labelvalues, ('le', _bucket_bound(bound)))} {cumulative}"
+                )
+            lines.append(f"{name}_sum{_labels(labelnames, labelvalues)} {_number(value[-2])}")
+            lines.append(f"{name}_count{_labels(labelnames, labelvalues)} {_number(value[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "hn_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "hn_db_queries_per_request",
+    "SQL statements executed while serving one request.",
+    ("route",),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+CACHE_REQUESTS = registry.counter(
+    "hn_cache_requests_total",
+    "Redis cache lookups by key family and result (hit, miss, error).",
+    ("family", "result"),
+)
+CACHE_ERRORS = registry.counter(
+    "hn_cache_errors_total",
+    "Redis errors swallowed by the cache helpers, by operation.",
+    ("operation",),
+)
+REDIS_CIRCUIT_OPEN = registry.gauge(
+    "hn_redis_circuit_open",
+    "1 while the process's Redis circuit breaker is open; summed, the number of processes failing fast.",
+)
+REDIS_SHORT_CIRCUITS = registry.counter(
+    "hn_redis_short_circuits_total",
+    "Redis calls skipped (treated as a miss) because the circuit breaker was open.",
+)
+RATE_LIMIT_REJECTIONS = registry.counter(
+    "hn_rate_limit_rejections_total",
+    "Requests rejected with 429 by rate limit bucket.",
+    ("scope",),
+)
+WRITE_QUEUE_ENQUEUE_DURATION = registry.histogram(
+    "hn_write_queue_enqueue_seconds",
+    "Time to append a write event to the Redis stream.",
+    ("event_type",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+WRITE_QUEUE_ENQUEUE_ERRORS = registry.counter(
+    "hn_write_queue_enqueue_errors_total",
+    "Write events that could not be appended to the stream.",
+    ("event_type",),
+)
+
+
+def cache_family(key: str) -> str:
+    """Collapse a cache key to a low-cardinality family, e.g. ``post:*:comments``."""
+    parts = key.split(":")
+    if parts[0] == "post" and len(parts) > 2:
+        family = f"post:*:{parts[2]}"
+        return f"{family}:version" if parts[-1] == "v" else family
+    return parts[0]
+
+
+# --- per-request SQL statement counting -------------------------------------
+
+_query_count: ContextVar[list[int] | None] = ContextVar("query_count", default=None)
+
+
+def start_query_count() -> tuple[list[int], object]:
+    """Start counting statements for the current context; returns (counter, reset token)."""
+    counter = [0]
+    return counter, _query_count.set(counter)
+
+
+def stop_query_count(token) -> None:
+    _query_count.reset(token)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def instrument_engine(engine) -> None:
+    from sqlalchemy import event
+
+    if not event.contains(engine, "before_cursor_execute", _count_query):
+        event.listen(engine, "before_cursor_execute", _count_query)
+
+
+# --- HTTP middleware ------------------------------------------------------------
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and SQL statement count per route template."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self._templates: dict[object, str] | None = None
+
+    def _route_template(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._templates is None:
+            application = scope.get("app")
+            self._templates = {
+                getattr(route, "endpoint", None): route.path
+                for route in getattr(application, "routes", ())
+                if hasattr(route, "path")
+            }
+        return self._templates.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        counter, token = start_query_count()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            stop_query_count(token)
+            route = self._route_template(scope)
+            HTTP_REQUEST_DURATION.observe(elapsed, method=scope["method"], route=route, status=status_code)
+            DB_QUERIES_PER_REQUEST.observe(counter[0], route=route)
+
+
+# --- cross-process aggregation ----------------------------------------------
+
+
+def _process_key() -> str:
+    return f"{METRICS_KEY_PREFIX}{socket.gethostname()}:{os.getpid()}"
+
+
+def push_snapshot() -> None:
+    import cache
+
+    cache.redis_setex(_process_key(), int(METRICS_PUSH_SECONDS * 3) + 1, json.dumps(registry.snapshot()))
+
+
+async def push_loop() -> None:
+    """Publish this worker's snapshot until cancelled (started from the API lifespan)."""
+    while True:
+        try:
+            await asyncio.to_thread(push_snapshot)
+        except Exception:
+            LOGGER.warning("Pushing metrics snapshot failed", exc_info=True)
+        await asyncio.sleep(METRICS_PUSH_SECONDS)
+
+
+def multiprocess_enabled() -> bool:
+    import cache
+
+    return METRICS_MULTIPROCESS and cache.REDIS_ENABLED and cache.redis_client is not None
+
+
+def _peer_snapshots() -> list[dict]:
+    import cache
+
+    own_key = _process_key()
+    keys = [key for key in cache.redis_scan_keys(f"{METRICS_KEY_PREFIX}*") if key != own_key]
+    snapshots = []
+    for raw in cache.redis_mget(keys):
+        if not raw:
+            continue
+        try:
+            snapshots.append(json.loads(raw))
+        except json.JSONDecodeError:
+            continue
+    return snapshots
+
+
+_shared_collectors: list[Callable[[], list[CollectedFamily]]] = []
+
+
+def add_shared_collector(collector: Callable[[], list[CollectedFamily]]) -> None:
+    """Collectors for cluster-wide state (read from Redis) rendered once, not per process."""
+    _shared_collectors.append(collector)
+
+
+def render_metrics() -> str:
+    snapshots = [registry.snapshot()]
+    if multiprocess_enabled():
+        snapshots.extend(_peer_snapshots())
+    families = merge_snapshots(snapshots)
+    for collector in _shared_collectors:
+        try:
+            families.update(collected_families(collector()))
+        except Exception:
+            LOGGER.warning("Shared metrics collector failed", exc_info=True)
+    return render(families)
+
+
+# --- write worker stats (published by workers/write_queue_worker.py) ----------
+
+WRITE_WORKER_STATS_KEY_PREFIX = "hn:write_worker:stats:"
+WRITE_WORKER_GAUGES = {
+    "lag_ms": "Age in ms of the oldest event in the last batch read.",
+    "last_batch_size": "Events in the last batch read.",
+    "batch_size_target": "XREADGROUP count the adaptive batch controller will use next.",
+    "txn_ms": "Duration in ms of the last batch transaction, commit included.",
+}
+
+
+def collect_write_worker_metrics() -> list[CollectedFamily]:
+    import cache
+
+    families: dict[str, tuple[str, str, list]] = {}
+
+    def add(name: str, kind: str, documentation: str, labels: dict, value: float) -> None:
+        families.setdefault(name, (kind, documentation, []))[2].append((labels, value))
+
+    keys = cache.redis_scan_keys(f"{WRITE_WORKER_STATS_KEY_PREFIX}*")
+    for key, stats in zip(keys, cache.redis_hgetall_many(keys)):
+        labels = {"consumer": key[len(WRITE_WORKER_STATS_KEY_PREFIX):]}
+        for field, raw in stats.items():
+            try:
+                value = float(raw)
+            except (TypeError, ValueError):
+                continue
+            if field in WRITE_WORKER_GAUGES:
+                add(f"hn_write_worker_{field}", "gauge", WRITE_WORKER_GAUGES[field], labels, value)
+            elif field.startswith("stage_seconds."):
+                add("hn_write_worker_stage_seconds_total", "counter", "Write worker wall time per stage.",
+                    labels | {"stage": field.split(".", 1)[1]}, value)
+            elif field.startswith("events."):
+                add("hn_write_worker_applied_events_total", "counter", "Write events applied by type.",
+                    labels | {"type": field.split(".", 1)[1]}, value)
+            else:
+                add(f"hn_write_worker_{field}_total", "counter", f"Write worker {field.replace('_', ' ')}.",
+                    labels, value)
+    return [(name, kind, documentation, samples) for name, (kind, documentation, samples) in families.items()]
+
+
+add_shared_collector(collect_write_worker_metrics)
@@ -6,3 +6,4 @@ from .vote import Vote
 from .notification import Notification, NotificationType
 from .comment_vote import CommentVote
 from .queued_write import QueuedWrite
+from .past_day_rank import PastDayRank
@@ -1,4 +1,4 @@
-from sqlalchemy import Text, Integer, DateTime, ForeignKey, func, Enum
+from sqlalchemy import Text, Integer, DateTime, ForeignKey, func, Enum, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 from database import Base
@@ -9,6 +9,13 @@ class NotificationType(enum.Enum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    # Partial index backing the unread-count fallback when the Redis counter is cold.
+    # The composite index serves keyset pagination of a user's notification list.
+    __table_args__ = (
+        Index("ix_notifications_user_id_unread", "user_id", postgresql_where=text("read IS FALSE")),
+        Index("ix_notifications_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_notifications_created_at_read", "created_at", postgresql_where=text("read")),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))  # Recipient
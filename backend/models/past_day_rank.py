@@ -0,0 +1,17 @@
+from sqlalchemy import Date, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from database import Base
+
+
+class PastDayRank(Base):
+    """Frozen "past" ranking of a finished UTC day: one row per post, in rank order.
+
+    ``feed`` is the post_type the ranking was computed for, or ``all``.
+    """
+
+    __tablename__ = "past_day_ranks"
+
+    day: Mapped[Date] = mapped_column(Date, primary_key=True)
+    feed: Mapped[str] = mapped_column(String(20), primary_key=True)
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+    post_id: Mapped[int] = mapped_column(ForeignKey("posts.id"))
@@ -1,47 +1,55 @@
+import os
 from fastapi import Request, HTTPException, Depends
 from auth.deps import get_current_user_optional
 from models import User
-from cache import redis_get, redis_incr, redis_expire
+from cache import redis_incr_expire
+from metrics import RATE_LIMIT_REJECTIONS
 
-def rate_limit():
-    """Rate limiting dependency using Redis."""
-    limit_user = 120
-    limit_ip = 200
-    window = 60
+RATE_LIMIT_PER_USER = int(os.getenv("RATE_LIMIT_PER_USER", "120"))
+RATE_LIMIT_PER_IP = int(os.getenv("RATE_LIMIT_PER_IP", "200"))
+AUTH_RATE_LIMIT_PER_MINUTE = int(os.getenv("AUTH_RATE_LIMIT_PER_MINUTE", "10"))
+
+def rate_limit(
+    scope: str | None = None,
+    limit_user: int = RATE_LIMIT_PER_USER,
+    limit_ip: int = RATE_LIMIT_PER_IP,
+    window: int = 60,
+):
+    """Rate limiting dependency using Redis.
+
+    A ``scope`` gives the endpoint its own bucket instead of sharing the global one.
+    """
+    key_prefix = f"rate_limit:{scope}" if scope else "rate_limit"
     def dependency(
         request: Request,
         current_user: User | None = Depends(get_current_user_optional)
     ):
         # Use user_id for authenticated requests, fallback to IP for guests.
         if current_user:
-            key = f"rate_limit:user:{current_user.id}"
+            key = f"{key_prefix}:user:{current_user.id}"
             effective_limit = limit_user
         else:
             client_ip = request.client.host if request.client else "unknown"
-            key = f"rate_limit:ip:{client_ip}"
+            key = f"{key_prefix}:ip:{client_ip}"
             effective_limit = limit_ip
 
-        # Get current count
-        current = redis_get(key)
-        if current is None:
-            current = 0
-        else:
-            try:
-                current = int(current)
-            except ValueError:
-                current = 0
+        # INCR and the first-request EXPIRE share one round trip; NX keeps the
+        # window anchored at its first request. Fail open when Redis is down.
+        current = redis_incr_expire(key, window)
 
-        # Check if limit exceeded
-        if current >= effective_limit:
+        if current is not None and current > effective_limit:
+            RATE_LIMIT_REJECTIONS.inc(scope=scope or "global")
             raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
-        # Increment counter
-        redis_incr(key)
-
-        # Set expiry if this is the first request in window
-        if current == 0:
-            redis_expire(key, window)
-
         return True
 
     return dependency
+
+
+def auth_rate_limit():
+    """Stricter per-IP bucket for password endpoints (login, register)."""
+    return rate_limit(
+        scope="auth",
+        limit_user=AUTH_RATE_LIMIT_PER_MINUTE,
+        limit_ip=AUTH_RATE_LIMIT_PER_MINUTE,
+    )
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import logging
+import os
+from typing import AsyncIterator
+
+import redis.asyncio as aioredis
+from fastapi import Request
+
+from cache import REDIS_CONNECT_TIMEOUT_SECONDS, REDIS_ENABLED, REDIS_URL
+from services.event_service import EVENTS_CHANNEL
+
+
+LOGGER = logging.getLogger("realtime")
+
+SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_CLIENT_QUEUE_SIZE = int(os.getenv("SSE_CLIENT_QUEUE_SIZE", "100"))
+SSE_RETRY_MS = 5000
+
+
+class EventBroker:
+    """Process-local fan-out from one Redis subscription to many SSE clients."""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._listener: asyncio.Task | None = None
+
+    def subscribe(self, topic: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_CLIENT_QUEUE_SIZE)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        self._ensure_listener()
+        return queue
+
+    def unsubscribe(self, topic: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(topic)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            self._subscribers.pop(topic, None)
+
+    def dispatch(self, raw_message: str) -> None:
+        try:
+            message = json.loads(raw_message)
+            topic = message["topic"]
+            item = (message["event"], message.get("data") or {})
+        except (json.JSONDecodeError, KeyError, TypeError):
+            return
+        for queue in list(self._subscribers.get(topic, ())):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # Slow clients drop deltas and re-sync on their next full fetch.
+                continue
+
+    def _ensure_listener(self) -> None:
+        if not REDIS_ENABLED:
+            return
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            # No socket timeout: the subscription idles between messages by design.
+            client = aioredis.Redis.from_url(
+                REDIS_URL, decode_responses=True, socket_connect_timeout=REDIS_CONNECT_TIMEOUT_SECONDS
+            )
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                LOGGER.warning("Live event subscription failed; retrying", exc_info=True)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+    async def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+        self._listener = None
+
+    async def stream(self, topic: str, request: Request) -> AsyncIterator[str]:
+        queue = self.subscribe(topic)
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            self.unsubscribe(topic, queue)
+
+
+broker = EventBroker()
@@ -7,3 +7,4 @@ from .comment_actions import router as comment_actions_router
 from .notifications import router as notifications_router
 from .comments_feed import router as comments_feed_router
 from .comment_votes import router as comment_votes_router
+from .items import router as items_router
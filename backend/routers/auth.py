@@ -7,28 +7,28 @@ from auth import create_access_token, revoke_token, verify_token, ACCESS_TOKEN_E
 from auth.deps import get_current_user, get_current_token
 from schemas import UserCreate, User, Token, UserLogin, Availability, Message
 from services import UserService
-from rate_limit import rate_limit
+from rate_limit import rate_limit, auth_rate_limit
 
 router = APIRouter()
 
 @router.post("/register", response_model=User)
-def register(
+async def register(
     user: UserCreate,
     db: Session = Depends(get_db),
-    rate_limited: bool = Depends(rate_limit())
+    rate_limited: bool = Depends(auth_rate_limit())
 ):
     """Register a new user account."""
-    return UserService.create_user(db, user)
+    return await UserService.register_user(db, user)
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     user_credentials: UserLogin,
     response: Response,
     db: Session = Depends(get_db),
-    rate_limited: bool = Depends(rate_limit())
+    rate_limited: bool = Depends(auth_rate_limit())
 ):
     """Authenticate a user and return a bearer token."""
-    user = UserService.authenticate_user(db, user_credentials.username, user_credentials.password)
+    user = await UserService.authenticate_user_async(db, user_credentials.username, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
 from schemas import CommentCreate, CommentWithUser, Comment, QueuedWriteResponse
-from services import CommentService
+from services import CommentService, PostService
+from services.event_service import EventService
+from realtime import broker
 from auth.deps import get_current_user
 from models import User
 from rate_limit import rate_limit
@@ -36,3 +39,20 @@ def get_comments_for_post(
 ):
     """Return the threaded comments for a post."""
     return CommentService.get_comments_for_post(db, post_id)
+
+@router.get("/{post_id}/comments/stream")
+def stream_comments_for_post(
+    post_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    rate_limited: bool = Depends(rate_limit())
+):
+    """Stream live thread updates (new/deleted comments, point changes) for a post (SSE)."""
+    PostService.get_post(db, post_id)
+    # Release the pooled connection; the stream can stay open for a long time.
+    db.close()
+    return StreamingResponse(
+        broker.stream(EventService.thread_topic(post_id), request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
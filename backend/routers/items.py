@@ -0,0 +1,22 @@
+from fastapi import APIRouter, BackgroundTasks, Depends
+from sqlalchemy.orm import Session
+from database import get_db
+from schemas import Item
+from services import ItemService
+from auth.deps import get_current_user_optional
+from models import User
+from rate_limit import rate_limit
+
+router = APIRouter()
+
+
+@router.get("/{post_id}", response_model=Item)
+def get_item(
+    post_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_current_user_optional),
+    rate_limited: bool = Depends(rate_limit())
+):
+    """Return a post, its comment thread and the caller's votes for the item page."""
+    return ItemService.get_item(db, post_id, current_user.id if current_user else None, background_tasks)
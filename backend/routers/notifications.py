@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
-from schemas import Notification, Message, UnreadCount
+from schemas import Notification, Message, UnreadCount, NotificationBulkRead, NotificationBulkReadResult
 from services import NotificationService
+from services.event_service import EventService
+from realtime import broker
 from auth.deps import get_current_user
 from models import User
 from rate_limit import rate_limit
@@ -14,12 +17,31 @@ router = APIRouter()
 def get_notifications(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    before_id: int | None = Query(None, ge=1),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     rate_limited: bool = Depends(rate_limit())
 ):
-    """List notifications for the authenticated user."""
-    return NotificationService.get_user_notifications(db, current_user.id, skip=skip, limit=limit)
+    """List notifications for the authenticated user, newest first.
+
+    Pass the last seen notification id as `before_id` to fetch the next page.
+    """
+    return NotificationService.get_user_notifications(
+        db, current_user.id, skip=skip, limit=limit, before_id=before_id
+    )
+
+@router.put("/read", response_model=NotificationBulkReadResult)
+def mark_many_as_read(
+    payload: NotificationBulkRead,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    rate_limited: bool = Depends(rate_limit())
+):
+    """Mark a list of notifications, or all up to an id, as read in one update."""
+    updated = NotificationService.mark_notifications_as_read(
+        db, current_user.id, ids=payload.ids, up_to_id=payload.up_to_id
+    )
+    return {"updated": updated}
 
 @router.put("/{notification_id}/read", response_model=Message)
 def mark_as_read(
@@ -41,3 +63,20 @@ def get_unread_count(
     """Return the count of unread notifications."""
     count = NotificationService.get_unread_count(db, current_user.id)
     return {"unread_count": count}
+
+@router.get("/stream")
+def stream_notifications(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    rate_limited: bool = Depends(rate_limit())
+):
+    """Stream live notification events for the authenticated user (SSE)."""
+    topic = EventService.user_topic(current_user.id)
+    # Release the pooled connection; the stream can stay open for a long time.
+    db.close()
+    return StreamingResponse(
+        broker.stream(topic, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
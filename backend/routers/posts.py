@@ -1,11 +1,11 @@
 from datetime import date
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
-from schemas import PostCreate, Post
-from services import PostService
-from auth.deps import get_current_user
+from schemas import PostCreate, Post, FeedPost
+from services import PostService, VoteService
+from auth.deps import get_current_user, get_current_user_optional
 from models import User
 from rate_limit import rate_limit
 
@@ -21,18 +21,23 @@ def create_post(
     """Create a new post for the authenticated user."""
     return PostService.create_post(db, post, current_user.id)
 
-@router.get("/", response_model=List[Post])
+@router.get("/", response_model=List[FeedPost])
 def get_posts(
+    background_tasks: BackgroundTasks,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     sort: str = Query("new", pattern="^(new|past)$"),
     day: date | None = Query(None),
     post_type: str | None = Query(None, pattern="^(story|ask|show|job)$"),
+    include_votes: bool = Query(False),
     db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_current_user_optional),
     rate_limited: bool = Depends(rate_limit())
 ):
-    """List posts with optional paging, sorting, and filtering."""
+    """List posts with optional paging, sorting, filtering and the caller's votes."""
     posts = PostService.get_posts(db, skip=skip, limit=limit, sort=sort, day=day, post_type=post_type)
+    if include_votes and current_user:
+        return VoteService.with_viewer_votes(db, current_user.id, posts, background_tasks)
     return posts
 
 @router.get("/search", response_model=List[Post])
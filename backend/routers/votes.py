@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from database import get_db
 from schemas import VoteCreate, VoteStatus, VoteBulkRequest, VoteStatusWithPost, QueuedVoteResponse
@@ -13,12 +13,13 @@ router = APIRouter()
 @router.post("/votes/bulk", response_model=list[VoteStatusWithPost])
 def get_user_votes_bulk(
     payload: VoteBulkRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     rate_limited: bool = Depends(rate_limit())
 ):
     """Return the current user's votes for a list of posts."""
-    return VoteService.get_user_votes_for_posts(db, current_user.id, payload.post_ids)
+    return VoteService.get_user_votes_for_posts(db, current_user.id, payload.post_ids, background_tasks)
 
 @router.post("/{post_id}/vote", response_model=VoteStatus | QueuedVoteResponse)
 def vote_on_post(
@@ -6,3 +6,4 @@ from .vote import *
 from .notification import *
 from .comment_vote import *
 from .common import *
+from .item import *
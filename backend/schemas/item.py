@@ -0,0 +1,16 @@
+from typing import List
+from pydantic import BaseModel
+from .post import Post
+from .comment import CommentWithUser
+from .comment_vote import CommentVoteStatusWithComment
+
+
+class ItemViewer(BaseModel):
+    post_vote: int
+    comment_votes: List[CommentVoteStatusWithComment]  # Only comments the viewer voted on
+
+
+class Item(BaseModel):
+    post: Post
+    comments: List[CommentWithUser]
+    viewer: ItemViewer | None = None
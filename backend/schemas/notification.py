@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, model_validator
 from datetime import datetime
 from typing import Optional
 from models import NotificationType
@@ -18,3 +18,18 @@ class Notification(NotificationBase):
     actor_username: str  # Add actor username
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class NotificationBulkRead(BaseModel):
+    ids: Optional[list[int]] = None
+    up_to_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def validate_selector(self):
+        if (self.ids is None) == (self.up_to_id is None):
+            raise ValueError("Provide either ids or up_to_id")
+        return self
+
+
+class NotificationBulkReadResult(BaseModel):
+    updated: int
@@ -39,3 +39,6 @@ class Post(PostBase):
 
 class PostWithUser(Post):
     username: str
+
+class FeedPost(Post):
+    vote_type: int | None = None  # Set only when the feed is requested with include_votes
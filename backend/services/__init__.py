@@ -5,3 +5,4 @@ from .vote_service import VoteService
 from .comment_service import CommentService
 from .notification_service import NotificationService
 from .comment_vote_service import CommentVoteService
+from .item_service import ItemService
@@ -0,0 +1,132 @@
+import os
+from sqlalchemy.orm import Session
+import cache_codec
+from cache import redis_get, redis_incr_many, redis_set_nx, redis_setex
+from services.comment_service import CommentService
+from services.post_service import PostService
+
+WARM_FEED_PAGES = int(os.getenv("WARM_FEED_PAGES", "2"))
+WARM_THREAD_POSTS = int(os.getenv("WARM_THREAD_POSTS", "30"))
+
+
+class CacheWarmingService:
+    """Rebuilds the most-read cache entries before readers need them.
+
+    Refreshes are warm-then-flip: entries are written under the next version
+    and only then is the version bumped, so readers move straight onto a warm
+    cache. Versions bumped elsewhere (the API) are warmed after the fact.
+    """
+
+    # Held for one refresh interval so that only one worker refreshes per interval.
+    REFRESH_LOCK_KEY = "feed:refresh:lock"
+    # The version the last refresh flipped to and the hot threads it warmed.
+    LAST_REFRESH_KEY = "feed:refresh:last"
+    LAST_REFRESH_TTL_SECONDS = 3600
+
+    # Matches the frontend's POSTS_PER_PAGE; other page sizes are cached on demand.
+    FEED_PAGE_SIZE = 30
+    # (sort, post_type) for the home, ask, show, jobs and past pages.
+    FEED_VARIANTS = (
+        ("new", None),
+        ("new", "ask"),
+        ("new", "show"),
+        ("new", "job"),
+        ("past", None),
+    )
+
+    @staticmethod
+    def current_feed_version() -> int | None:
+        raw = redis_get("feed:version")
+        try:
+            return int(raw) if raw is not None else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def warm_feeds(db: Session, version: int, pages: int = WARM_FEED_PAGES) -> list[int]:
+        """Cache the first ``pages`` of every feed variant under ``version``.
+
+        Returns the ids on the first page of each variant, capped at
+        ``WARM_THREAD_POSTS``; these are the threads worth keeping warm.
+        """
+        hot_post_ids: list[int] = []
+        for sort, post_type in CacheWarmingService.FEED_VARIANTS:
+            for page in range(pages):
+                posts = PostService.warm_feed_page(
+                    db,
+                    version,
+                    sort,
+                    page * CacheWarmingService.FEED_PAGE_SIZE,
+                    CacheWarmingService.FEED_PAGE_SIZE,
+                    post_type,
+                )
+                if page == 0:
+                    hot_post_ids.extend(post["id"] for post in posts)
+        return list(dict.fromkeys(hot_post_ids))[:WARM_THREAD_POSTS]
+
+    @staticmethod
+    def claim_refresh(owner: str, interval_seconds: int) -> bool:
+        """Whether ``owner`` runs this interval's refresh; True when Redis cannot say."""
+        ttl = max(interval_seconds - 1, 1)
+        return redis_set_nx(CacheWarmingService.REFRESH_LOCK_KEY, owner, ttl) is not False
+
+    @staticmethod
+    def record_refresh(version: int, threads: dict[int, int] | None) -> None:
+        """Publish a refresh to peers; ``threads`` is None until the hot threads are warmed."""
+        value = {"version": version, "threads": None if threads is None else list(threads.items())}
+        redis_setex(
+            CacheWarmingService.LAST_REFRESH_KEY,
+            CacheWarmingService.LAST_REFRESH_TTL_SECONDS,
+            cache_codec.encode(value),
+        )
+
+    @staticmethod
+    def last_refresh() -> dict | None:
+        """``{"version", "threads"}`` of the latest refresh by any worker, or None."""
+        raw = redis_get(CacheWarmingService.LAST_REFRESH_KEY)
+        if raw is None:
+            return None
+        try:
+            value = cache_codec.decode(raw)
+            threads = value["threads"]
+            return {
+                "version": int(value["version"]),
+                "threads": None if threads is None else {int(post_id): int(v) for post_id, v in threads},
+            }
+        except (ValueError, TypeError, KeyError):
+            return None
+
+    @staticmethod
+    def refresh_feeds(db: Session, pages: int = WARM_FEED_PAGES) -> tuple[int, list[int]]:
+        """Warm the next feed version, then flip readers onto it; returns (version, hot post ids)."""
+        version = (CacheWarmingService.current_feed_version() or 0) + 1
+        hot_post_ids = CacheWarmingService.warm_feeds(db, version, pages)
+        # Recorded before the flip so peers never mistake it for an API bump.
+        CacheWarmingService.record_refresh(version, None)
+        PostService.bump_feed_cache_version()
+        return version, hot_post_ids
+
+    @staticmethod
+    def refresh_threads(db: Session, post_ids: list[int]) -> dict[int, int]:
+        """Warm each thread under its next version, then bump the versions; returns the new versions."""
+        if not post_ids:
+            return {}
+        current = CommentService.get_comments_cache_versions(post_ids)
+        versions = {post_id: (version or 0) + 1 for post_id, version in current.items()}
+        CommentService.warm_threads(db, versions)
+        redis_incr_many([f"post:{post_id}:comments:v" for post_id in post_ids])
+        return versions
+
+    @staticmethod
+    def warm_stale_threads(db: Session, warmed: dict[int, int]) -> dict[int, int]:
+        """Warm threads whose version moved since ``warmed`` recorded it; returns the versions warmed."""
+        if not warmed:
+            return {}
+        current = CommentService.get_comments_cache_versions(list(warmed))
+        stale = {
+            post_id: version
+            for post_id, version in current.items()
+            if version is not None and version != warmed[post_id]
+        }
+        CommentService.warm_threads(db, stale)
+        return stale
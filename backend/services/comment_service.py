@@ -1,15 +1,40 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from datetime import datetime, timezone
-import json
+import cache_codec
 from models import Comment, NotificationType, User, Post, Notification
 from schemas import CommentCreate, CommentUpdate
-from cache import redis_get, redis_setex, redis_incr
+from cache import (
+    redis_get,
+    redis_id_list_range,
+    redis_incr,
+    redis_incr_many,
+    redis_mget,
+    redis_push_ids,
+    redis_rebuild_id_list,
+    redis_setex,
+)
+from services.hydration_service import HydrationService
 from services.queue_service import enqueue_write, queue_writes_enabled, WriteEventType
+from services.notification_service import NotificationService
+from services.event_service import EventService, LiveEventType
 from fastapi import HTTPException
 
 class CommentService:
     COMMENTS_CACHE_TTL_SECONDS = 300
+    # Newest comment ids, pushed on create and read by GET /comments/recent.
+    # The list is served only while its marker says it was rebuilt in full;
+    # deeper pages go to Postgres and the TTL forces a periodic full rebuild.
+    RECENT_COMMENTS_KEY = "comments:recent"
+    RECENT_COMMENTS_COMPLETE_KEY = "comments:recent:complete"
+    RECENT_COMMENTS_LIMIT = 3000
+    RECENT_COMMENTS_TTL_SECONDS = 86400
+    # Cached threads store one row per comment in thread order, [depth, *fields].
+    # post_id, prev_id, next_id and replies are rebuilt on read.
+    THREAD_CACHE_FIELDS = (
+        "id", "text", "user_id", "parent_id", "root_id", "is_deleted",
+        "points", "created_at", "updated_at", "username",
+    )
 
     @staticmethod
     def _reply_rank_score(comment: dict) -> float:
@@ -89,6 +114,38 @@ class CommentService:
             walk(top_level)
         return ordered
 
+    @staticmethod
+    def _pack_thread(top_level_comments: list[dict]) -> dict:
+        rows: list[list] = []
+
+        def walk(node: dict, depth: int) -> None:
+            rows.append([depth, *(node[field] for field in CommentService.THREAD_CACHE_FIELDS)])
+            for reply in node["replies"]:
+                walk(reply, depth + 1)
+
+        for top_level in top_level_comments:
+            walk(top_level, 0)
+        return {"fields": list(CommentService.THREAD_CACHE_FIELDS), "rows": rows}
+
+    @staticmethod
+    def _unpack_thread(packed, post_id: int) -> list[dict]:
+        if isinstance(packed, list):
+            # Written before the compact layout; already nested.
+            return packed
+        if packed.get("fields") != list(CommentService.THREAD_CACHE_FIELDS):
+            raise ValueError("stale-cache")
+
+        top_level_comments: list[dict] = []
+        path: list[dict] = []
+        for depth, *values in packed["rows"]:
+            node = dict(zip(CommentService.THREAD_CACHE_FIELDS, values))
+            node.update(post_id=post_id, prev_id=None, next_id=None, replies=[])
+            del path[depth:]
+            (path[-1]["replies"] if path else top_level_comments).append(node)
+            path.append(node)
+        CommentService._apply_thread_navigation(top_level_comments)
+        return top_level_comments
+
     @staticmethod
     def _apply_thread_navigation(top_level_comments: list[dict]) -> None:
         ordered = CommentService._flatten_thread(top_level_comments)
@@ -121,6 +178,10 @@ class CommentService:
     def bump_comments_cache_version(post_id: int) -> None:
         redis_incr(f"post:{post_id}:comments:v")
 
+    @staticmethod
+    def bump_comments_cache_versions(post_ids) -> None:
+        redis_incr_many([f"post:{post_id}:comments:v" for post_id in post_ids])
+
     @staticmethod
     def create_comment(db: Session, comment: CommentCreate, post_id: int, user_id: int) -> dict:
         if not comment.text or not comment.text.strip():
@@ -151,6 +212,10 @@ class CommentService:
             )
             return {"status": "queued", "request_id": request_id}
 
+        # The authenticated user and the post are already in this session's identity map.
+        actor = db.get(User, user_id)
+        username = actor.username if actor else None
+
         db_comment = Comment(
             text=comment.text,
             user_id=user_id,
@@ -159,21 +224,11 @@ class CommentService:
             root_id=root_id,
         )
         db.add(db_comment)
-        db.commit()
-        db.refresh(db_comment)
+        # The INSERT returns id and timestamps, so the response is complete without a refresh.
+        db.flush()
         if comment.parent_id is None:
             db_comment.root_id = db_comment.id
-            db.commit()
-            db.refresh(db_comment)
-
-        # Create notification
-        CommentService._create_notification_for_comment(db, db_comment)
-        CommentService.bump_comments_cache_version(post_id)
-
-        # Get username
-        user = db.query(User).filter(User.id == user_id).first()
-        
-        return {
+        created = {
             "id": db_comment.id,
             "text": db_comment.text,
             "user_id": db_comment.user_id,
@@ -184,9 +239,23 @@ class CommentService:
             "points": db_comment.points,
             "created_at": db_comment.created_at,
             "updated_at": db_comment.updated_at,
-            "username": user.username,
+            "username": username,
         }
 
+        # Comment, root id and notifications go out in one transaction.
+        notifications = CommentService._add_comment_notifications(db, db_comment)
+        db.commit()
+        CommentService._announce_comment_notifications(notifications)
+        CommentService.bump_comments_cache_version(post_id)
+        HydrationService.bump_post_versions([post_id])
+        CommentService.record_recent_comments([created["id"]])
+        EventService.publish_thread_event(
+            post_id,
+            LiveEventType.COMMENT_CREATED,
+            {"comment_id": created["id"], "parent_id": created["parent_id"]},
+        )
+        return created
+
     @staticmethod
     def get_comment(db: Session, comment_id: int) -> Comment:
         comment = db.query(Comment).filter(Comment.id == comment_id).first()
@@ -199,16 +268,26 @@ class CommentService:
         post = db.query(Post).filter(Post.id == post_id).first()
         if not post:
             raise HTTPException(status_code=404, detail="Post not found")
+        return CommentService.get_thread(db, post_id)
 
+    @staticmethod
+    def get_thread(db: Session, post_id: int) -> list[dict]:
+        """Threaded comments for a post the caller has already checked exists."""
         cache_version = CommentService._get_comments_cache_version(post_id)
         cache_key = CommentService._comments_cache_key(post_id, cache_version)
         cached = redis_get(cache_key)
         if cached:
             try:
-                return json.loads(cached)
-            except (json.JSONDecodeError, TypeError):
+                return CommentService._unpack_thread(cache_codec.decode(cached), post_id)
+            except (ValueError, TypeError, KeyError):
                 pass
 
+        thread = CommentService._load_thread(db, post_id)
+        CommentService._store_thread(post_id, cache_version, thread)
+        return thread
+
+    @staticmethod
+    def _load_thread(db: Session, post_id: int) -> list[dict]:
         results = db.query(
             Comment,
             User.username
@@ -217,78 +296,84 @@ class CommentService:
         ).filter(
             Comment.post_id == post_id
         ).order_by(desc(Comment.created_at)).all()
+        return CommentService._build_thread(results)
 
-        thread = CommentService._build_thread(results)
+    @staticmethod
+    def _store_thread(post_id: int, version: int, thread: list[dict]) -> None:
         redis_setex(
-            cache_key,
+            CommentService._comments_cache_key(post_id, version),
             CommentService.COMMENTS_CACHE_TTL_SECONDS,
-            json.dumps(thread, default=CommentService._serialize_datetime),
+            cache_codec.encode(CommentService._pack_thread(thread), default=CommentService._serialize_datetime),
         )
-        return thread
 
     @staticmethod
-    def get_recent_comments(db: Session, skip: int = 0, limit: int = 30) -> list[dict]:
-        results = db.query(
-            Comment,
-            User.username,
-            Post.title
-        ).select_from(Comment).join(
-            User, Comment.user_id == User.id
-        ).join(
-            Post, Comment.post_id == Post.id
-        ).order_by(Comment.created_at.desc()).offset(skip).limit(limit).all()
+    def get_comments_cache_versions(post_ids: list[int]) -> dict[int, int | None]:
+        """Current thread cache version per post; None where no version exists yet."""
+        values = redis_mget([f"post:{post_id}:comments:v" for post_id in post_ids])
+        versions: dict[int, int | None] = {}
+        for post_id, value in zip(post_ids, values):
+            try:
+                versions[post_id] = int(value) if value is not None else None
+            except ValueError:
+                versions[post_id] = None
+        return versions
 
-        recent_comments = []
-        for comment, username, post_title in results:
-            recent_comments.append({
-                "id": comment.id,
-                "text": comment.text,
-                "user_id": comment.user_id,
-                "post_id": comment.post_id,
-                "parent_id": comment.parent_id,
-                "root_id": comment.root_id,
-                "is_deleted": comment.is_deleted,
-                "points": comment.points,
-                "created_at": comment.created_at,
-                "updated_at": comment.updated_at,
-                "username": username,
-                "post_title": post_title
-            })
+    @staticmethod
+    def warm_threads(db: Session, versions: dict[int, int]) -> None:
+        """Build each post's thread and cache it under the given version."""
+        for post_id, version in versions.items():
+            CommentService._store_thread(post_id, version, CommentService._load_thread(db, post_id))
 
-        return recent_comments
+    @staticmethod
+    def record_recent_comments(comment_ids: list[int]) -> None:
+        """Push new comments, oldest first, onto the recent-comments list."""
+        redis_push_ids(CommentService.RECENT_COMMENTS_KEY, comment_ids, CommentService.RECENT_COMMENTS_LIMIT)
 
     @staticmethod
-    def get_comment_detail(db: Session, comment_id: int) -> dict:
-        result = db.query(
-            Comment,
-            User.username,
-            Post.title
-        ).select_from(Comment).join(
-            User, Comment.user_id == User.id
-        ).join(
-            Post, Comment.post_id == Post.id
-        ).filter(
-            Comment.id == comment_id
-        ).first()
+    def _latest_comment_ids(db: Session, skip: int, limit: int) -> list[int]:
+        rows = db.query(Comment.id).order_by(
+            Comment.created_at.desc(), Comment.id.desc()
+        ).offset(skip).limit(limit).all()
+        return [comment_id for (comment_id,) in rows]
 
-        if not result:
-            raise HTTPException(status_code=404, detail="Comment not found")
+    @staticmethod
+    def _recent_comment_ids(db: Session, skip: int, limit: int) -> list[int]:
+        if skip + limit > CommentService.RECENT_COMMENTS_LIMIT:
+            return CommentService._latest_comment_ids(db, skip, limit)
+
+        cached = redis_id_list_range(
+            CommentService.RECENT_COMMENTS_KEY,
+            CommentService.RECENT_COMMENTS_COMPLETE_KEY,
+            skip,
+            skip + limit - 1,
+        )
+        if cached is not None:
+            try:
+                return [int(comment_id) for comment_id in cached]
+            except ValueError:
+                pass
 
-        comment, username, post_title = result
-        return {
-            "id": comment.id,
-            "text": comment.text,
-            "user_id": comment.user_id,
-            "post_id": comment.post_id,
-            "parent_id": comment.parent_id,
-            "root_id": comment.root_id,
-            "is_deleted": comment.is_deleted,
-            "points": comment.points,
-            "created_at": comment.created_at,
-            "updated_at": comment.updated_at,
-            "username": username,
-            "post_title": post_title,
-        }
+        recent_ids = CommentService._latest_comment_ids(db, 0, CommentService.RECENT_COMMENTS_LIMIT)
+        # Comments committed after this read are pushed meanwhile; the rebuild keeps them.
+        redis_rebuild_id_list(
+            CommentService.RECENT_COMMENTS_KEY,
+            CommentService.RECENT_COMMENTS_COMPLETE_KEY,
+            recent_ids,
+            CommentService.RECENT_COMMENTS_LIMIT,
+            CommentService.RECENT_COMMENTS_TTL_SECONDS,
+        )
+        return recent_ids[skip:skip + limit]
+
+    @staticmethod
+    def get_recent_comments(db: Session, skip: int = 0, limit: int = 30) -> list[dict]:
+        return HydrationService.get_comments_by_ids(db, CommentService._recent_comment_ids(db, skip, limit))
+
+    @staticmethod
+    def get_comment_detail(db: Session, comment_id: int) -> dict:
+        comments = HydrationService.get_comments_by_ids(db, [comment_id])
+        if not comments:
+            raise HTTPException(status_code=404, detail="Comment not found")
+        return comments[0]
 
     @staticmethod
     def update_comment(db: Session, comment_id: int, comment_update: CommentUpdate, user_id: int) -> dict:
@@ -296,14 +381,15 @@ class CommentService:
         if comment.user_id != user_id:
             raise HTTPException(status_code=403, detail="Not authorized to update this comment")
 
+        # Read before commit so the already-loaded user is not reloaded.
+        username = db.get(User, comment.user_id).username
+
         comment.text = comment_update.text
         db.commit()
         db.refresh(comment)
         CommentService.bump_comments_cache_version(comment.post_id)
-        
-        # Get username
-        user = db.query(User).filter(User.id == comment.user_id).first()
-        
+        HydrationService.invalidate_comments([comment.id])
+
         return {
             "id": comment.id,
             "text": comment.text,
@@ -315,7 +401,7 @@ class CommentService:
             "points": comment.points,
             "created_at": comment.created_at,
             "updated_at": comment.updated_at,
-            "username": user.username,
+            "username": username,
         }
 
     @staticmethod
@@ -335,16 +421,27 @@ class CommentService:
         comment.text = "[deleted]"
         db.commit()
         CommentService.bump_comments_cache_version(comment.post_id)
+        HydrationService.bump_post_versions([comment.post_id])
+        HydrationService.invalidate_comments([comment_id])
+        EventService.publish_thread_event(comment.post_id, LiveEventType.COMMENT_DELETED, {"comment_id": comment_id})
 
     @staticmethod
     def _create_notification_for_comment(db: Session, comment: Comment):
-        # Get the post and user info
-        post = db.query(Post).filter(Post.id == comment.post_id).first()
-        actor = db.query(User).filter(User.id == comment.user_id).first()
+        notifications = CommentService._add_comment_notifications(db, comment)
+        db.commit()
+        CommentService._announce_comment_notifications(notifications)
+
+    @staticmethod
+    def _add_comment_notifications(db: Session, comment: Comment) -> list[dict]:
+        """Stage notifications for a new comment without committing; returns their payloads."""
+        # db.get() is served from the identity map when the caller already loaded these rows.
+        post = db.get(Post, comment.post_id)
+        actor = db.get(User, comment.user_id)
 
         if not post or not actor:
-            return
-        
+            return []
+
+        created: list[dict] = []
         # Notify post author if someone comments on their post
         if comment.user_id != post.user_id:
             notification = Notification(
@@ -356,13 +453,17 @@ class CommentService:
                 message=f"{actor.username} commented on your post '{post.title}'"
             )
             db.add(notification)
+            created.append({
+                "user_id": post.user_id,
+                "type": NotificationType.COMMENT_ON_POST.value,
+                "post_id": post.id,
+                "comment_id": comment.id,
+            })
 
         # Notify parent comment author if it's a reply
         if comment.parent_id:
-            parent_comment = db.query(Comment).filter(Comment.id == comment.parent_id).first()
-            if not parent_comment:
-                return
-            if comment.user_id != parent_comment.user_id:
+            parent_comment = db.get(Comment, comment.parent_id)
+            if parent_comment and comment.user_id != parent_comment.user_id:
                 notification = Notification(
                     user_id=parent_comment.user_id,
                     actor_id=comment.user_id,
@@ -372,5 +473,20 @@ class CommentService:
                     message=f"{actor.username} replied to your comment"
                 )
                 db.add(notification)
+                created.append({
+                    "user_id": parent_comment.user_id,
+                    "type": NotificationType.REPLY_TO_COMMENT.value,
+                    "post_id": post.id,
+                    "comment_id": comment.id,
+                })
+        return created
 
-        db.commit()
+    @staticmethod
+    def _announce_comment_notifications(notifications: list[dict]) -> None:
+        amounts: dict[int, int] = {}
+        for notification in notifications:
+            amounts[notification["user_id"]] = amounts.get(notification["user_id"], 0) + 1
+        NotificationService.bump_unread_counts(amounts)
+        for notification in notifications:
+            user_id = notification.pop("user_id")
+            EventService.publish_notification(user_id, notification)
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from models import CommentVote, Comment
 from schemas import CommentVoteCreate
+from services.hydration_service import HydrationService
 from services.queue_service import enqueue_write, queue_writes_enabled, WriteEventType
 from fastapi import HTTPException
 
@@ -16,7 +17,7 @@ class CommentVoteService:
         if queue_writes_enabled():
             return enqueue_write(
                 WriteEventType.COMMENT_VOTE_ADD,
-                {"user_id": user_id, "comment_id": comment_id},
+                {"user_id": user_id, "comment_id": comment_id, "post_id": comment.post_id},
             )
 
         existing_vote = db.query(CommentVote).filter(
@@ -37,6 +38,7 @@ class CommentVoteService:
         try:
             db.commit()
             db.refresh(db_vote)
+            HydrationService.invalidate_comments([comment_id])
             return db_vote
         except IntegrityError:
             db.rollback()
@@ -62,7 +64,7 @@ class CommentVoteService:
         if queue_writes_enabled():
             return enqueue_write(
                 WriteEventType.COMMENT_VOTE_REMOVE,
-                {"user_id": user_id, "comment_id": comment_id},
+                {"user_id": user_id, "comment_id": comment_id, "post_id": comment.post_id},
             )
 
         existing_vote = db.query(CommentVote).filter(
@@ -75,6 +77,7 @@ class CommentVoteService:
                 {Comment.points: Comment.points - 1}
             )
             db.commit()
+            HydrationService.invalidate_comments([comment_id])
 
     @staticmethod
     def get_user_votes_for_comments(db: Session, user_id: int, comment_ids: list[int]) -> list[dict]:
@@ -90,3 +93,14 @@ class CommentVoteService:
             {"comment_id": comment_id, "vote_type": vote_map.get(comment_id, 0)}
             for comment_id in unique_ids
         ]
+
+    @staticmethod
+    def get_user_votes_for_post_comments(db: Session, user_id: int, post_id: int) -> list[dict]:
+        """Votes the user has cast on a post's comments; unvoted comments are omitted."""
+        votes = db.query(CommentVote.comment_id).join(
+            Comment, Comment.id == CommentVote.comment_id
+        ).filter(
+            CommentVote.user_id == user_id,
+            Comment.post_id == post_id
+        ).all()
+        return [{"comment_id": comment_id, "vote_type": 1} for (comment_id,) in votes]
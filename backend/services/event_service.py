@@ -0,0 +1,38 @@
+import json
+import os
+from cache import redis_publish
+
+
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "hn:events")
+
+
+class LiveEventType:
+    NOTIFICATION_CREATED = "notification.created"
+    COMMENT_CREATED = "comment.created"
+    COMMENT_DELETED = "comment.deleted"
+    COMMENT_POINTS = "comment.points"
+    POST_POINTS = "post.points"
+
+
+class EventService:
+    """Publish live deltas on a single pub/sub channel; API processes fan them out by topic."""
+
+    @staticmethod
+    def user_topic(user_id: int) -> str:
+        return f"user:{user_id}"
+
+    @staticmethod
+    def thread_topic(post_id: int) -> str:
+        return f"post:{post_id}"
+
+    @staticmethod
+    def publish(topic: str, event: str, data: dict) -> None:
+        redis_publish(EVENTS_CHANNEL, json.dumps({"topic": topic, "event": event, "data": data}))
+
+    @staticmethod
+    def publish_notification(user_id: int, data: dict) -> None:
+        EventService.publish(EventService.user_topic(user_id), LiveEventType.NOTIFICATION_CREATED, data)
+
+    @staticmethod
+    def publish_thread_event(post_id: int, event: str, data: dict) -> None:
+        EventService.publish(EventService.thread_topic(post_id), event, data | {"post_id": post_id})
@@ -0,0 +1,275 @@
+import time
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+import cache_codec
+from models import Post, User, Comment
+from cache import redis_delete, redis_get, redis_incr_many, redis_mget, redis_set_nx, redis_setex_many
+
+
+class HydrationService:
+    """Turns ids into the dicts the API returns, one cached object per id.
+
+    Lookups read every ``post:{id}:obj`` / ``user:{id}:obj`` /
+    ``comment:{id}:obj`` key with a single MGET and load only the misses, in
+    one batched query, before writing them back in one pipeline. Results keep
+    the order of the ids passed in; ids that do not exist are left out.
+
+    A post is cached in two parts: the fields that never change, and its points
+    and comment count in ``post:{id}:counts``. The counts carry the version of
+    ``post:{id}:obj:v`` they were read under, so a version bump makes only
+    them stale and they are reloaded without the rest of the post.
+    """
+
+    POST_CACHE_TTL_SECONDS = 3600
+    USER_CACHE_TTL_SECONDS = 3600
+    # Edits and deletes drop a cached comment; the TTL bounds the points shown.
+    COMMENT_CACHE_TTL_SECONDS = 300
+    POST_FIELDS = (
+        "id", "title", "url", "text", "post_type", "points",
+        "comment_count", "user_id", "created_at", "username",
+    )
+    # A lone post rebuild is a single query; waiting longer than this means the
+    # process holding the lock is gone and the caller should load it itself.
+    SINGLE_FLIGHT_LOCK_SECONDS = 5
+    SINGLE_FLIGHT_WAIT_SECONDS = 0.5
+    SINGLE_FLIGHT_POLL_SECONDS = 0.05
+
+    @staticmethod
+    def _post_key(post_id: int) -> str:
+        return f"post:{post_id}:obj"
+
+    @staticmethod
+    def _post_counts_key(post_id: int) -> str:
+        return f"post:{post_id}:counts"
+
+    @staticmethod
+    def _post_version_key(post_id: int) -> str:
+        return f"post:{post_id}:obj:v"
+
+    @staticmethod
+    def _user_key(user_id: int) -> str:
+        return f"user:{user_id}:obj"
+
+    @staticmethod
+    def _comment_key(comment_id: int) -> str:
+        return f"comment:{comment_id}:obj"
+
+    @staticmethod
+    def _serialize_datetime(value):
+        return value.isoformat() if hasattr(value, "isoformat") else value
+
+    @staticmethod
+    def _decode(raw):
+        if raw is None:
+            return None
+        try:
+            return cache_codec.decode(raw)
+        except (ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _hydrate(ids: list[int], key_for, load_missing, ttl_seconds: int) -> list[dict]:
+        unique_ids = list(dict.fromkeys(ids))
+        found: dict[int, dict] = {}
+        for object_id, raw in zip(unique_ids, redis_mget([key_for(object_id) for object_id in unique_ids])):
+            value = HydrationService._decode(raw)
+            if value is not None:
+                found[object_id] = value
+
+        missing = [object_id for object_id in unique_ids if object_id not in found]
+        if missing:
+            loaded = load_missing(missing)
+            found.update(loaded)
+            redis_setex_many(
+                {key_for(object_id): cache_codec.encode(value) for object_id, value in loaded.items()},
+                ttl_seconds,
+            )
+        return [found[object_id] for object_id in ids if object_id in found]
+
+    @staticmethod
+    def _comment_counts_subquery(db: Session, post_ids: list[int]):
+        # Count comments for the requested posts only, never the whole table.
+        return db.query(
+            Comment.post_id.label("post_id"),
+            func.count(Comment.id).label("comment_count")
+        ).filter(Comment.post_id.in_(post_ids)).group_by(Comment.post_id).subquery()
+
+    @staticmethod
+    def _read_posts(post_ids: list[int]) -> tuple[dict[int, dict], dict[int, dict], dict[int, int]]:
+        """Cached bodies, counts still valid for the current version, and versions, in one MGET."""
+        keys = []
+        for post_id in post_ids:
+            keys.extend((
+                HydrationService._post_key(post_id),
+                HydrationService._post_counts_key(post_id),
+                HydrationService._post_version_key(post_id),
+            ))
+        values = redis_mget(keys)
+        bodies: dict[int, dict] = {}
+        counts: dict[int, dict] = {}
+        versions: dict[int, int] = {}
+        for index, post_id in enumerate(post_ids):
+            raw_body, raw_counts, raw_version = values[index * 3:index * 3 + 3]
+            try:
+                versions[post_id] = int(raw_version) if raw_version is not None else 0
+            except ValueError:
+                versions[post_id] = 0
+            body = HydrationService._decode(raw_body)
+            if body is not None:
+                bodies[post_id] = body
+            post_counts = HydrationService._decode(raw_counts)
+            if post_counts is not None and post_counts.get("v") == versions[post_id]:
+                counts[post_id] = post_counts
+        return bodies, counts, versions
+
+    @staticmethod
+    def _fill_posts(
+        db: Session,
+        post_ids: list[int],
+        bodies: dict[int, dict],
+        counts: dict[int, dict],
+        versions: dict[int, int],
+    ) -> dict[int, dict]:
+        """Load whatever ``_read_posts`` could not serve, cache it, and return complete posts."""
+        missing = [post_id for post_id in post_ids if post_id not in bodies]
+        stale = [post_id for post_id in post_ids if post_id in bodies and post_id not in counts]
+        writes: dict[str, str] = {}
+
+        if missing:
+            comment_count_subq = HydrationService._comment_counts_subquery(db, missing)
+            results = db.query(
+                Post,
+                User.username,
+                comment_count_subq.c.comment_count
+            ).join(User).outerjoin(
+                comment_count_subq,
+                comment_count_subq.c.post_id == Post.id
+            ).filter(Post.id.in_(missing)).all()
+            for post, username, comment_count in results:
+                bodies[post.id] = {
+                    "id": post.id,
+                    "title": post.title,
+                    "url": post.url,
+                    "text": post.text,
+                    "post_type": post.post_type,
+                    "user_id": post.user_id,
+                    "created_at": HydrationService._serialize_datetime(post.created_at),
+                    "username": username
+                }
+                counts[post.id] = {"v": versions[post.id], "points": post.points, "comment_count": comment_count or 0}
+                writes[HydrationService._post_key(post.id)] = cache_codec.encode(bodies[post.id])
+                writes[HydrationService._post_counts_key(post.id)] = cache_codec.encode(counts[post.id])
+
+        if stale:
+            comment_count_subq = HydrationService._comment_counts_subquery(db, stale)
+            results = db.query(
+                Post.id,
+                Post.points,
+                comment_count_subq.c.comment_count
+            ).outerjoin(
+                comment_count_subq,
+                comment_count_subq.c.post_id == Post.id
+            ).filter(Post.id.in_(stale)).all()
+            for post_id, points, comment_count in results:
+                counts[post_id] = {"v": versions[post_id], "points": points, "comment_count": comment_count or 0}
+                writes[HydrationService._post_counts_key(post_id)] = cache_codec.encode(counts[post_id])
+
+        redis_setex_many(writes, HydrationService.POST_CACHE_TTL_SECONDS)
+        return {
+            post_id: HydrationService._merge_post(bodies[post_id], counts[post_id])
+            for post_id in post_ids
+            if post_id in bodies and post_id in counts
+        }
+
+    @staticmethod
+    def _merge_post(body: dict, counts: dict) -> dict:
+        merged = {**body, "points": counts["points"], "comment_count": counts["comment_count"]}
+        return {field: merged[field] for field in HydrationService.POST_FIELDS}
+
+    @staticmethod
+    def get_posts_by_ids(db: Session, ids: list[int]) -> list[dict]:
+        unique_ids = list(dict.fromkeys(ids))
+        posts = HydrationService._fill_posts(db, unique_ids, *HydrationService._read_posts(unique_ids))
+        return [posts[post_id] for post_id in ids if post_id in posts]
+
+    @staticmethod
+    def get_post(db: Session, post_id: int) -> dict | None:
+        """One post; concurrent misses across processes are coalesced into one load."""
+        bodies, counts, versions = HydrationService._read_posts([post_id])
+        if post_id in bodies and post_id in counts:
+            return HydrationService._merge_post(bodies[post_id], counts[post_id])
+
+        lock_key = f"post:{post_id}:lock"
+        acquired = redis_set_nx(lock_key, "1", HydrationService.SINGLE_FLIGHT_LOCK_SECONDS)
+        if acquired is False:
+            # Another request is loading this post; wait for its result instead of
+            # repeating the query, and fall back to loading it if the lock goes away.
+            deadline = time.monotonic() + HydrationService.SINGLE_FLIGHT_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(HydrationService.SINGLE_FLIGHT_POLL_SECONDS)
+                bodies, counts, versions = HydrationService._read_posts([post_id])
+                if post_id in bodies and post_id in counts:
+                    return HydrationService._merge_post(bodies[post_id], counts[post_id])
+                if redis_get(lock_key) is None:
+                    break
+        try:
+            return HydrationService._fill_posts(db, [post_id], bodies, counts, versions).get(post_id)
+        finally:
+            if acquired:
+                redis_delete([lock_key])
+
+    @staticmethod
+    def get_users_by_ids(db: Session, ids: list[int]) -> list[dict]:
+        def load_missing(missing: list[int]) -> dict[int, dict]:
+            results = db.query(User.id, User.username).filter(User.id.in_(missing)).all()
+            return {user_id: {"id": user_id, "username": username} for user_id, username in results}
+
+        return HydrationService._hydrate(
+            ids, HydrationService._user_key, load_missing, HydrationService.USER_CACHE_TTL_SECONDS
+        )
+
+    @staticmethod
+    def get_comments_by_ids(db: Session, ids: list[int]) -> list[dict]:
+        """Comments with their author and post title, as ``GET /comments/{id}`` returns them."""
+        def load_missing(missing: list[int]) -> dict[int, dict]:
+            results = db.query(
+                Comment,
+                User.username,
+                Post.title
+            ).select_from(Comment).join(
+                User, Comment.user_id == User.id
+            ).join(
+                Post, Comment.post_id == Post.id
+            ).filter(Comment.id.in_(missing)).all()
+
+            return {
+                comment.id: {
+                    "id": comment.id,
+                    "text": comment.text,
+                    "user_id": comment.user_id,
+                    "post_id": comment.post_id,
+                    "parent_id": comment.parent_id,
+                    "root_id": comment.root_id,
+                    "is_deleted": comment.is_deleted,
+                    "points": comment.points,
+                    "created_at": HydrationService._serialize_datetime(comment.created_at),
+                    "updated_at": HydrationService._serialize_datetime(comment.updated_at),
+                    "username": username,
+                    "post_title": post_title,
+                }
+                for comment, username, post_title in results
+            }
+
+        return HydrationService._hydrate(
+            ids, HydrationService._comment_key, load_missing, HydrationService.COMMENT_CACHE_TTL_SECONDS
+        )
+
+    @staticmethod
+    def invalidate_comments(comment_ids) -> None:
+        """Drop cached comments after an edit, delete or points change."""
+        redis_delete([HydrationService._comment_key(comment_id) for comment_id in comment_ids])
+
+    @staticmethod
+    def bump_post_versions(post_ids) -> None:
+        """Mark cached points and comment counts stale after votes or comment writes."""
+        redis_incr_many([HydrationService._post_version_key(post_id) for post_id in post_ids])
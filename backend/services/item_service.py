@@ -0,0 +1,32 @@
+from fastapi import BackgroundTasks
+from sqlalchemy.orm import Session
+from services.comment_service import CommentService
+from services.comment_vote_service import CommentVoteService
+from services.post_service import PostService
+from services.vote_service import VoteService
+
+
+class ItemService:
+    @staticmethod
+    def get_item(
+        db: Session,
+        post_id: int,
+        user_id: int | None = None,
+        background_tasks: BackgroundTasks | None = None,
+    ) -> dict:
+        # The post and thread are the same for every reader (the thread is
+        # served from the per-post comments cache); only the viewer overlay
+        # depends on who is asking.
+        post = PostService.get_post(db, post_id)
+        item = {
+            "post": post,
+            "comments": CommentService.get_thread(db, post_id),
+            "viewer": None,
+        }
+        if user_id is not None:
+            post_votes = VoteService.get_user_votes_for_posts(db, user_id, [post_id], background_tasks)
+            item["viewer"] = {
+                "post_vote": post_votes[0]["vote_type"],
+                "comment_votes": CommentVoteService.get_user_votes_for_post_comments(db, user_id, post_id),
+            }
+        return item
@@ -1,18 +1,62 @@
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from models import Notification, User
+from sqlalchemy import delete, select, tuple_, update
+from models import Notification
+from cache import redis_get, redis_set_nx, redis_incrby_if_exists, redis_incrby_if_exists_many
+from services.hydration_service import HydrationService
 from fastapi import HTTPException
 
 class NotificationService:
+    UNREAD_COUNT_CACHE_TTL_SECONDS = 600
+
+    @staticmethod
+    def _unread_count_key(user_id: int) -> str:
+        return f"notifications:unread:{user_id}"
+
+    @staticmethod
+    def bump_unread_count(user_id: int, amount: int = 1) -> None:
+        # Adjust only a cached counter; a miss is rebuilt from the DB on next read.
+        redis_incrby_if_exists(NotificationService._unread_count_key(user_id), amount)
+
     @staticmethod
-    def get_user_notifications(db: Session, user_id: int, skip: int = 0, limit: int = 20) -> list[dict]:
-        results = db.query(Notification, User.username).join(
-            User, Notification.actor_id == User.id
-        ).filter(
+    def bump_unread_counts(amounts: dict[int, int]) -> None:
+        """Adjust several users' cached counters in one round trip."""
+        redis_incrby_if_exists_many(
+            {NotificationService._unread_count_key(user_id): amount for user_id, amount in amounts.items() if amount}
+        )
+
+    @staticmethod
+    def get_user_notifications(
+        db: Session,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 20,
+        before_id: int | None = None,
+    ) -> list[dict]:
+        query = db.query(Notification).filter(
             Notification.user_id == user_id
-        ).order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
-        
+        )
+        if before_id is not None:
+            # Keyset cursor: resume strictly after the last (created_at, id) the client saw.
+            anchor_created_at = select(Notification.created_at).where(
+                Notification.id == before_id,
+                Notification.user_id == user_id,
+            ).scalar_subquery()
+            query = query.filter(
+                tuple_(Notification.created_at, Notification.id) < tuple_(anchor_created_at, before_id)
+            )
+        results = query.order_by(
+            Notification.created_at.desc(), Notification.id.desc()
+        ).offset(skip).limit(limit).all()
+
+        actors = {
+            actor["id"]: actor["username"]
+            for actor in HydrationService.get_users_by_ids(db, [n.actor_id for n in results])
+        }
         notifications = []
-        for notification, actor_username in results:
+        for notification in results:
+            if notification.actor_id not in actors:
+                continue
             notifications.append({
                 "id": notification.id,
                 "user_id": notification.user_id,
@@ -23,9 +67,9 @@ class NotificationService:
                 "message": notification.message,
                 "read": notification.read,
                 "created_at": notification.created_at,
-                "actor_username": actor_username
+                "actor_username": actors[notification.actor_id]
             })
-        
+
         return notifications
 
     @staticmethod
@@ -38,12 +82,75 @@ class NotificationService:
         if not notification:
             raise HTTPException(status_code=404, detail="Notification not found")
 
+        was_unread = not notification.read
         notification.read = True
         db.commit()
+        if was_unread:
+            NotificationService.bump_unread_count(user_id, -1)
+
+    @staticmethod
+    def mark_notifications_as_read(
+        db: Session,
+        user_id: int,
+        ids: list[int] | None = None,
+        up_to_id: int | None = None,
+    ) -> int:
+        stmt = update(Notification).where(
+            Notification.user_id == user_id,
+            Notification.read == False
+        )
+        if ids is not None:
+            if not ids:
+                return 0
+            stmt = stmt.where(Notification.id.in_(ids))
+        else:
+            stmt = stmt.where(Notification.id <= up_to_id)
+
+        updated = db.execute(stmt.values(read=True).execution_options(synchronize_session=False)).rowcount
+        db.commit()
+        if updated:
+            NotificationService.bump_unread_count(user_id, -updated)
+        return updated
+
+    @staticmethod
+    def purge_read_notifications(db: Session, older_than_days: int, batch_size: int = 5000) -> int:
+        """Delete read notifications older than the retention window in bounded batches."""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        total = 0
+        while True:
+            batch_ids = select(Notification.id).where(
+                Notification.read == True,
+                Notification.created_at < cutoff
+            ).limit(batch_size)
+            deleted = db.execute(
+                delete(Notification).where(Notification.id.in_(batch_ids)).execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            total += deleted
+            if deleted < batch_size:
+                return total
 
     @staticmethod
     def get_unread_count(db: Session, user_id: int) -> int:
-        return db.query(Notification).filter(
+        cache_key = NotificationService._unread_count_key(user_id)
+        cached = redis_get(cache_key)
+        if cached is not None:
+            try:
+                return max(int(cached), 0)
+            except ValueError:
+                pass
+
+        count = db.query(Notification).filter(
             Notification.user_id == user_id,
             Notification.read == False
-        ).count()
\ No newline at end of file
+        ).count()
+        # SET NX: if another reader seeded the counter since our read, bumps may
+        # already have landed on it, and overwriting would lose them.
+        if redis_set_nx(cache_key, str(count), NotificationService.UNREAD_COUNT_CACHE_TTL_SECONDS) is False:
+            cached = redis_get(cache_key)
+            if cached is not None:
+                try:
+                    return max(int(cached), 0)
+                except ValueError:
+                    pass
+        return count
@@ -1,14 +1,18 @@
 from datetime import date, datetime, time, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
-from models import Post, User, Comment
+from sqlalchemy import desc, func, insert
+from models import Post, User, PastDayRank
 from schemas import PostCreate
 from fastapi import HTTPException
 from cache import redis_get, redis_setex, redis_incr
-import json
+import cache_codec
+from services.hydration_service import HydrationService
 
 class PostService:
     FEED_CACHE_TTL_SECONDS = 300
+    LATEST_DAY_CACHE_TTL_SECONDS = 3600
+    # Rankings frozen per finished day: the unfiltered feed plus one per post_type.
+    PAST_SNAPSHOT_FEEDS = (None, "story", "ask", "show", "job")
 
     @staticmethod
     def _feed_cache_key(
@@ -78,6 +82,7 @@ class PostService:
         user = db.query(User).filter(User.id == user_id).first()
 
         # Invalidate cached feeds so new submissions show up quickly.
+        PostService._record_latest_day(db_post)
         PostService.bump_feed_cache_version()
         
         return {
@@ -95,35 +100,10 @@ class PostService:
 
     @staticmethod
     def get_post(db: Session, post_id: int) -> dict:
-        comment_count_subq = db.query(
-            Comment.post_id.label("post_id"),
-            func.count(Comment.id).label("comment_count")
-        ).group_by(Comment.post_id).subquery()
-
-        result = db.query(
-            Post,
-            User.username,
-            comment_count_subq.c.comment_count
-        ).join(User).outerjoin(
-            comment_count_subq,
-            comment_count_subq.c.post_id == Post.id
-        ).filter(Post.id == post_id).first()
-        if not result:
+        post = HydrationService.get_post(db, post_id)
+        if not post:
             raise HTTPException(status_code=404, detail="Post not found")
-        
-        post, username, comment_count = result
-        return {
-            "id": post.id,
-            "title": post.title,
-            "url": post.url,
-            "text": post.text,
-            "post_type": post.post_type,
-            "points": post.points,
-            "comment_count": comment_count or 0,
-            "user_id": post.user_id,
-            "created_at": PostService._serialize_datetime(post.created_at),
-            "username": username
-        }
+        return post
 
     @staticmethod
     def get_posts(
@@ -135,44 +115,98 @@ class PostService:
         post_type: str | None = None
     ) -> list[dict]:
         sort_key = sort
-        day_filter = None
-        if sort_key == "past":
-            if day is None:
-                latest_query = db.query(func.max(Post.created_at))
-                if post_type:
-                    latest_query = latest_query.filter(Post.post_type == post_type)
-                latest_created_at = latest_query.scalar()
-                if latest_created_at is None:
-                    return []
-                day_filter = latest_created_at.date()
-            else:
-                day_filter = day
+        day_filter = PostService._resolve_feed_day(db, sort_key, day, post_type)
+        if sort_key == "past" and day_filter is None:
+            return []
         day_key = day_filter.isoformat() if day_filter else None
         cache_version = PostService._get_feed_cache_version()
         cache_key = PostService._feed_cache_key(sort_key, skip, limit, post_type, day_key, cache_version)
         cached = redis_get(cache_key)
         if cached:
             try:
-                cached_posts = json.loads(cached)
+                cached_posts = cache_codec.decode(cached)
                 if cached_posts and "points" not in cached_posts[0]:
                     raise ValueError("stale-cache")
                 return cached_posts
-            except (json.JSONDecodeError, ValueError, TypeError):
+            except (ValueError, TypeError):
                 pass
 
-        comment_count_subq = db.query(
-            Comment.post_id.label("post_id"),
-            func.count(Comment.id).label("comment_count")
-        ).group_by(Comment.post_id).subquery()
+        posts_with_username = PostService._load_feed(db, sort_key, skip, limit, post_type, day_filter)
+        redis_setex(cache_key, PostService.FEED_CACHE_TTL_SECONDS, cache_codec.encode(posts_with_username))
 
-        query = db.query(
-            Post,
-            User.username,
-            comment_count_subq.c.comment_count
-        ).join(User).outerjoin(
-            comment_count_subq,
-            comment_count_subq.c.post_id == Post.id
+        return posts_with_username
+
+    @staticmethod
+    def warm_feed_page(
+        db: Session,
+        version: int,
+        sort: str,
+        skip: int,
+        limit: int,
+        post_type: str | None = None
+    ) -> list[dict]:
+        """Build a feed page ("past" for the latest day) and cache it under ``version``."""
+        day_filter = PostService._resolve_feed_day(db, sort, None, post_type)
+        if sort == "past" and day_filter is None:
+            return []
+        day_key = day_filter.isoformat() if day_filter else None
+        posts = PostService._load_feed(db, sort, skip, limit, post_type, day_filter)
+        redis_setex(
+            PostService._feed_cache_key(sort, skip, limit, post_type, day_key, version),
+            PostService.FEED_CACHE_TTL_SECONDS,
+            cache_codec.encode(posts),
         )
+        return posts
+
+    @staticmethod
+    def _resolve_feed_day(db: Session, sort: str, day: date | None, post_type: str | None) -> date | None:
+        """Day a "past" feed covers: ``day``, else the latest day with posts (None if there are none)."""
+        if sort != "past":
+            return None
+        if day is not None:
+            return day
+        cache_key = PostService._latest_day_cache_key(post_type)
+        cached = redis_get(cache_key)
+        if cached:
+            try:
+                return date.fromisoformat(cached)
+            except ValueError:
+                pass
+        latest_query = db.query(func.max(Post.created_at))
+        if post_type:
+            latest_query = latest_query.filter(Post.post_type == post_type)
+        latest_created_at = latest_query.scalar()
+        if latest_created_at is None:
+            return None
+        redis_setex(cache_key, PostService.LATEST_DAY_CACHE_TTL_SECONDS, latest_created_at.date().isoformat())
+        return latest_created_at.date()
+
+    @staticmethod
+    def _latest_day_cache_key(post_type: str | None) -> str:
+        return f"feed:latest_day:{post_type or 'all'}"
+
+    @staticmethod
+    def _record_latest_day(post: Post) -> None:
+        # A new post is always on the newest day, so write through instead of invalidating.
+        day_key = post.created_at.date().isoformat()
+        for post_type in (None, post.post_type):
+            redis_setex(PostService._latest_day_cache_key(post_type), PostService.LATEST_DAY_CACHE_TTL_SECONDS, day_key)
+
+    @staticmethod
+    def _load_feed(
+        db: Session,
+        sort_key: str,
+        skip: int,
+        limit: int,
+        post_type: str | None,
+        day_filter: date | None
+    ) -> list[dict]:
+        if sort_key == "past" and day_filter is not None and day_filter < datetime.now(timezone.utc).date():
+            frozen = PostService._load_frozen_feed(db, skip, limit, post_type, day_filter)
+            if frozen is not None:
+                return frozen
+
+        query = db.query(Post.id)
         if post_type:
             query = query.filter(Post.post_type == post_type)
         if day_filter:
@@ -185,46 +219,52 @@ class PostService:
         else:  # "new"
             query = query.order_by(desc(Post.created_at))
 
-        results = query.offset(skip).limit(limit).all()
-
-        posts_with_username = []
-        for post, username, comment_count in results:
-            post_dict = {
-                "id": post.id,
-                "title": post.title,
-                "url": post.url,
-                "text": post.text,
-                "post_type": post.post_type,
-                "points": post.points,
-                "comment_count": comment_count or 0,
-                "user_id": post.user_id,
-                "created_at": PostService._serialize_datetime(post.created_at),
-                "username": username
-            }
-            posts_with_username.append(post_dict)
+        post_ids = [post_id for (post_id,) in query.offset(skip).limit(limit).all()]
+        return HydrationService.get_posts_by_ids(db, post_ids)
 
-        redis_setex(cache_key, PostService.FEED_CACHE_TTL_SECONDS, json.dumps(posts_with_username))
+    @staticmethod
+    def _load_frozen_feed(db: Session, skip: int, limit: int, post_type: str | None, day: date) -> list[dict] | None:
+        """A page of a frozen day's ranking with live points; None if the day was never frozen."""
+        ranked = db.query(PastDayRank.post_id).filter(
+            PastDayRank.day == day,
+            PastDayRank.feed == (post_type or "all"),
+            PastDayRank.rank >= skip,
+            PastDayRank.rank < skip + limit,
+        ).order_by(PastDayRank.rank).all()
+        # An empty page past the end of a frozen ranking is still served from the snapshot.
+        if not ranked and not db.query(PastDayRank.day).filter(PastDayRank.day == day).first():
+            return None
+        return HydrationService.get_posts_by_ids(db, [post_id for (post_id,) in ranked])
 
-        return posts_with_username
+    @staticmethod
+    def freeze_past_day(db: Session, day: date) -> int:
+        """Snapshot the "past" ranking of a finished day; returns rows written (0 if already frozen)."""
+        if db.query(PastDayRank.day).filter(PastDayRank.day == day).first():
+            return 0
+        start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+        end = datetime.combine(day, time.max, tzinfo=timezone.utc)
+        rank_expr = PostService._rank_expression(db)
+        rows = []
+        for post_type in PostService.PAST_SNAPSHOT_FEEDS:
+            query = db.query(Post.id).filter(Post.created_at.between(start, end))
+            if post_type:
+                query = query.filter(Post.post_type == post_type)
+            ranked = query.order_by(desc(rank_expr), desc(Post.created_at)).all()
+            rows.extend(
+                {"day": day, "feed": post_type or "all", "rank": rank, "post_id": post_id}
+                for rank, (post_id,) in enumerate(ranked)
+            )
+        if rows:
+            db.execute(insert(PastDayRank), rows)
+            db.commit()
+        return len(rows)
 
     @staticmethod
     def search_posts(db: Session, query: str, skip: int = 0, limit: int = 30) -> list[dict]:
         if not query.strip():
             return []
 
-        comment_count_subq = db.query(
-            Comment.post_id.label("post_id"),
-            func.count(Comment.id).label("comment_count")
-        ).group_by(Comment.post_id).subquery()
-
-        search_query = db.query(
-            Post,
-            User.username,
-            comment_count_subq.c.comment_count
-        ).join(User).outerjoin(
-            comment_count_subq,
-            comment_count_subq.c.post_id == Post.id
-        )
+        search_query = db.query(Post.id)
 
         if db.bind and db.bind.dialect.name == "sqlite":
             like_term = f"%{query}%"
@@ -243,20 +283,5 @@ class PostService:
 
         search_query = search_query.order_by(desc(Post.created_at)).offset(skip).limit(limit)
 
-        results = search_query.all()
-        posts_with_username = []
-        for post, username, comment_count in results:
-            posts_with_username.append({
-                "id": post.id,
-                "title": post.title,
-                "url": post.url,
-                "text": post.text,
-                "post_type": post.post_type,
-                "points": post.points,
-                "comment_count": comment_count or 0,
-                "user_id": post.user_id,
-                "created_at": PostService._serialize_datetime(post.created_at),
-                "username": username
-            })
-
-        return posts_with_username
+        post_ids = [post_id for (post_id,) in search_query.all()]
+        return HydrationService.get_posts_by_ids(db, post_ids)
@@ -1,11 +1,17 @@
 import os
+import time
 import uuid
 from fastapi import HTTPException
+import cache
 from cache import REDIS_ENABLED, redis_client
+from metrics import WRITE_QUEUE_ENQUEUE_DURATION, WRITE_QUEUE_ENQUEUE_ERRORS
 
 
 WRITE_QUEUE_MODE = os.getenv("WRITE_QUEUE_MODE", "redis").lower()
 WRITE_STREAM_KEY = os.getenv("WRITE_STREAM_KEY", "hn:write_events")
+# Events are sharded by post_id so each worker can own a disjoint set of posts
+# (and their comments) and commit without contending on the same rows.
+WRITE_STREAM_PARTITIONS = max(int(os.getenv("WRITE_STREAM_PARTITIONS", "1")), 1)
 
 
 class WriteEventType:
@@ -21,10 +27,25 @@ def queue_writes_enabled() -> bool:
     return WRITE_QUEUE_MODE == "redis"
 
 
+def write_stream_key(partition: int) -> str:
+    if WRITE_STREAM_PARTITIONS == 1:
+        return WRITE_STREAM_KEY
+    return f"{WRITE_STREAM_KEY}:{partition}"
+
+
+def write_stream_keys() -> list[str]:
+    return [write_stream_key(partition) for partition in range(WRITE_STREAM_PARTITIONS)]
+
+
+def stream_partition(post_id) -> int:
+    return int(post_id or 0) % WRITE_STREAM_PARTITIONS
+
+
 def enqueue_write(event_type: str, payload: dict) -> str:
     if not queue_writes_enabled():
         raise HTTPException(status_code=500, detail="Write queue is disabled")
-    if not REDIS_ENABLED or redis_client is None:
+    # An open circuit fails fast rather than waiting out the socket timeout.
+    if not REDIS_ENABLED or redis_client is None or not cache.redis_breaker.allow():
         raise HTTPException(status_code=503, detail="Write queue is unavailable")
 
     request_id = str(uuid.uuid4())
@@ -34,9 +55,14 @@ def enqueue_write(event_type: str, payload: dict) -> str:
             continue
         fields[key] = str(value)
 
+    started = time.perf_counter()
     try:
-        redis_client.xadd(WRITE_STREAM_KEY, fields)
+        redis_client.xadd(write_stream_key(stream_partition(payload.get("post_id"))), fields)
     except Exception as exc:  # RedisError is not always imported in tests.
+        cache.redis_breaker.record_error(exc)
+        WRITE_QUEUE_ENQUEUE_ERRORS.inc(event_type=event_type)
         raise HTTPException(status_code=503, detail="Write queue is unavailable") from exc
+    cache.redis_breaker.record_success()
+    WRITE_QUEUE_ENQUEUE_DURATION.observe(time.perf_counter() - started, event_type=event_type)
 
     return request_id
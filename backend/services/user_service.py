@@ -3,7 +3,9 @@ from sqlalchemy.exc import IntegrityError
 from models import User
 from schemas import UserCreate
 from auth import get_password_hash, verify_password
+from auth.hashing import hash_password_async, verify_password_async
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 
 class UserService:
     @staticmethod
@@ -18,8 +20,7 @@ class UserService:
             raise HTTPException(status_code=400, detail="Password must include at least one special character.")
 
     @staticmethod
-    def create_user(db: Session, user: UserCreate) -> User:
-        UserService._validate_password(user.password)
+    def _ensure_available(db: Session, user: UserCreate) -> None:
         # Check if username or email already exists
         existing_user = db.query(User).filter(
             (User.username == user.username) | (User.email == user.email)
@@ -30,7 +31,8 @@ class UserService:
             else:
                 raise HTTPException(status_code=400, detail="Email already registered")
 
-        hashed_password = get_password_hash(user.password)
+    @staticmethod
+    def _insert_user(db: Session, user: UserCreate, hashed_password: str) -> User:
         db_user = User(
             username=user.username,
             email=user.email,
@@ -45,6 +47,12 @@ class UserService:
             db.rollback()
             raise HTTPException(status_code=400, detail="User creation failed")
 
+    @staticmethod
+    def create_user(db: Session, user: UserCreate) -> User:
+        UserService._validate_password(user.password)
+        UserService._ensure_available(db, user)
+        return UserService._insert_user(db, user, get_password_hash(user.password))
+
     @staticmethod
     def get_user_by_username(db: Session, username: str) -> User:
         return db.query(User).filter(User.username == username).first()
@@ -57,3 +65,22 @@ class UserService:
         if not verify_password(password, user.hashed_password):
             return False
         return user
+
+    @staticmethod
+    async def register_user(db: Session, user: UserCreate) -> User:
+        """Async variant of create_user that hashes on the dedicated password pool."""
+        UserService._validate_password(user.password)
+        # Rejected names never take a slot in the bounded hashing pool.
+        await run_in_threadpool(UserService._ensure_available, db, user)
+        hashed_password = await hash_password_async(user.password)
+        return await run_in_threadpool(UserService._insert_user, db, user, hashed_password)
+
+    @staticmethod
+    async def authenticate_user_async(db: Session, username: str, password: str) -> User:
+        """Async variant of authenticate_user that verifies on the dedicated password pool."""
+        user = await run_in_threadpool(UserService.get_user_by_username, db, username)
+        if not user:
+            return False
+        if not await verify_password_async(password, user.hashed_password):
+            return False
+        return user
@@ -1,47 +1,136 @@
+from fastapi import BackgroundTasks
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from models import Vote, Post
 from schemas import VoteCreate
+from services.hydration_service import HydrationService
 from services.queue_service import enqueue_write, queue_writes_enabled, WriteEventType
+from cache import redis_get, redis_rebuild_set, redis_smismember, redis_update_sets
+from database import SessionLocal
 from fastapi import HTTPException
 
 class VoteService:
+    VOTED_POSTS_CACHE_TTL_SECONDS = 3600
+    # Post ids start at 1, so member 0 marks a set loaded in full from the DB.
+    # A key without it only holds SADDs made while the set was cold.
+    VOTED_POSTS_COMPLETE_MARKER = 0
+
     @staticmethod
-    def vote_on_post(db: Session, post_id: int, vote: VoteCreate, user_id: int) -> Vote | str:
-        post = db.query(Post).filter(Post.id == post_id).first()
-        if not post:
-            raise HTTPException(status_code=404, detail="Post not found")
+    def _voted_posts_key(user_id: int) -> str:
+        return f"votes:posts:{user_id}"
+
+    @staticmethod
+    def _voted_posts_version_key(user_id: int) -> str:
+        return f"votes:posts:{user_id}:v"
+
+    @staticmethod
+    def record_post_votes(user_id: int, added: list[int] | None = None, removed: list[int] | None = None) -> None:
+        VoteService.record_post_votes_many({user_id: (added or [], removed or [])})
+
+    @staticmethod
+    def record_post_votes_many(changes: dict[int, tuple[list[int], list[int]]]) -> None:
+        """Apply ``{user_id: (added, removed)}`` to the voted-posts sets in one round trip."""
+        redis_update_sets(
+            {VoteService._voted_posts_key(user_id): change for user_id, change in changes.items()},
+            ttl_seconds=VoteService.VOTED_POSTS_CACHE_TTL_SECONDS,
+            version_keys=[VoteService._voted_posts_version_key(user_id) for user_id in changes],
+        )
+
+    @staticmethod
+    def get_voted_post_ids(
+        db: Session,
+        user_id: int,
+        post_ids: list[int],
+        background_tasks: BackgroundTasks | None = None,
+    ) -> set[int]:
+        """Which of post_ids the user has voted on, from the per-user Redis set when cached.
+
+        A cold set answers only the requested ids from Postgres; the full set
+        is loaded by ``rebuild_voted_posts`` after the response when
+        ``background_tasks`` is given.
+        """
+        if not post_ids:
+            return set()
+        key = VoteService._voted_posts_key(user_id)
+        flags = redis_smismember(key, [VoteService.VOTED_POSTS_COMPLETE_MARKER, *post_ids])
+        if flags and flags[0]:
+            return {post_id for post_id, voted in zip(post_ids, flags[1:]) if voted}
+
+        voted = {
+            post_id
+            for (post_id,) in db.query(Vote.post_id).filter(Vote.user_id == user_id, Vote.post_id.in_(post_ids)).all()
+        }
+        if background_tasks is not None:
+            background_tasks.add_task(VoteService.rebuild_voted_posts, user_id)
+        return voted
+
+    @staticmethod
+    def rebuild_voted_posts(user_id: int) -> bool:
+        """Load the user's voted-post set in full; left cold if a vote changes while it loads."""
+        version_key = VoteService._voted_posts_version_key(user_id)
+        seen_version = redis_get(version_key)
+        with SessionLocal() as db:
+            voted = [post_id for (post_id,) in db.query(Vote.post_id).filter(Vote.user_id == user_id).all()]
+        return redis_rebuild_set(
+            VoteService._voted_posts_key(user_id),
+            version_key,
+            seen_version,
+            [VoteService.VOTED_POSTS_COMPLETE_MARKER, *voted],
+            VoteService.VOTED_POSTS_CACHE_TTL_SECONDS,
+        )
+
+    @staticmethod
+    def with_viewer_votes(
+        db: Session,
+        user_id: int,
+        posts: list[dict],
+        background_tasks: BackgroundTasks | None = None,
+    ) -> list[dict]:
+        """Copy feed entries with the user's vote_type merged in; the shared page stays untouched."""
+        voted = VoteService.get_voted_post_ids(db, user_id, [post["id"] for post in posts], background_tasks)
+        return [post | {"vote_type": 1 if post["id"] in voted else 0} for post in posts]
 
+    @staticmethod
+    def vote_on_post(db: Session, post_id: int, vote: VoteCreate, user_id: int) -> Vote | str:
         if queue_writes_enabled():
+            post = db.query(Post.id).filter(Post.id == post_id).first()
+            if not post:
+                raise HTTPException(status_code=404, detail="Post not found")
             return enqueue_write(
                 WriteEventType.POST_VOTE_ADD,
                 {"user_id": user_id, "post_id": post_id},
             )
 
-        existing_vote = db.query(Vote).filter(
-            Vote.user_id == user_id,
-            Vote.post_id == post_id
-        ).first()
+        # Existence check and duplicate check in one round trip.
+        row = db.query(Post.id, Vote).outerjoin(
+            Vote,
+            and_(Vote.post_id == Post.id, Vote.user_id == user_id),
+        ).filter(Post.id == post_id).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Post not found")
+
+        existing_vote = row[1]
         if existing_vote:
             return existing_vote
-        else:
-            db_vote = Vote(
-                user_id=user_id,
-                post_id=post_id
-            )
-            db.add(db_vote)
-            db.query(Post).filter(Post.id == post_id).update(
-                {Post.points: Post.points + 1}
-            )
-            try:
-                db.commit()
-                db.refresh(db_vote)
-                vote_obj = db_vote
-            except IntegrityError:
-                db.rollback()
-                raise HTTPException(status_code=409, detail="Vote creation failed")
 
-        return vote_obj
+        db_vote = Vote(
+            user_id=user_id,
+            post_id=post_id
+        )
+        db.add(db_vote)
+        db.query(Post).filter(Post.id == post_id).update(
+            {Post.points: Post.points + 1}
+        )
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Vote creation failed")
+
+        VoteService.record_post_votes(user_id, added=[post_id])
+        HydrationService.bump_post_versions([post_id])
+        return db_vote
 
     @staticmethod
     def get_user_vote_on_post(db: Session, post_id: int, user_id: int) -> Vote:
@@ -76,18 +165,21 @@ class VoteService:
                 {Post.points: Post.points - 1}
             )
             db.commit()
+            VoteService.record_post_votes(user_id, removed=[post_id])
+            HydrationService.bump_post_versions([post_id])
 
     @staticmethod
-    def get_user_votes_for_posts(db: Session, user_id: int, post_ids: list[int]) -> list[dict]:
+    def get_user_votes_for_posts(
+        db: Session,
+        user_id: int,
+        post_ids: list[int],
+        background_tasks: BackgroundTasks | None = None,
+    ) -> list[dict]:
         if not post_ids:
             return []
         unique_ids = list(dict.fromkeys(post_ids))
-        votes = db.query(Vote.post_id).filter(
-            Vote.user_id == user_id,
-            Vote.post_id.in_(unique_ids)
-        ).all()
-        vote_map = {post_id: 1 for (post_id,) in votes}
+        voted = VoteService.get_voted_post_ids(db, user_id, unique_ids, background_tasks)
         return [
-            {"post_id": post_id, "vote_type": vote_map.get(post_id, 0)}
+            {"post_id": post_id, "vote_type": 1 if post_id in voted else 0}
             for post_id in unique_ids
         ]
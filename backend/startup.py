@@ -0,0 +1,91 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from database import Base
+
+
+LOGGER = logging.getLogger("startup")
+
+ROOT_DIR = Path(__file__).resolve().parent
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development").lower()
+
+# create: run create_all under an advisory lock (local dev and tests without alembic).
+# verify: no DDL; fail fast unless the database is at the alembic head.
+# skip: no schema work at all.
+SCHEMA_STARTUP_MODE = os.getenv(
+    "SCHEMA_STARTUP_MODE",
+    "verify" if ENVIRONMENT in {"production", "prod"} else "create",
+).lower()
+SCHEMA_LOCK_ID = 2147483647
+
+
+class StartupTimings:
+    """Collects wall-clock milliseconds for each cold-start stage."""
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        self.timings[stage] = elapsed_ms
+
+    @contextmanager
+    def measure(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - started) * 1000)
+
+    def report(self) -> str:
+        return " ".join(f"{stage}={elapsed:.1f}ms" for stage, elapsed in self.timings.items())
+
+
+startup_timings = StartupTimings()
+
+
+def _create_schema(conn: Connection) -> None:
+    if conn.dialect.name != "postgresql":
+        Base.metadata.create_all(bind=conn)
+        return
+    # Serialize schema creation across multiple workers to avoid enum race.
+    conn.execute(text("SELECT pg_advisory_lock(:lock_id)"), {"lock_id": SCHEMA_LOCK_ID})
+    try:
+        Base.metadata.create_all(bind=conn)
+    finally:
+        conn.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": SCHEMA_LOCK_ID})
+
+
+def _verify_alembic_head(conn: Connection) -> None:
+    # Imported lazily: alembic is only needed when verifying.
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(ROOT_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT_DIR / "alembic"))
+    expected = set(ScriptDirectory.from_config(config).get_heads())
+    current = set(MigrationContext.configure(conn).get_current_heads())
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema revision {sorted(current)} does not match alembic head {sorted(expected)}; "
+            "run `alembic upgrade head`"
+        )
+
+
+def prepare_schema(conn: Connection, mode: str | None = None) -> None:
+    mode = mode or SCHEMA_STARTUP_MODE
+    if mode == "skip":
+        return
+    if mode == "verify":
+        _verify_alembic_head(conn)
+        return
+    if mode == "create":
+        _create_schema(conn)
+        return
+    raise RuntimeError(f"Unknown SCHEMA_STARTUP_MODE: {mode}")
@@ -1,16 +1,11 @@
-import importlib.util
-from pathlib import Path
+import importlib
 
 import pytest
 from fastapi import HTTPException
 
 
 def _load_auth_module():
-    module_path = Path(__file__).resolve().parents[2] / "auth.py"
-    spec = importlib.util.spec_from_file_location("auth_module_file", module_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+    return importlib.import_module("auth")
 
 
 @pytest.mark.unit
@@ -1,6 +1,12 @@
+import asyncio
+import threading
+
 import pytest
 from fastapi import HTTPException
 
+from auth.hashing import PasswordHashPool
+from auth.revocation import DecodedClaimsCache, RevocationFilter
+
 from auth import (
     create_access_token,
     verify_token,
@@ -45,3 +51,95 @@ def test_revoke_token_marks_token_invalid():
     credentials_exception = HTTPException(status_code=401, detail="invalid")
     with pytest.raises(HTTPException):
         verify_token(token, credentials_exception)
+
+
+@pytest.mark.unit
+def test_password_hash_pool_runs_off_loop_and_bounds_pending():
+    pool = PasswordHashPool(workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as exc:
+            await pool.run(lambda: True)
+        assert exc.value.status_code == 503
+        release.set()
+        assert await blocked is True
+        hashed = await pool.run(get_password_hash, "Password1!")
+        assert await pool.run(verify_password, "Password1!", hashed) is True
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    assert pool.stats["completed"] == 3
+    assert pool.stats["rejected"] == 1
+    assert pool.stats["in_flight"] == 0
+
+
+@pytest.mark.unit
+def test_revocation_filter_skips_redis_for_unrevoked_tokens(monkeypatch):
+    import auth
+
+    lookups = []
+    revocation_filter = RevocationFilter(default_ttl_seconds=60)
+    # No pub/sub thread: against an unreachable Redis it would clear _ready mid-test.
+    monkeypatch.setattr(revocation_filter, "start", lambda: None)
+    revocation_filter._ready.set()
+    monkeypatch.setattr(auth, "revocation_filter", revocation_filter)
+    monkeypatch.setattr(auth.cache, "redis_get", lambda key: lookups.append(key) or "1")
+
+    token = create_access_token({"sub": "alice"})
+    assert is_token_revoked(token) is False
+    assert lookups == []
+
+    revocation_filter.handle_message(f"{auth._token_hash(token)} 9999999999")
+    assert is_token_revoked(token) is True
+    assert lookups == [auth._revocation_key(token)]
+
+
+@pytest.mark.unit
+def test_revocation_filter_falls_back_until_ready():
+    revocation_filter = RevocationFilter(default_ttl_seconds=60)
+    assert revocation_filter.might_be_revoked("anything") is True
+
+    revocation_filter._ready.set()
+    assert revocation_filter.might_be_revoked("anything") is False
+    revocation_filter.add("expired", expires_at=1)
+    revocation_filter.prune()
+    assert revocation_filter.might_be_revoked("expired") is False
+
+
+@pytest.mark.unit
+def test_decoded_claims_cache_evicts_expired_and_lru():
+    claims_cache = DecodedClaimsCache(max_size=2)
+    claims_cache.put("a", {"sub": "a", "exp": 9999999999})
+    claims_cache.put("b", {"sub": "b", "exp": 1})
+    assert claims_cache.get("b") is None
+
+    claims_cache.put("c", {"sub": "c"})
+    claims_cache.put("d", {"sub": "d"})
+    assert claims_cache.get("a") is None
+    assert claims_cache.get("d") == {"sub": "d"}
+
+
+@pytest.mark.unit
+def test_verify_token_reuses_cached_claims(monkeypatch):
+    import auth
+
+    token = create_access_token({"sub": "cached"})
+    credentials_exception = HTTPException(status_code=401, detail="invalid")
+    assert verify_token(token, credentials_exception).username == "cached"
+
+    import jose.jwt
+
+    def _fail_decode(*args, **kwargs):
+        raise AssertionError("jwt.decode should not run for a cached token")
+
+    monkeypatch.setattr(jose.jwt, "decode", _fail_decode)
+    assert verify_token(token, credentials_exception).username == "cached"
+
+    revoke_token(token)
+    assert auth.claims_cache.get(token) is None
@@ -19,10 +19,52 @@ class _FailingRedis:
     def expire(self, key, ttl):
         raise redis.RedisError("fail")
 
+    def eval(self, script, numkeys, *args):
+        raise redis.RedisError("fail")
+
+    def mget(self, keys):
+        raise redis.RedisError("fail")
+
+    def pipeline(self, transaction=True):
+        return _FailingPipeline(self)
+
+
+class _Pipeline:
+    """Queues calls and replays them on execute, like redis-py's non-transactional pipeline."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+        self.executions = 0
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self, raise_on_error=True):
+        results = []
+        for name, args, kwargs in self.commands:
+            try:
+                results.append(getattr(self.client, name)(*args, **kwargs))
+            except redis.RedisError as exc:
+                if raise_on_error:
+                    raise
+                results.append(exc)
+        return results
+
+
+class _FailingPipeline(_Pipeline):
+    def execute(self, raise_on_error=True):
+        raise redis.ConnectionError("fail")
+
 
 class _WorkingRedis:
     def __init__(self):
         self.store = {}
+        self.round_trips = 0
 
     def get(self, key):
         return self.store.get(key)
@@ -31,14 +73,81 @@ class _WorkingRedis:
         self.store[key] = value
 
     def incr(self, key):
-        current = int(self.store.get(key, 0) or 0)
+        try:
+            current = int(self.store.get(key, 0) or 0)
+        except ValueError:
+            raise redis.ResponseError("value is not an integer") from None
         current += 1
         self.store[key] = str(current)
         return current
 
-    def expire(self, key, ttl):
+    def expire(self, key, ttl, nx=False):
+        return True
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        self.round_trips += 1
+        return _Pipeline(self)
+
+    def eval(self, script, numkeys, key, amount):
+        # Mirrors the INCRBY-if-exists script used by the cache helpers.
+        if key not in self.store:
+            return None
+        current = int(self.store[key]) + int(amount)
+        self.store[key] = str(current)
+        return current
+
+
+class _WatchingRedis(_WorkingRedis):
+    """Sets plus WATCH/MULTI transactions; ``during_transaction`` runs between WATCH and EXEC."""
+
+    def __init__(self):
+        super().__init__()
+        self.during_transaction = None
+
+    def sadd(self, key, *members):
+        self.store.setdefault(key, set()).update(str(member) for member in members)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def rename(self, source, destination):
+        self.store[destination] = self.store.pop(source)
+
+    def unwatch(self):
         return True
 
+    def transaction(self, func, *watches):
+        while True:
+            pipe = _WatchedPipeline(self)
+            func(pipe)
+            if self.during_transaction is not None:
+                # A write to a watched key aborts EXEC; redis-py then runs ``func`` again.
+                hook, self.during_transaction = self.during_transaction, None
+                hook()
+                continue
+            return pipe.execute()
+
+
+class _WatchedPipeline(_Pipeline):
+    """Runs commands immediately until ``multi()``, then queues them like a transaction."""
+
+    def __init__(self, client):
+        super().__init__(client)
+        self.immediate = True
+
+    def multi(self):
+        self.immediate = False
+
+    def __getattr__(self, name):
+        if self.immediate:
+            return getattr(self.client, name)
+        return super().__getattr__(name)
+
 
 @pytest.mark.unit
 def test_cache_helpers_swallow_redis_errors(monkeypatch):
@@ -49,6 +158,7 @@ def test_cache_helpers_swallow_redis_errors(monkeypatch):
     assert cache_module.redis_setex("k", 10, "v") is None
     assert cache_module.redis_incr("k") is None
     assert cache_module.redis_expire("k", 10) is None
+    assert cache_module.redis_incrby_if_exists("k", 1) is None
 
 
 @pytest.mark.unit
@@ -74,3 +184,133 @@ def test_cache_helpers_success(monkeypatch):
     assert cache_module.redis_get("k") == "v"
     assert cache_module.redis_incr("counter") == 1
     assert cache_module.redis_expire("counter", 10) is None
+    assert cache_module.redis_incrby_if_exists("missing", 1) is None
+    assert cache_module.redis_incrby_if_exists("counter", 2) == 3
+
+
+@pytest.mark.unit
+def test_batched_helpers_use_one_round_trip(monkeypatch):
+    cache_module = importlib.reload(cache)
+    client = _WorkingRedis()
+    client.store.update({"a": "1", "unread": "5", "bad": "x"})
+    monkeypatch.setattr(cache_module, "REDIS_ENABLED", True)
+    monkeypatch.setattr(cache_module, "redis_client", client)
+
+    assert cache_module.redis_mget(["a", "missing"]) == ["1", None]
+    assert cache_module.redis_incr_many(["a", "b", "bad"]) == [2, 1, None]
+    assert cache_module.redis_incrby_if_exists_many({"unread": 2, "gone": 1}) == [7, None]
+    assert cache_module.redis_incr_expire("window", 60) == 1
+    assert client.round_trips == 4
+
+
+@pytest.mark.unit
+def test_batched_helpers_swallow_redis_errors(monkeypatch):
+    cache_module = importlib.reload(cache)
+    monkeypatch.setattr(cache_module, "REDIS_ENABLED", True)
+    monkeypatch.setattr(cache_module, "redis_client", _FailingRedis())
+
+    assert cache_module.redis_mget(["a", "b"]) == [None, None]
+    assert cache_module.redis_incr_many(["a", "b"]) == [None, None]
+    assert cache_module.redis_incrby_if_exists_many({"a": 1}) == [None]
+    assert cache_module.redis_incr_expire("window", 60) is None
+    assert cache_module.redis_update_sets({"s": ([1], [2])}, ttl_seconds=60) is None
+
+
+@pytest.mark.unit
+def test_batched_helpers_noop_when_disabled(monkeypatch):
+    cache_module = importlib.reload(cache)
+    monkeypatch.setattr(cache_module, "REDIS_ENABLED", False)
+    monkeypatch.setattr(cache_module, "redis_client", None)
+
+    assert cache_module.redis_pipeline(lambda pipe: pipe.incr("k")) is None
+    assert cache_module.redis_mget(["a"]) == [None]
+    assert cache_module.redis_incr_many(["a"]) == [None]
+    assert cache_module.redis_incr_expire("window", 60) is None
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _DownRedis:
+    def __init__(self):
+        self.calls = 0
+        self.down = True
+
+    def get(self, key):
+        self.calls += 1
+        if self.down:
+            raise redis.ConnectionError("refused")
+        return "v"
+
+
+@pytest.mark.unit
+def test_circuit_breaker_opens_then_probes(monkeypatch):
+    cache_module = importlib.reload(cache)
+    client = _DownRedis()
+    clock = _Clock()
+    breaker = cache_module.CircuitBreaker(failures=3, cooldown_seconds=10, clock=clock)
+    monkeypatch.setattr(cache_module, "REDIS_ENABLED", True)
+    monkeypatch.setattr(cache_module, "redis_client", client)
+    monkeypatch.setattr(cache_module, "redis_breaker", breaker)
+
+    for _ in range(5):
+        assert cache_module.redis_get("k") is None
+    # Three failures open the circuit; the rest are misses without touching Redis.
+    assert client.calls == 3
+    assert breaker.is_open
+    assert cache_module.REDIS_CIRCUIT_OPEN.value() == 1
+
+    # A failed probe after the cool-down re-opens it for another cool-down.
+    clock.now = 10
+    assert cache_module.redis_get("k") is None
+    assert client.calls == 4
+    clock.now = 15
+    assert cache_module.redis_get("k") is None
+    assert client.calls == 4
+
+    client.down = False
+    clock.now = 20
+    assert cache_module.redis_get("k") == "v"
+    assert not breaker.is_open
+    assert cache_module.REDIS_CIRCUIT_OPEN.value() == 0
+    assert cache_module.redis_get("k") == "v"
+
+
+@pytest.mark.unit
+def test_circuit_breaker_ignores_command_errors():
+    cache_module = importlib.reload(cache)
+    breaker = cache_module.CircuitBreaker(failures=1, cooldown_seconds=10, clock=_Clock())
+
+    breaker.record_error(redis.ResponseError("WRONGTYPE"))
+    assert not breaker.is_open
+    breaker.record_error(redis.TimeoutError("timed out"))
+    assert breaker.is_open
+    assert not breaker.allow()
+
+
+@pytest.mark.unit
+def test_rebuild_set_skips_when_a_write_raced_the_read(monkeypatch):
+    cache_module = importlib.reload(cache)
+    client = _WatchingRedis()
+    client.store["votes"] = {"0", "9"}
+    monkeypatch.setattr(cache_module, "REDIS_ENABLED", True)
+    monkeypatch.setattr(cache_module, "redis_client", client)
+
+    assert cache_module.redis_rebuild_set("votes", "votes:v", None, [0, 1, 2], 60) is True
+    assert client.store["votes"] == {"0", "1", "2"}
+    assert "votes:rebuild" not in client.store
+
+    # A write bumped the version after the caller read it.
+    client.incr("votes:v")
+    assert cache_module.redis_rebuild_set("votes", "votes:v", None, [0, 5], 60) is False
+    # A write lands while the swap is being prepared; the retry sees it.
+    client.during_transaction = lambda: client.incr("votes:v")
+    assert cache_module.redis_rebuild_set("votes", "votes:v", "1", [0, 5], 60) is False
+    assert client.store["votes"] == {"0", "1", "2"}
+    assert cache_module.redis_rebuild_set("votes", "votes:v", "2", [0, 5], 60) is True
+    assert client.store["votes"] == {"0", "5"}
@@ -0,0 +1,26 @@
+import pytest
+
+import cache_codec
+
+
+@pytest.mark.unit
+def test_zlib_codec_compresses_only_large_payloads():
+    codec = cache_codec.ZlibCodec(min_bytes=256)
+    small = [{"id": 1}]
+    large = [{"id": i, "text": "same words again"} for i in range(100)]
+
+    assert codec.encode(small) == '[{"id":1}]'
+    encoded = codec.encode(large)
+    assert encoded.startswith(cache_codec.ZLIB_PREFIX)
+    assert len(encoded) < len(cache_codec.JsonCodec().encode(large)) / 4
+    assert cache_codec.decode(encoded) == large
+    assert cache_codec.decode(codec.encode(small)) == small
+
+
+@pytest.mark.unit
+def test_decode_reads_entries_from_any_codec():
+    assert cache_codec.decode('[{"id": 1}]') == [{"id": 1}]
+    with pytest.raises(ValueError):
+        cache_codec.decode(cache_codec.ZLIB_PREFIX + "not-zlib")
+    with pytest.raises(ValueError):
+        cache_codec.decode("{truncated")
@@ -0,0 +1,91 @@
+import pytest
+
+import cache
+import services.cache_warming_service as cache_warming_service
+import services.comment_service as comment_service
+
+from auth import get_password_hash
+from models import Comment, Post, User
+from services.cache_warming_service import CacheWarmingService
+from services.comment_service import CommentService
+from services.post_service import PostService
+
+
+@pytest.fixture()
+def warm_world(db_session, fake_redis, monkeypatch):
+    # The shared fake only covers the feed; route thread caching through it too.
+    for name in ("redis_get", "redis_setex", "redis_incr", "redis_mget", "redis_incr_many"):
+        monkeypatch.setattr(comment_service, name, getattr(cache, name))
+    for name in ("redis_get", "redis_setex", "redis_incr_many"):
+        monkeypatch.setattr(cache_warming_service, name, getattr(cache, name))
+
+    user = User(username="warm", email="warm@example.com", hashed_password=get_password_hash("Password1!"))
+    db_session.add(user)
+    db_session.commit()
+    post = Post(title="Hot", url=None, text="Body", post_type="story", user_id=user.id, points=5)
+    db_session.add(post)
+    db_session.commit()
+    comment = Comment(text="First", user_id=user.id, post_id=post.id)
+    db_session.add(comment)
+    db_session.commit()
+    return db_session, post
+
+
+@pytest.mark.unit
+def test_refresh_warms_next_versions_before_flipping(warm_world, fake_redis, count_queries):
+    db, post = warm_world
+
+    version, hot_post_ids = CacheWarmingService.refresh_feeds(db, pages=1)
+    assert hot_post_ids == [post.id]
+    assert fake_redis["feed:version"] == str(version) == "1"
+    assert CacheWarmingService.refresh_threads(db, hot_post_ids) == {post.id: 1}
+    assert fake_redis[f"post:{post.id}:comments:v"] == "1"
+
+    # Readers land on the warmed entries without touching the database.
+    with count_queries() as statements:
+        feed = PostService.get_posts(db, skip=0, limit=30, sort="new")
+        thread = CommentService.get_thread(db, post.id)
+    assert statements == []
+    assert [item["id"] for item in feed] == [post.id]
+    assert thread[0]["text"] == "First"
+
+
+@pytest.mark.unit
+def test_warm_stale_threads_follows_versions_bumped_elsewhere(warm_world, fake_redis):
+    db, post = warm_world
+    warmed = CacheWarmingService.refresh_threads(db, [post.id])
+
+    assert CacheWarmingService.warm_stale_threads(db, warmed) == {}
+    CommentService.bump_comments_cache_version(post.id)
+    assert CacheWarmingService.warm_stale_threads(db, warmed) == {post.id: 2}
+    assert f"post:{post.id}:comments:v2" in fake_redis
+
+
+@pytest.mark.unit
+def test_one_worker_refreshes_per_interval_and_peers_adopt_it(warm_world, fake_redis, monkeypatch, count_queries):
+    from workers import write_queue_worker as worker
+
+    db, post = warm_world
+    post_id = post.id
+
+    def redis_set_nx(key, value, ttl_seconds):
+        if key in fake_redis:
+            return False
+        fake_redis[key] = value
+        return True
+
+    monkeypatch.setattr(cache_warming_service, "redis_set_nx", redis_set_nx)
+    first, second = worker.CacheWarmer(), worker.CacheWarmer()
+
+    first.refresh()
+    second.refresh()
+    assert fake_redis["feed:version"] == "1"
+    assert fake_redis[f"post:{post_id}:comments:v"] == "1"
+
+    # The peer takes over the refreshed version and hot threads without warming them again.
+    with count_queries() as statements:
+        second.check()
+    assert statements == []
+    assert second.feed_version == 1
+    assert second.threads == {post_id: 1}
+    assert fake_redis[f"post:{post_id}:comments:v"] == "1"
@@ -261,3 +261,218 @@ def test_delete_comment_keeps_notifications(db_session):
     CommentService.delete_comment(db_session, comment["id"], commenter.id)
     notifications_after = db_session.query(Notification).filter(Notification.user_id == author.id).all()
     assert len(notifications_after) == 1
+
+
+@pytest.mark.unit
+def test_packed_thread_round_trips():
+    from datetime import datetime, timedelta, timezone
+
+    import cache_codec
+
+    now = datetime.now(timezone.utc)
+
+    def comment(comment_id, parent_id, minutes_ago):
+        created_at = now - timedelta(minutes=minutes_ago)
+        return Comment(
+            id=comment_id, text=f"c{comment_id}", user_id=1, post_id=7, parent_id=parent_id,
+            root_id=parent_id or comment_id, is_deleted=False, points=1,
+            created_at=created_at, updated_at=created_at,
+        ), "alice"
+
+    # Comment 5 replies to a parent that is not in the thread, so it surfaces at top level.
+    rows = [comment(1, None, 30), comment(2, 1, 20), comment(3, 2, 10), comment(4, 1, 5),
+            comment(5, 99, 3), comment(6, None, 1)]
+    thread = CommentService._build_thread(rows)
+
+    encoded = cache_codec.encode(CommentService._pack_thread(thread), default=CommentService._serialize_datetime)
+    restored = CommentService._unpack_thread(cache_codec.decode(encoded), 7)
+
+    expected = cache_codec.decode(cache_codec.JsonCodec().encode(thread, default=CommentService._serialize_datetime))
+    assert restored == expected
+    # Entries cached in the old nested layout are still served.
+    assert CommentService._unpack_thread(expected, 7) is expected
+    with pytest.raises(ValueError):
+        CommentService._unpack_thread({"fields": ["id"], "rows": []}, 7)
+
+
+class _MemoryRedis:
+    """In-memory stand-in for the Redis commands CommentService sends, lists included."""
+
+    def __init__(self):
+        self.store = {}
+        # Called once inside the next transaction, between its WATCH and EXEC.
+        self.during_transaction = None
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl_seconds, value):
+        self.store[key] = value
+
+    def set(self, key, value, **kwargs):
+        self.store[key] = value
+
+    def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+    def exists(self, *keys):
+        return sum(1 for key in keys if key in self.store)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def publish(self, channel, message):
+        return 0
+
+    def pexpireat(self, key, when_ms):
+        return True
+
+    def lrange(self, key, start, stop):
+        values = self.store.get(key, [])
+        return values[start:len(values) if stop == -1 else stop + 1]
+
+    def lpush(self, key, *values):
+        self.store[key] = [str(value) for value in reversed(values)] + self.store.get(key, [])
+
+    def rpush(self, key, *values):
+        self.store[key] = self.store.get(key, []) + [str(value) for value in values]
+
+    def lrem(self, key, count, value):
+        if key in self.store:
+            self.store[key] = [item for item in self.store[key] if item != str(value)]
+
+    def ltrim(self, key, start, stop):
+        if key in self.store:
+            self.store[key] = self.lrange(key, start, stop)
+
+    def pipeline(self, transaction=True):
+        return _MemoryPipeline(self)
+
+    def transaction(self, func, *watches):
+        while True:
+            pipe = _MemoryPipeline(self, immediate=True)
+            func(pipe)
+            if self.during_transaction is not None:
+                # A write to a watched key aborts EXEC; redis-py then runs ``func`` again.
+                hook, self.during_transaction = self.during_transaction, None
+                hook()
+                continue
+            return pipe.execute()
+
+
+class _MemoryPipeline:
+    def __init__(self, client, immediate=False):
+        self.client = client
+        self.immediate = immediate
+        self.commands = []
+
+    def multi(self):
+        self.immediate = False
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            if self.immediate:
+                return getattr(self.client, name)(*args, **kwargs)
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return command
+
+    def execute(self, raise_on_error=True):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+@pytest.fixture()
+def recent_list(monkeypatch):
+    """CommentService's own Redis calls go to an in-memory client through the real cache helpers."""
+    import cache
+
+    client = _MemoryRedis()
+    monkeypatch.setattr(cache, "REDIS_ENABLED", True)
+    monkeypatch.setattr(cache, "redis_client", client)
+    return client
+
+
+@pytest.fixture()
+def recent_world(db_session):
+    author = User(username="recent", email="recent@example.com", hashed_password=get_password_hash("Password1!"))
+    db_session.add(author)
+    db_session.commit()
+    post = Post(title="Recent", url=None, text="Body", post_type="story", user_id=author.id)
+    db_session.add(post)
+    db_session.commit()
+    return db_session, author.id, post.id
+
+
+@pytest.mark.unit
+def test_recent_comments_are_served_from_the_pushed_list(recent_world, recent_list, count_queries):
+    db_session, author_id, post_id = recent_world
+
+    first = CommentService.create_comment(db_session, CommentCreate(text="One"), post_id, author_id)
+    # The list is not marked complete yet, so the first read rebuilds it from Postgres.
+    assert [c["id"] for c in CommentService.get_recent_comments(db_session)] == [first["id"]]
+    assert recent_list.store["comments:recent"] == [str(first["id"])]
+
+    second = CommentService.create_comment(db_session, CommentCreate(text="Two"), post_id, author_id)
+    with count_queries() as statements:
+        recent = CommentService.get_recent_comments(db_session, limit=2)
+    assert [c["id"] for c in recent] == [second["id"], first["id"]]
+    assert recent[0]["post_title"] == "Recent"
+    # Only the new comment's details were loaded; the ids came from the list.
+    assert len(statements) == 1
+    assert "IN" in statements[0]
+
+
+@pytest.mark.unit
+def test_recent_list_rebuild_keeps_comments_pushed_during_it(recent_world, recent_list, monkeypatch):
+    db_session, author_id, post_id = recent_world
+    first = CommentService.create_comment(db_session, CommentCreate(text="One"), post_id, author_id)
+    created = []
+    read_latest = CommentService._latest_comment_ids
+
+    def read_then_comment(db, skip, limit):
+        ids = read_latest(db, skip, limit)
+        # Commits and pushes after the rebuild's read, before its write.
+        created.append(CommentService.create_comment(db, CommentCreate(text="Two"), post_id, author_id))
+        recent_list.during_transaction = lambda: created.append(
+            CommentService.create_comment(db, CommentCreate(text="Three"), post_id, author_id)
+        )
+        return ids
+
+    monkeypatch.setattr(CommentService, "_latest_comment_ids", staticmethod(read_then_comment))
+    assert [c["id"] for c in CommentService.get_recent_comments(db_session)] == [first["id"]]
+    monkeypatch.setattr(CommentService, "_latest_comment_ids", staticmethod(read_latest))
+
+    expected = [created[1]["id"], created[0]["id"], first["id"]]
+    assert [c["id"] for c in CommentService.get_recent_comments(db_session)] == expected
+    assert recent_list.store["comments:recent"] == [str(comment_id) for comment_id in expected]
+
+
+@pytest.mark.unit
+def test_comment_detail_cache_is_dropped_on_edit_and_delete(db_session, fake_redis):
+    author = User(username="detail", email="detail@example.com", hashed_password=get_password_hash("Password1!"))
+    db_session.add(author)
+    db_session.commit()
+    post = Post(title="Detail", url=None, text="Body", post_type="story", user_id=author.id)
+    db_session.add(post)
+    db_session.commit()
+    comment = Comment(text="Original", user_id=author.id, post_id=post.id)
+    db_session.add(comment)
+    db_session.commit()
+    author_id, comment_id = author.id, comment.id
+
+    assert CommentService.get_comment_detail(db_session, comment_id)["text"] == "Original"
+    assert f"comment:{comment_id}:obj" in fake_redis
+
+    CommentService.update_comment(db_session, comment_id, CommentUpdate(text="Edited"), author_id)
+    assert CommentService.get_comment_detail(db_session, comment_id)["text"] == "Edited"
+
+    CommentService.delete_comment(db_session, comment_id, author_id)
+    detail = CommentService.get_comment_detail(db_session, comment_id)
+    assert detail["is_deleted"] is True
+    assert detail["text"] == "[deleted]"
@@ -0,0 +1,126 @@
+import pytest
+
+from auth import get_password_hash
+from models import Comment, Post, User
+import services.hydration_service as hydration_service
+from services.hydration_service import HydrationService
+from services.vote_service import VoteService
+from schemas import VoteCreate
+
+
+@pytest.fixture()
+def hydration_world(db_session):
+    alice = User(username="alice", email="alice@example.com", hashed_password=get_password_hash("Password1!"))
+    bob = User(username="bob", email="bob@example.com", hashed_password=get_password_hash("Password1!"))
+    db_session.add_all([alice, bob])
+    db_session.commit()
+    posts = [
+        Post(title=f"Post {n}", url=None, text="Body", post_type="story", user_id=alice.id, points=1)
+        for n in range(3)
+    ]
+    db_session.add_all(posts)
+    db_session.commit()
+    db_session.add(Comment(text="First", user_id=bob.id, post_id=posts[1].id))
+    db_session.commit()
+    return db_session, alice, bob, posts
+
+
+@pytest.mark.unit
+def test_posts_keep_input_order_and_skip_unknown_ids(hydration_world, fake_redis):
+    db, alice, _, posts = hydration_world
+    ids = [posts[2].id, 9999, posts[0].id, posts[1].id, posts[2].id]
+
+    hydrated = HydrationService.get_posts_by_ids(db, ids)
+
+    assert [post["id"] for post in hydrated] == [posts[2].id, posts[0].id, posts[1].id, posts[2].id]
+    assert hydrated[2]["comment_count"] == 1
+    assert hydrated[0]["username"] == alice.username
+    assert f"post:{posts[0].id}:obj" in fake_redis
+    assert "post:9999:obj" not in fake_redis
+
+
+@pytest.mark.unit
+def test_cached_objects_skip_sql_and_misses_load_in_one_query(hydration_world, count_queries):
+    db, _, _, posts = hydration_world
+    ids = [post.id for post in posts]
+    HydrationService.get_posts_by_ids(db, ids[:1])
+
+    with count_queries() as statements:
+        hydrated = HydrationService.get_posts_by_ids(db, ids)
+    assert len(statements) == 1
+    assert [post["id"] for post in hydrated] == ids
+
+    with count_queries() as statements:
+        HydrationService.get_posts_by_ids(db, ids)
+    assert statements == []
+
+
+@pytest.mark.unit
+def test_vote_bumps_cached_post_version(hydration_world):
+    db, _, bob, posts = hydration_world
+    assert HydrationService.get_posts_by_ids(db, [posts[0].id])[0]["points"] == 1
+
+    VoteService.vote_on_post(db, posts[0].id, VoteCreate(vote_type=1), bob.id)
+
+    assert HydrationService.get_posts_by_ids(db, [posts[0].id])[0]["points"] == 2
+
+
+@pytest.mark.unit
+def test_users_by_ids(hydration_world, count_queries):
+    db, alice, bob, _ = hydration_world
+    alice_id = alice.id
+
+    assert HydrationService.get_users_by_ids(db, [bob.id, alice.id, bob.id]) == [
+        {"id": bob.id, "username": "bob"},
+        {"id": alice.id, "username": "alice"},
+        {"id": bob.id, "username": "bob"},
+    ]
+    with count_queries() as statements:
+        HydrationService.get_users_by_ids(db, [alice_id])
+    assert statements == []
+
+
+@pytest.mark.unit
+def test_version_bump_reloads_only_counts(hydration_world, count_queries):
+    db, _, bob, posts = hydration_world
+    post_id = posts[1].id
+    HydrationService.get_posts_by_ids(db, [post_id])
+    db.add(Comment(text="Second", user_id=bob.id, post_id=post_id))
+    db.commit()
+
+    HydrationService.bump_post_versions([post_id])
+    with count_queries() as statements:
+        post = HydrationService.get_post(db, post_id)
+    assert post["comment_count"] == 2
+    assert len(statements) == 1
+    assert "users" not in statements[0]
+
+
+@pytest.mark.unit
+def test_get_post_waits_for_the_request_holding_the_lock(hydration_world, fake_redis, monkeypatch, count_queries):
+    db, _, _, posts = hydration_world
+    post_id = posts[0].id
+    fake_redis[f"post:{post_id}:lock"] = "1"
+
+    def holder_finishes(seconds):
+        HydrationService.get_posts_by_ids(db, [post_id])
+        fake_redis.pop(f"post:{post_id}:lock")
+
+    monkeypatch.setattr(hydration_service.time, "sleep", holder_finishes)
+    with count_queries() as statements:
+        post = HydrationService.get_post(db, post_id)
+    # Only the holder's load ran; the waiter read its result from the cache.
+    assert len(statements) == 1
+    assert post["id"] == post_id
+
+
+@pytest.mark.unit
+def test_get_post_loads_itself_when_the_lock_holder_goes_away(hydration_world, fake_redis, monkeypatch):
+    db, _, _, posts = hydration_world
+    post_id = posts[0].id
+    fake_redis[f"post:{post_id}:lock"] = "1"
+    monkeypatch.setattr(hydration_service.time, "sleep", lambda seconds: fake_redis.pop(f"post:{post_id}:lock", None))
+
+    assert HydrationService.get_post(db, post_id)["id"] == post_id
+    assert HydrationService.get_post(db, 9999) is None
+    assert "post:9999:lock" not in fake_redis
@@ -0,0 +1,12 @@
+import pytest
+
+from benchmarks.import_time import IMPORT_TIME_BUDGET_MS, best_of, eagerly_imported, format_report
+
+
+@pytest.mark.benchmark
+def test_api_cold_start_import_within_budget():
+    total_ms, timings = best_of("main", runs=3)
+    report = format_report("main", total_ms, timings)
+
+    assert eagerly_imported(timings) == [], report
+    assert total_ms <= IMPORT_TIME_BUDGET_MS, report
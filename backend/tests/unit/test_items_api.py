@@ -0,0 +1,48 @@
+import pytest
+
+
+@pytest.mark.unit
+def test_item_returns_post_thread_and_viewer_votes(client, auth_headers):
+    post_id = client.post(
+        "/posts/",
+        json={"title": "Item post", "url": "https://example.com", "text": None},
+        headers=auth_headers,
+    ).json()["id"]
+    top = client.post(f"/posts/{post_id}/comments", json={"text": "Top"}, headers=auth_headers).json()
+    reply = client.post(
+        f"/posts/{post_id}/comments",
+        json={"text": "Reply", "parent_id": top["id"]},
+        headers=auth_headers,
+    ).json()
+    client.post(f"/posts/{post_id}/vote", json={"vote_type": 1}, headers=auth_headers)
+    client.post(f"/comments/{reply['id']}/vote", json={"vote_type": 1}, headers=auth_headers)
+
+    response = client.get(f"/items/{post_id}", headers=auth_headers)
+
+    assert response.status_code == 200
+    item = response.json()
+    assert item["post"]["id"] == post_id
+    assert item["post"]["points"] == 1
+    assert [c["id"] for c in item["comments"]] == [top["id"]]
+    assert [r["id"] for r in item["comments"][0]["replies"]] == [reply["id"]]
+    assert item["viewer"] == {
+        "post_vote": 1,
+        "comment_votes": [{"comment_id": reply["id"], "vote_type": 1}],
+    }
+
+
+@pytest.mark.unit
+def test_item_is_anonymous_without_token_and_404s_for_missing_post(client, auth_headers):
+    post_id = client.post(
+        "/posts/",
+        json={"title": "Item post", "text": "Body", "url": None},
+        headers=auth_headers,
+    ).json()["id"]
+
+    client.cookies.clear()  # Logging in also set the auth cookie.
+    response = client.get(f"/items/{post_id}")
+    assert response.status_code == 200
+    assert response.json()["viewer"] is None
+    assert response.json()["comments"] == []
+
+    assert client.get("/items/999").status_code == 404
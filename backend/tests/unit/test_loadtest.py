@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import func
+
+from benchmarks.dataset import seed_dataset
+from benchmarks.stats import compare_reports, percentile, summarize
+from models import Comment, Post, User, Vote
+
+
+@pytest.mark.unit
+def test_percentile_interpolates_between_samples():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert percentile([], 95) == 0.0
+
+
+@pytest.mark.unit
+def test_summarize_counts_errors_and_rps():
+    summary = summarize([10.0, 20.0, 30.0, 40.0], duration_s=2.0, statuses={200: 3, 429: 1})
+
+    assert summary["requests"] == 4
+    assert summary["rps"] == 2.0
+    assert summary["errors"] == 1
+    assert summary["statuses"] == {"200": 3, "429": 1}
+    assert summary["p50_ms"] == 25.0
+
+
+@pytest.mark.unit
+def test_compare_reports_shows_relative_change():
+    base = {"scenarios": {"front_page": {"rps": 100.0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 40.0}}}
+    head = {"scenarios": {
+        "front_page": {"rps": 150.0, "p50_ms": 5.0, "p95_ms": 20.0, "p99_ms": 40.0},
+        "hot_thread": {"rps": 10.0, "p50_ms": 1.0, "p95_ms": 2.0, "p99_ms": 3.0},
+    }}
+
+    lines = compare_reports(base, head)
+
+    assert "+50.0%" in lines[0]
+    assert "-50.0%" in lines[0]
+    assert lines[1].startswith("hot_thread") and "(new)" in lines[1]
+
+
+@pytest.mark.unit
+def test_seed_dataset_builds_skewed_threads(db_session):
+    dataset = seed_dataset(db_session, users=30, posts=40, comments=400, votes=300, seed=7)
+
+    assert db_session.query(func.count(User.id)).scalar() == 30
+    assert db_session.query(func.count(Comment.id)).scalar() == 400
+    assert db_session.query(func.count(Vote.id)).scalar() == dataset.counts["votes"]
+
+    hottest = dataset.hot_post_ids(1)[0]
+    per_post = dict(
+        db_session.query(Comment.post_id, func.count(Comment.id)).group_by(Comment.post_id).all()
+    )
+    assert per_post[hottest] == max(per_post.values())
+
+    replies = db_session.query(Comment).filter(Comment.parent_id.isnot(None)).all()
+    assert replies
+    parents = {c.id: c for c in db_session.query(Comment).all()}
+    for reply in replies:
+        parent = parents[reply.parent_id]
+        assert parent.post_id == reply.post_id
+        assert reply.root_id == parent.root_id
+        assert parent.created_at <= reply.created_at
+
+    points = dict(db_session.query(Post.id, Post.points).all())
+    votes_per_post = dict(db_session.query(Vote.post_id, func.count(Vote.id)).group_by(Vote.post_id).all())
+    assert all(points[post_id] == count for post_id, count in votes_per_post.items())
@@ -0,0 +1,65 @@
+import pytest
+
+import metrics
+from metrics import MetricsRegistry, cache_family, merge_snapshots, render
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.registry.clear()
+    yield
+    metrics.registry.clear()
+
+
+@pytest.mark.unit
+def test_render_counter_and_histogram_in_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Demo requests.", ("route",))
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("route",), buckets=(0.1, 1.0))
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+
+    text = render(registry.snapshot())
+
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{route="/a"} 3' in text
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{route="/a"} 2' in text
+
+
+@pytest.mark.unit
+def test_merge_snapshots_sums_across_processes():
+    first, second = MetricsRegistry(), MetricsRegistry()
+    for registry, amount in ((first, 1), (second, 4)):
+        registry.counter("hits_total", "Hits.", ("family",)).inc(amount, family="feed")
+        registry.histogram("lat_seconds", "Latency.", buckets=(1.0,)).observe(0.5)
+
+    merged = merge_snapshots([first.snapshot(), second.snapshot()])
+
+    assert merged["hits_total"]["samples"] == [[["feed"], 5]]
+    assert merged["lat_seconds"]["samples"][0][1][-1] == 2
+
+
+@pytest.mark.unit
+def test_cache_family_collapses_ids():
+    assert cache_family("feed:new:all:day:all:v3:skip:0:limit:30") == "feed"
+    assert cache_family("post:12:comments:v4") == "post:*:comments"
+    assert cache_family("post:12:comments:v") == "post:*:comments:version"
+    assert cache_family("rate_limit:auth:ip:1.2.3.4") == "rate_limit"
+
+
+@pytest.mark.unit
+def test_metrics_endpoint_reports_route_latency_and_query_count(client):
+    assert client.get("/posts/?limit=5").status_code == 200
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'hn_http_request_duration_seconds_count{method="GET",route="/posts/",status="200"} 1' in response.text
+    assert 'hn_db_queries_per_request_count{route="/posts/"} 1' in response.text
+    assert "hn_password_hash_in_flight 0" in response.text
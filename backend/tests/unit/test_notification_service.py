@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from fastapi import HTTPException
 
@@ -90,3 +92,128 @@ def test_get_unread_count(db_session):
     db_session.commit()
 
     assert NotificationService.get_unread_count(db_session, user.id) == 1
+
+
+@pytest.mark.unit
+def test_unread_count_served_from_cache_and_adjusted(db_session, fake_redis):
+    user = User(username="cached", email="cached@example.com", hashed_password=get_password_hash("Password1!"))
+    actor = User(username="actor3", email="actor3@example.com", hashed_password=get_password_hash("Password1!"))
+    db_session.add_all([user, actor])
+    db_session.commit()
+    db_session.refresh(user)
+    db_session.refresh(actor)
+
+    post = Post(title="Post", url=None, text="Body", post_type="story", user_id=user.id)
+    db_session.add(post)
+    db_session.commit()
+    db_session.refresh(post)
+
+    notification = Notification(
+        user_id=user.id,
+        actor_id=actor.id,
+        type=NotificationType.COMMENT_ON_POST,
+        post_id=post.id,
+        comment_id=None,
+        message="Hello",
+    )
+    db_session.add(notification)
+    db_session.commit()
+    db_session.refresh(notification)
+
+    assert NotificationService.get_unread_count(db_session, user.id) == 1
+    assert fake_redis[f"notifications:unread:{user.id}"] == "1"
+
+    NotificationService.bump_unread_count(user.id)
+    assert NotificationService.get_unread_count(db_session, user.id) == 2
+
+    NotificationService.mark_notification_as_read(db_session, notification.id, user.id)
+    assert NotificationService.get_unread_count(db_session, user.id) == 1
+
+    # Marking an already-read notification must not decrement again.
+    NotificationService.mark_notification_as_read(db_session, notification.id, user.id)
+    assert NotificationService.get_unread_count(db_session, user.id) == 1
+
+
+def _seed_notifications(db_session, count: int):
+    user = User(username="bulk", email="bulk@example.com", hashed_password=get_password_hash("Password1!"))
+    actor = User(username="bulkactor", email="bulkactor@example.com", hashed_password=get_password_hash("Password1!"))
+    db_session.add_all([user, actor])
+    db_session.commit()
+
+    post = Post(title="Post", url=None, text="Body", post_type="story", user_id=user.id)
+    db_session.add(post)
+    db_session.commit()
+
+    notifications = [
+        Notification(
+            user_id=user.id,
+            actor_id=actor.id,
+            type=NotificationType.COMMENT_ON_POST,
+            post_id=post.id,
+            comment_id=None,
+            message=f"Hello {index}",
+            created_at=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=index),
+        )
+        for index in range(count)
+    ]
+    db_session.add_all(notifications)
+    db_session.commit()
+    return user, [notification.id for notification in notifications]
+
+
+@pytest.mark.unit
+def test_get_user_notifications_keyset_pagination(db_session):
+    user, ids = _seed_notifications(db_session, 5)
+
+    first_page = NotificationService.get_user_notifications(db_session, user.id, limit=2)
+    assert [item["id"] for item in first_page] == [ids[4], ids[3]]
+
+    second_page = NotificationService.get_user_notifications(
+        db_session, user.id, limit=2, before_id=first_page[-1]["id"]
+    )
+    assert [item["id"] for item in second_page] == [ids[2], ids[1]]
+
+
+@pytest.mark.unit
+def test_mark_notifications_as_read_bulk(db_session):
+    user, ids = _seed_notifications(db_session, 4)
+    assert NotificationService.get_unread_count(db_session, user.id) == 4
+
+    assert NotificationService.mark_notifications_as_read(db_session, user.id, ids=[ids[0], ids[1]]) == 2
+    assert NotificationService.get_unread_count(db_session, user.id) == 2
+
+    assert NotificationService.mark_notifications_as_read(db_session, user.id, up_to_id=ids[3]) == 2
+    assert NotificationService.get_unread_count(db_session, user.id) == 0
+    assert NotificationService.mark_notifications_as_read(db_session, user.id, ids=[]) == 0
+
+
+@pytest.mark.unit
+def test_purge_read_notifications(db_session):
+    user, ids = _seed_notifications(db_session, 3)
+    NotificationService.mark_notifications_as_read(db_session, user.id, ids=[ids[0], ids[1]])
+
+    assert NotificationService.purge_read_notifications(db_session, older_than_days=1, batch_size=1) == 2
+    remaining = db_session.query(Notification).all()
+    assert [notification.id for notification in remaining] == [ids[2]]
+
+
+@pytest.mark.unit
+def test_unread_count_seed_keeps_a_peer_seed_and_its_bumps(db_session, fake_redis, monkeypatch):
+    from services import notification_service
+
+    user = User(username="seeded", email="seeded@example.com", hashed_password=get_password_hash("Password1!"))
+    db_session.add(user)
+    db_session.commit()
+    user_id = user.id
+    key = f"notifications:unread:{user_id}"
+    set_nx = notification_service.redis_set_nx
+
+    def peer_seeds_then_bump(cache_key, value, ttl_seconds):
+        # Another reader seeds the counter after our COUNT, then a notification bumps it.
+        fake_redis[cache_key] = "0"
+        NotificationService.bump_unread_count(user_id)
+        return set_nx(cache_key, value, ttl_seconds)
+
+    monkeypatch.setattr(notification_service, "redis_set_nx", peer_seeds_then_bump)
+    assert NotificationService.get_unread_count(db_session, user_id) == 1
+    assert fake_redis[key] == "1"
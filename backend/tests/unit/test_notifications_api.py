@@ -39,3 +39,16 @@ def test_notifications_created_for_comments(client, make_user):
     notifications = notifications_response.json()
     assert len(notifications) == 1
     assert notifications[0]["actor_username"] == commenter["username"]
+
+
+@pytest.mark.unit
+def test_bulk_mark_as_read_requires_one_selector(client, auth_headers):
+    response = client.put("/notifications/read", json={}, headers=auth_headers)
+    assert response.status_code == 422
+
+    response = client.put("/notifications/read", json={"ids": [1], "up_to_id": 1}, headers=auth_headers)
+    assert response.status_code == 422
+
+    response = client.put("/notifications/read", json={"up_to_id": 10}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"updated": 0}
@@ -143,3 +143,60 @@ def test_vote_updates_post_points(db_session):
     VoteService.vote_on_post(db_session, post.id, VoteCreate(vote_type=1), user.id)
     db_session.refresh(post)
     assert post.points == 1
+
+
+@pytest.mark.unit
+def test_past_serves_frozen_ranking_with_live_points(db_session, fake_redis):
+    user = User(username="frozen", email="frozen@example.com", hashed_password=get_password_hash("Password1!"))
+    db_session.add(user)
+    db_session.commit()
+
+    day = date(2024, 1, 1)
+    low = Post(title="Low", url=None, text="Body", post_type="story", user_id=user.id, points=1,
+               created_at=datetime(2024, 1, 1, 9, tzinfo=timezone.utc))
+    high = Post(title="High", url=None, text="Body", post_type="ask", user_id=user.id, points=10,
+                created_at=datetime(2024, 1, 1, 10, tzinfo=timezone.utc))
+    db_session.add_all([low, high])
+    db_session.commit()
+
+    assert PostService.freeze_past_day(db_session, day) == 4  # all: 2, story: 1, ask: 1
+    assert PostService.freeze_past_day(db_session, day) == 0
+
+    # Late votes change points but not the frozen order.
+    low.points = 50
+    db_session.commit()
+    results = PostService.get_posts(db_session, sort="past", day=day, skip=0, limit=10)
+    assert [(post["title"], post["points"]) for post in results] == [("High", 10), ("Low", 50)]
+    assert PostService.get_posts(db_session, sort="past", day=day, skip=1, limit=10)[0]["title"] == "Low"
+    ask = PostService.get_posts(db_session, sort="past", day=day, skip=0, limit=10, post_type="ask")
+    assert [post["title"] for post in ask] == ["High"]
+
+
+@pytest.mark.unit
+def test_frozen_day_pages_past_the_end_skip_the_live_ranking(db_session, fake_redis, count_queries):
+    user = User(username="pastend", email="pastend@example.com", hashed_password=get_password_hash("Password1!"))
+    db_session.add(user)
+    db_session.commit()
+    day = date(2024, 1, 1)
+    db_session.add(Post(title="Only", url=None, text="Body", post_type="story", user_id=user.id,
+                        created_at=datetime(2024, 1, 1, 9, tzinfo=timezone.utc)))
+    db_session.commit()
+    PostService.freeze_past_day(db_session, day)
+
+    for skip, post_type in ((30, None), (0, "job")):
+        with count_queries() as statements:
+            assert PostService.get_posts(db_session, sort="past", day=day, skip=skip, limit=30, post_type=post_type) == []
+        assert not [statement for statement in statements if "FROM posts" in statement]
+
+
+@pytest.mark.unit
+def test_latest_day_lookup_is_cached(db_session, fake_redis, count_queries):
+    user = User(username="latest", email="latest@example.com", hashed_password=get_password_hash("Password1!"))
+    db_session.add(user)
+    db_session.commit()
+    PostService.create_post(db_session, PostCreate(title="Today", url="https://example.com", text=None), user.id)
+
+    assert fake_redis["feed:latest_day:all"] == fake_redis["feed:latest_day:story"]
+    with count_queries() as statements:
+        PostService.get_posts(db_session, sort="past", skip=0, limit=10)
+    assert not any("max(" in statement.lower() for statement in statements)
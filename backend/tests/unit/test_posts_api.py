@@ -59,3 +59,34 @@ def test_get_posts_filters_by_post_type(client, auth_headers):
     assert len(payload) == 1
     assert payload[0]["post_type"] == "show"
 
+
+
+@pytest.mark.unit
+def test_get_posts_embeds_viewer_votes_from_cached_set(client, auth_headers, count_queries, fake_redis):
+    ids = [
+        client.post(
+            "/posts/",
+            json={"title": f"Post {i}", "url": f"https://example.com/{i}", "text": None},
+            headers=auth_headers,
+        ).json()["id"]
+        for i in range(3)
+    ]
+    client.post(f"/posts/{ids[1]}/vote", json={"vote_type": 1}, headers=auth_headers)
+
+    plain = client.get("/posts/", headers=auth_headers).json()
+    assert all(post["vote_type"] is None for post in plain)
+
+    feed = client.get("/posts/", params={"include_votes": True}, headers=auth_headers).json()
+    assert {post["id"]: post["vote_type"] for post in feed} == {ids[0]: 0, ids[1]: 1, ids[2]: 0}
+
+    # The vote set is warm now and kept current by later votes: no votes query.
+    client.delete(f"/posts/{ids[1]}/vote", headers=auth_headers)
+    client.post(f"/posts/{ids[2]}/vote", json={"vote_type": 1}, headers=auth_headers)
+    with count_queries() as statements:
+        feed = client.get("/posts/", params={"include_votes": True}, headers=auth_headers).json()
+    assert {post["id"]: post["vote_type"] for post in feed} == {ids[0]: 0, ids[1]: 0, ids[2]: 1}
+    assert not [statement for statement in statements if "FROM votes" in statement]
+
+    client.cookies.clear()
+    anonymous = client.get("/posts/", params={"include_votes": True}).json()
+    assert all(post["vote_type"] is None for post in anonymous)
@@ -0,0 +1,144 @@
+import pytest
+from fastapi.routing import APIRoute
+
+from main import app
+
+# Maximum SQL statements per request, measured with Redis caches cold (the test
+# fake starts empty) and write queue mode "sync". Lower a budget when a change
+# saves round trips; raising one needs a reason in the commit message.
+QUERY_BUDGETS = {
+    "GET /": 0,
+    "POST /auth/register": 4,
+    "POST /auth/login": 2,
+    "GET /auth/username-available": 2,
+    "GET /auth/me": 1,
+    "POST /auth/logout": 1,
+    "POST /posts/": 4,
+    "GET /posts/": 3,
+    "GET /posts/search": 3,
+    "GET /posts/{post_id}": 2,
+    # Also loads a cold voted-posts set after the response.
+    "POST /posts/votes/bulk": 3,
+    "POST /posts/{post_id}/vote": 4,
+    "GET /posts/{post_id}/vote": 3,
+    "DELETE /posts/{post_id}/vote": 5,
+    "POST /posts/{post_id}/comments": 5,
+    "GET /posts/{post_id}/comments": 3,
+    "GET /comments/recent": 3,
+    "GET /comments/{comment_id}": 2,
+    "PUT /comments/{comment_id}": 4,
+    "DELETE /comments/{comment_id}": 4,
+    "POST /comments/votes/bulk": 2,
+    "POST /comments/{comment_id}/vote": 6,
+    "GET /comments/{comment_id}/vote": 3,
+    "DELETE /comments/{comment_id}/vote": 3,
+    "GET /notifications/": 2,
+    "PUT /notifications/read": 2,
+    "PUT /notifications/{notification_id}/read": 3,
+    "GET /notifications/unread/count": 2,
+    # Also loads a cold voted-posts set after the response.
+    "GET /items/{post_id}": 6,
+}
+
+# Long-lived or non-JSON endpoints that the budget table does not cover.
+UNBUDGETED_ROUTES = {
+    "GET /posts/{post_id}/comments/stream",
+    "GET /notifications/stream",
+    "GET /metrics",
+}
+
+
+def _request(world: dict, route: str) -> tuple[str, str, dict]:
+    post_id = world["post_id"]
+    comment_id = world["comment_id"]
+    method, path = route.split(" ", 1)
+    path = path.format(post_id=post_id, comment_id=comment_id, notification_id=world["notification_id"])
+    kwargs: dict = {"headers": world["alice"]}
+    if route == "POST /auth/register":
+        kwargs = {"json": {"username": "carol", "email": "carol@example.com", "password": "Password1!"}}
+    elif route == "POST /auth/login":
+        kwargs = {"json": {"username": "alice", "password": "Password1!"}}
+    elif route == "GET /auth/username-available":
+        kwargs["params"] = {"username": "dave"}
+    elif route == "POST /posts/":
+        kwargs["json"] = {"title": "Budget", "url": "https://example.com/budget", "text": None}
+    elif route == "GET /posts/search":
+        kwargs["params"] = {"q": "Hello"}
+    elif route == "POST /posts/votes/bulk":
+        kwargs["json"] = {"post_ids": [post_id]}
+    elif route == "POST /comments/votes/bulk":
+        kwargs["json"] = {"comment_ids": [comment_id]}
+    elif route in {"POST /posts/{post_id}/vote", "POST /comments/{comment_id}/vote"}:
+        kwargs["json"] = {"vote_type": 1}
+    elif route == "POST /posts/{post_id}/comments":
+        kwargs["json"] = {"text": "Another reply", "parent_id": comment_id}
+    elif route == "PUT /comments/{comment_id}":
+        kwargs["json"] = {"text": "Edited"}
+    elif route == "PUT /notifications/read":
+        kwargs["json"] = {"up_to_id": world["notification_id"]}
+    if route in {"PUT /comments/{comment_id}", "DELETE /comments/{comment_id}", "GET /notifications/",
+                 "PUT /notifications/read", "PUT /notifications/{notification_id}/read",
+                 "GET /notifications/unread/count"}:
+        # bob owns the comment and receives the reply notification.
+        kwargs["headers"] = world["bob"]
+    if route == "DELETE /posts/{post_id}/vote":
+        kwargs["headers"] = world["bob"]
+    return method, path, kwargs
+
+
+@pytest.fixture()
+def world(client, make_user):
+    headers = {}
+    for name in ("alice", "bob"):
+        make_user(name)
+        token = client.post("/auth/login", json={"username": name, "password": "Password1!"}).json()["access_token"]
+        headers[name] = {"Authorization": f"Bearer {token}"}
+
+    post = client.post(
+        "/posts/",
+        json={"title": "Hello HN", "url": "https://example.com", "text": None},
+        headers=headers["alice"],
+    ).json()
+    comment = client.post(f"/posts/{post['id']}/comments", json={"text": "Top"}, headers=headers["bob"]).json()
+    client.post(
+        f"/posts/{post['id']}/comments",
+        json={"text": "Reply", "parent_id": comment["id"]},
+        headers=headers["alice"],
+    )
+    client.post(f"/posts/{post['id']}/vote", json={"vote_type": 1}, headers=headers["bob"])
+    notification = client.get("/notifications/", headers=headers["bob"]).json()[0]
+    return {
+        "alice": headers["alice"],
+        "bob": headers["bob"],
+        "post_id": post["id"],
+        "comment_id": comment["id"],
+        "notification_id": notification["id"],
+    }
+
+
+@pytest.mark.unit
+def test_every_route_has_a_query_budget():
+    routes = {
+        f"{method} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+
+    assert routes - UNBUDGETED_ROUTES - set(QUERY_BUDGETS) == set()
+    assert set(QUERY_BUDGETS) - routes == set()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("route", sorted(QUERY_BUDGETS))
+def test_route_stays_within_query_budget(client, world, count_queries, route):
+    method, path, kwargs = _request(world, route)
+
+    with count_queries() as statements:
+        response = client.request(method, path, **kwargs)
+
+    assert response.status_code < 400, response.text
+    budget = QUERY_BUDGETS[route]
+    assert len(statements) <= budget, (
+        f"{route} ran {len(statements)} statements (budget {budget}):\n" + "\n".join(statements)
+    )
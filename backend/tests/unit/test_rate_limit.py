@@ -18,19 +18,11 @@ class _Request:
 def test_rate_limit_tracks_ip(monkeypatch):
     store = {}
 
-    def redis_get(key):
-        return store.get(key)
-
-    def redis_incr(key):
+    def redis_incr_expire(key, ttl):
         store[key] = str(int(store.get(key, 0)) + 1)
         return int(store[key])
 
-    def redis_expire(key, ttl):
-        return None
-
-    monkeypatch.setattr(rate_limit, "redis_get", redis_get)
-    monkeypatch.setattr(rate_limit, "redis_incr", redis_incr)
-    monkeypatch.setattr(rate_limit, "redis_expire", redis_expire)
+    monkeypatch.setattr(rate_limit, "redis_incr_expire", redis_incr_expire)
 
     dependency = rate_limit.rate_limit()
     for _ in range(200):
@@ -43,19 +35,11 @@ def test_rate_limit_tracks_ip(monkeypatch):
 def test_rate_limit_tracks_user(monkeypatch):
     store = {}
 
-    def redis_get(key):
-        return store.get(key)
-
-    def redis_incr(key):
+    def redis_incr_expire(key, ttl):
         store[key] = str(int(store.get(key, 0)) + 1)
         return int(store[key])
 
-    def redis_expire(key, ttl):
-        return None
-
-    monkeypatch.setattr(rate_limit, "redis_get", redis_get)
-    monkeypatch.setattr(rate_limit, "redis_incr", redis_incr)
-    monkeypatch.setattr(rate_limit, "redis_expire", redis_expire)
+    monkeypatch.setattr(rate_limit, "redis_incr_expire", redis_incr_expire)
 
     dependency = rate_limit.rate_limit()
     user = type("User", (), {"id": 42})()
@@ -66,19 +50,33 @@ def test_rate_limit_tracks_user(monkeypatch):
 
 
 @pytest.mark.unit
-def test_rate_limit_handles_bad_counter(monkeypatch):
-    def redis_get(key):
-        return "not-an-int"
-
-    def redis_incr(key):
-        return 1
-
-    def redis_expire(key, ttl):
+def test_rate_limit_fails_open_without_counter(monkeypatch):
+    # A non-integer counter or an unreachable Redis both surface as None.
+    def redis_incr_expire(key, ttl):
         return None
 
-    monkeypatch.setattr(rate_limit, "redis_get", redis_get)
-    monkeypatch.setattr(rate_limit, "redis_incr", redis_incr)
-    monkeypatch.setattr(rate_limit, "redis_expire", redis_expire)
+    monkeypatch.setattr(rate_limit, "redis_incr_expire", redis_incr_expire)
 
     dependency = rate_limit.rate_limit()
     dependency(_Request(), None)
+
+
+@pytest.mark.unit
+def test_auth_rate_limit_uses_separate_stricter_bucket(monkeypatch):
+    store = {}
+
+    def redis_incr_expire(key, ttl):
+        store[key] = str(int(store.get(key, 0)) + 1)
+        return int(store[key])
+
+    monkeypatch.setattr(rate_limit, "redis_incr_expire", redis_incr_expire)
+
+    dependency = rate_limit.auth_rate_limit()
+    for _ in range(rate_limit.AUTH_RATE_LIMIT_PER_MINUTE):
+        dependency(_Request(), None)
+    with pytest.raises(HTTPException):
+        dependency(_Request(), None)
+
+    # The global bucket is untouched by password endpoints.
+    assert "rate_limit:ip:127.0.0.1" not in store
+    rate_limit.rate_limit()(_Request(), None)
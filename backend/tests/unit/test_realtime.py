@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+
+import realtime
+from services import event_service
+from services.event_service import EventService, LiveEventType
+
+
+@pytest.mark.unit
+def test_event_service_publishes_topic_envelope(monkeypatch):
+    published = []
+    monkeypatch.setattr(event_service, "redis_publish", lambda channel, message: published.append((channel, message)))
+
+    EventService.publish_thread_event(7, LiveEventType.COMMENT_CREATED, {"comment_id": 3, "parent_id": None})
+    EventService.publish_notification(2, {"comment_id": 3})
+
+    channel, message = published[0]
+    assert channel == event_service.EVENTS_CHANNEL
+    assert json.loads(message) == {
+        "topic": "post:7",
+        "event": "comment.created",
+        "data": {"comment_id": 3, "parent_id": None, "post_id": 7},
+    }
+    assert json.loads(published[1][1])["topic"] == "user:2"
+
+
+@pytest.mark.unit
+def test_broker_fans_out_by_topic(monkeypatch):
+    monkeypatch.setattr(realtime, "REDIS_ENABLED", False)
+
+    async def scenario():
+        broker = realtime.EventBroker()
+        first = broker.subscribe("post:1")
+        second = broker.subscribe("post:1")
+        other = broker.subscribe("post:2")
+
+        broker.dispatch(json.dumps({"topic": "post:1", "event": "post.points", "data": {"points": 4}}))
+        broker.dispatch("not-json")
+
+        assert first.get_nowait() == ("post.points", {"points": 4})
+        assert second.get_nowait() == ("post.points", {"points": 4})
+        assert other.empty()
+
+        broker.unsubscribe("post:1", first)
+        broker.unsubscribe("post:1", second)
+        broker.dispatch(json.dumps({"topic": "post:1", "event": "post.points", "data": {}}))
+        assert first.empty()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.unit
+def test_broker_stream_formats_sse_frames(monkeypatch):
+    monkeypatch.setattr(realtime, "REDIS_ENABLED", False)
+
+    class _Request:
+        async def is_disconnected(self):
+            return False
+
+    async def scenario():
+        broker = realtime.EventBroker()
+        stream = broker.stream("user:5", _Request())
+        assert (await stream.__anext__()).startswith("retry:")
+        next_frame = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        broker.dispatch(json.dumps({"topic": "user:5", "event": "notification.created", "data": {"comment_id": 9}}))
+        frame = await next_frame
+        await stream.aclose()
+        return frame, broker
+
+    frame, broker = asyncio.run(scenario())
+    assert frame == 'event: notification.created\ndata: {"comment_id": 9}\n\n'
+    assert broker._subscribers == {}
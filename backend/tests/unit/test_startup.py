@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import StaticPool
+
+import startup
+from startup import StartupTimings, prepare_schema
+
+
+def _memory_engine():
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+@pytest.mark.unit
+def test_prepare_schema_create_mode_builds_tables():
+    engine = _memory_engine()
+    with engine.begin() as conn:
+        prepare_schema(conn, mode="create")
+    assert "notifications" in inspect(engine).get_table_names()
+
+
+@pytest.mark.unit
+def test_prepare_schema_skip_mode_runs_no_ddl():
+    engine = _memory_engine()
+    with engine.begin() as conn:
+        prepare_schema(conn, mode="skip")
+    assert inspect(engine).get_table_names() == []
+
+
+@pytest.mark.unit
+def test_prepare_schema_verify_mode_rejects_unmigrated_database():
+    pytest.importorskip("alembic")
+    engine = _memory_engine()
+    with engine.begin() as conn:
+        with pytest.raises(RuntimeError, match="alembic upgrade head"):
+            prepare_schema(conn, mode="verify")
+
+
+@pytest.mark.unit
+def test_prepare_schema_rejects_unknown_mode():
+    engine = _memory_engine()
+    with engine.begin() as conn:
+        with pytest.raises(RuntimeError):
+            prepare_schema(conn, mode="bogus")
+
+
+@pytest.mark.unit
+def test_startup_timings_report(monkeypatch):
+    ticks = iter([1.0, 1.25])
+    monkeypatch.setattr(startup.time, "perf_counter", lambda: next(ticks))
+
+    timings = StartupTimings()
+    timings.record("import", 12.0)
+    with timings.measure("first_query"):
+        pass
+
+    assert timings.timings == {"import": 12.0, "first_query": 250.0}
+    assert timings.report() == "import=12.0ms first_query=250.0ms"
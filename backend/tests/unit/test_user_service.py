@@ -1,7 +1,10 @@
+import asyncio
+
 import pytest
 from fastapi import HTTPException
 
 from schemas import UserCreate
+from services import user_service
 from services.user_service import UserService
 
 
@@ -62,3 +65,25 @@ def test_user_service_authenticate_user(db_session):
     assert UserService.authenticate_user(db_session, "auth", "Password1!") is not False
     assert UserService.authenticate_user(db_session, "auth", "Wrong1!") is False
     assert UserService.authenticate_user(db_session, "missing", "Password1!") is False
+
+
+@pytest.mark.unit
+def test_register_user_hashes_only_when_the_user_will_be_created(db_session, monkeypatch):
+    hashed = []
+
+    async def hash_password(password):
+        hashed.append(password)
+        return "hashed"
+
+    monkeypatch.setattr(user_service, "hash_password_async", hash_password)
+    user = asyncio.run(UserService.register_user(
+        db_session, UserCreate(username="taken", email="taken@example.com", password="Password1!")
+    ))
+    assert user.hashed_password == "hashed"
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(UserService.register_user(
+            db_session, UserCreate(username="taken", email="other@example.com", password="Password2!")
+        ))
+    assert exc.value.detail == "Username already registered"
+    assert hashed == ["Password1!"]
@@ -1,9 +1,10 @@
 import pytest
-from fastapi import HTTPException
+from fastapi import BackgroundTasks, HTTPException
 
 from auth import get_password_hash
 from models import User, Post, Comment
 from schemas import VoteCreate, CommentVoteCreate
+from services import vote_service
 from services.vote_service import VoteService
 from services.comment_vote_service import CommentVoteService
 
@@ -101,3 +102,41 @@ def test_comment_vote_service_updates_vote(db_session):
     assert same_vote.id == vote.id
     db_session.refresh(comment)
     assert comment.points == 1
+
+
+@pytest.mark.unit
+def test_cold_voted_posts_answer_the_page_and_rebuild_only_without_a_racing_vote(
+    db_session, fake_redis, count_queries, monkeypatch
+):
+    user, post = _create_user_post(db_session, username="dana")
+    other = Post(title="Other", url=None, text="Body", post_type="story", user_id=user.id)
+    db_session.add(other)
+    db_session.commit()
+    user_id, post_id, other_id = user.id, post.id, other.id
+    VoteService.vote_on_post(db_session, post_id, VoteCreate(vote_type=1), user_id)
+
+    background_tasks = BackgroundTasks()
+    with count_queries() as statements:
+        assert VoteService.get_voted_post_ids(db_session, user_id, [post_id, other_id], background_tasks) == {post_id}
+    # Only the requested posts are looked up; the full set is left to the background task.
+    assert len(statements) == 1
+    assert "IN" in statements[0]
+    assert [task.func for task in background_tasks.tasks] == [VoteService.rebuild_voted_posts]
+
+    rebuild_set = vote_service.redis_rebuild_set
+
+    def unvote_then_rebuild(*args):
+        # The vote is removed after the rebuild's SELECT, before its write.
+        VoteService.remove_vote_on_post(db_session, post_id, user_id)
+        return rebuild_set(*args)
+
+    monkeypatch.setattr(vote_service, "redis_rebuild_set", unvote_then_rebuild)
+    assert VoteService.rebuild_voted_posts(user_id) is False
+    assert VoteService.VOTED_POSTS_COMPLETE_MARKER not in fake_redis[f"votes:posts:{user_id}"]
+    assert VoteService.get_voted_post_ids(db_session, user_id, [post_id]) == set()
+
+    monkeypatch.setattr(vote_service, "redis_rebuild_set", rebuild_set)
+    assert VoteService.rebuild_voted_posts(user_id) is True
+    with count_queries() as statements:
+        assert VoteService.get_voted_post_ids(db_session, user_id, [post_id, other_id]) == set()
+    assert statements == []
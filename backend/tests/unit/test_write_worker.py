@@ -0,0 +1,337 @@
+import pytest
+
+from models import Post, User, Vote
+from workers import write_queue_worker as worker
+
+
+@pytest.fixture()
+def worker_stats():
+    worker.stats.reset()
+    yield worker.stats
+    worker.stats.reset()
+
+
+@pytest.mark.unit
+def test_process_events_records_stage_timings(db_session, worker_stats):
+    user = User(username="voter", email="voter@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.flush()
+    post = Post(title="Hello", url="https://example.com", user_id=user.id)
+    db_session.add(post)
+    db_session.commit()
+
+    events = [{"type": "post.vote.add", "request_id": "r1", "user_id": str(user.id), "post_id": str(post.id)}]
+
+    assert worker._process_events(events) is True
+    # Redelivered batches are claimed again and skipped.
+    assert worker._process_events(events) is True
+
+    snapshot = worker_stats.snapshot()
+    assert snapshot["batches"] == 2
+    assert snapshot["events"] == 2
+    assert snapshot["duplicate_events"] == 1
+    assert snapshot["events.post.vote.add"] == 1
+    assert snapshot["last_batch_size"] == 1
+    for stage in ("claim", "apply.post.vote.add", "points", "commit", "cache_bump", "publish"):
+        assert snapshot[f"stage_seconds.{stage}"] >= 0
+    assert db_session.query(Vote).count() == 1
+
+
+@pytest.mark.unit
+def test_report_publishes_snapshot_and_resets_interval(monkeypatch, worker_stats):
+    published = {}
+    monkeypatch.setattr(worker, "redis_hset", lambda key, mapping, ttl_seconds=None: published.update({key: mapping}))
+
+    worker_stats.incr("batches")
+    worker_stats.incr("events", 10)
+    worker_stats.add_stage("claim", 0.5)
+    worker_stats.report()
+    assert published == {}
+
+    worker_stats.report(force=True)
+
+    key = f"{worker.WRITE_WORKER_STATS_KEY_PREFIX}{worker.WRITE_STREAM_CONSUMER}"
+    assert published[key]["events"] == 10
+    assert published[key]["stage_seconds.claim"] == 0.5
+
+
+@pytest.mark.unit
+def test_batch_controller_grows_on_full_fast_batches_and_backs_off(worker_stats):
+    controller = worker.BatchController(initial=100, minimum=10, maximum=150, target_ms=50)
+
+    # A partial batch means the backlog is drained; there is nothing to grow for.
+    assert controller.observe(40, txn_ms=5, failed=False, lock_error=False) == 100
+    assert controller.observe(100, txn_ms=5, failed=False, lock_error=False) == 125
+    assert controller.observe(125, txn_ms=5, failed=False, lock_error=False) == 150
+    assert controller.observe(150, txn_ms=5, failed=False, lock_error=False) == 150
+
+    # Slow commits shrink in proportion to the overshoot, at most by half.
+    assert controller.observe(150, txn_ms=60, failed=False, lock_error=False) == 125
+    assert controller.observe(125, txn_ms=500, failed=False, lock_error=False) == 62
+    assert controller.observe(62, txn_ms=5, failed=False, lock_error=True) == 31
+    assert controller.observe(31, txn_ms=5, failed=True, lock_error=False) == 15
+    assert controller.observe(15, txn_ms=5, failed=True, lock_error=False) == 10
+
+    snapshot = worker_stats.snapshot()
+    assert snapshot["batch_size_target"] == 10
+    assert snapshot["batch_size_increases"] == 2
+    assert snapshot["batch_size_decreases"] == 5
+
+
+@pytest.mark.unit
+def test_vote_toggles_in_one_batch_apply_last_write(db_session, worker_stats, fake_redis):
+    users = [User(username=f"toggler{i}", email=f"toggler{i}@example.com", hashed_password="x") for i in range(2)]
+    db_session.add_all(users)
+    db_session.flush()
+    post = Post(title="Toggle", url="https://example.com/toggle", user_id=users[0].id)
+    db_session.add(post)
+    db_session.commit()
+
+    def vote(request_id, event_type, user):
+        return {"type": event_type, "request_id": request_id, "user_id": str(user.id), "post_id": str(post.id)}
+
+    events = [
+        vote("t1", "post.vote.add", users[0]),
+        vote("t2", "post.vote.remove", users[0]),
+        vote("t3", "post.vote.add", users[0]),
+        vote("t4", "post.vote.add", users[1]),
+        vote("t5", "post.vote.remove", users[1]),
+    ]
+
+    assert worker._process_events(events) is True
+
+    db_session.expire_all()
+    assert [v.user_id for v in db_session.query(Vote).all()] == [users[0].id]
+    assert db_session.get(Post, post.id).points == 1
+    snapshot = worker_stats.snapshot()
+    assert snapshot["folded_vote_events"] == 3
+    # The per-user voted-post sets follow the applied votes.
+    assert fake_redis[f"votes:posts:{users[0].id}"] == {post.id}
+    assert f"votes:posts:{users[1].id}" not in fake_redis
+    assert snapshot["events.post.vote.add"] == 1
+    assert snapshot["events.post.vote.remove"] == 1
+
+
+@pytest.mark.unit
+def test_enqueue_routes_events_to_the_post_partition(monkeypatch):
+    from services import queue_service
+
+    added = []
+
+    class RecordingStream:
+        def xadd(self, key, fields):
+            added.append((key, fields["type"]))
+
+    monkeypatch.setattr(queue_service, "WRITE_QUEUE_MODE", "redis")
+    monkeypatch.setattr(queue_service, "REDIS_ENABLED", True)
+    monkeypatch.setattr(queue_service, "redis_client", RecordingStream())
+    monkeypatch.setattr(queue_service, "WRITE_STREAM_PARTITIONS", 4)
+
+    queue_service.enqueue_write("post.vote.add", {"user_id": 1, "post_id": 6})
+    queue_service.enqueue_write("comment.vote.add", {"user_id": 1, "comment_id": 9, "post_id": 7})
+
+    assert added == [
+        (f"{queue_service.WRITE_STREAM_KEY}:2", "post.vote.add"),
+        (f"{queue_service.WRITE_STREAM_KEY}:3", "comment.vote.add"),
+    ]
+    assert queue_service.write_stream_keys()[0] == f"{queue_service.WRITE_STREAM_KEY}:0"
+
+
+@pytest.mark.unit
+def test_owned_partitions_default_to_all_and_reject_unknown(monkeypatch):
+    monkeypatch.setattr(worker, "WRITE_STREAM_PARTITIONS", 4)
+
+    assert worker._owned_partitions("") == [0, 1, 2, 3]
+    assert worker._owned_partitions("3, 1") == [1, 3]
+    with pytest.raises(ValueError):
+        worker._owned_partitions("4")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("preallocate", [True, False], ids=["preallocated-ids", "returning"])
+def test_bulk_comment_insert_sets_root_ids_and_notifies(db_session, worker_stats, monkeypatch, preallocate):
+    from models import Comment, Notification
+
+    if not preallocate:
+        monkeypatch.setattr(worker, "_allocate_comment_ids", lambda db, count: None)
+
+    alice, bob, carol = (
+        User(username=name, email=f"{name}@example.com", hashed_password="x") for name in ("alice", "bob", "carol")
+    )
+    db_session.add_all([alice, bob, carol])
+    db_session.flush()
+    post = Post(title="Bulk", url="https://example.com/bulk", user_id=alice.id)
+    db_session.add(post)
+    db_session.flush()
+    top = Comment(text="Top", user_id=bob.id, post_id=post.id)
+    db_session.add(top)
+    db_session.flush()
+    top.root_id = top.id
+    db_session.commit()
+
+    def add(request_id, **fields):
+        return {"type": "comment.add", "request_id": request_id, "user_id": str(carol.id), "post_id": str(post.id)} | fields
+
+    events = [add("c1", text="First"), add("c2", text="Reply", parent_id=str(top.id)), add("c3", text="Second")]
+
+    assert worker._process_events(events) is True
+
+    db_session.expire_all()
+    created = db_session.query(Comment).filter(Comment.user_id == carol.id).order_by(Comment.id).all()
+    assert [(c.text, c.parent_id) for c in created] == [("First", None), ("Reply", top.id), ("Second", None)]
+    assert [c.root_id for c in created] == [created[0].id, top.id, created[2].id]
+    assert all(c.points == 0 and c.is_deleted is False and c.created_at is not None for c in created)
+
+    notified = sorted(
+        (n.user_id, n.type.value, n.comment_id) for n in db_session.query(Notification).all()
+    )
+    assert notified == sorted([
+        (alice.id, "comment_on_post", created[0].id),
+        (alice.id, "comment_on_post", created[1].id),
+        (bob.id, "reply_to_comment", created[1].id),
+        (alice.id, "comment_on_post", created[2].id),
+    ])
+
+
+class _PendingStreams:
+    """Just enough of XREADGROUP/XACK/XPENDING/XADD for one consumer.
+
+    ">" delivers new entries and "0" re-reads the pending list; both count a delivery.
+    """
+
+    def __init__(self, entries: dict[str, list[tuple[str, dict]]]) -> None:
+        self.new = {stream: list(stream_entries) for stream, stream_entries in entries.items()}
+        self.pending: dict[str, list[tuple[str, dict]]] = {stream: [] for stream in entries}
+        self.deliveries: dict[str, int] = {}
+        self.added: dict[str, list[dict]] = {}
+
+    def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        response = []
+        for stream, position in streams.items():
+            if position == "0":
+                delivered = self.pending[stream][:count]
+            else:
+                delivered, self.new[stream] = self.new[stream][:count], self.new[stream][count:]
+                self.pending[stream].extend(delivered)
+            for message_id, _ in delivered:
+                self.deliveries[message_id] = self.deliveries.get(message_id, 0) + 1
+            if delivered or position == "0":
+                response.append((stream, delivered))
+        return response
+
+    def xack(self, stream, group, *message_ids):
+        self.pending[stream] = [entry for entry in self.pending[stream] if entry[0] not in message_ids]
+
+    def xpending_range(self, stream, group, min, max, count, consumername=None):
+        return [
+            {"message_id": message_id, "times_delivered": self.deliveries[message_id]}
+            for message_id, _ in self.pending[stream]
+            if min <= message_id <= max
+        ][:count]
+
+    def xadd(self, stream, fields, maxlen=None, approximate=True):
+        self.added.setdefault(stream, []).append(fields)
+
+
+@pytest.mark.unit
+def test_batch_failed_on_lock_timeout_is_replayed_before_new_events(db_session, worker_stats, monkeypatch):
+    from sqlalchemy.exc import OperationalError
+
+    user = User(username="retry", email="retry@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.flush()
+    post = Post(title="Retry", url="https://example.com/retry", user_id=user.id)
+    db_session.add(post)
+    db_session.commit()
+    post_id = post.id
+
+    stream = worker.write_stream_key(0)
+    vote = {"type": "post.vote.add", "request_id": "lock-1", "user_id": str(user.id), "post_id": str(post_id)}
+    streams = _PendingStreams({stream: [("1-0", vote)]})
+    monkeypatch.setattr(worker, "redis_client", streams)
+    monkeypatch.setattr(worker, "WRITE_WORKER_PARTITIONS", [0])
+    monkeypatch.setattr(worker, "_replay_streams", set())
+
+    def lock_timeout(db):
+        raise OperationalError("SET LOCAL lock_timeout", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(worker, "_set_lock_timeout", lock_timeout)
+    assert worker._consume_batch(count=10) == (["1-0"], False)
+    assert worker_stats.snapshot()["lock_errors"] == 1
+    assert [message_id for message_id, _ in streams.pending[stream]] == ["1-0"]
+
+    monkeypatch.setattr(worker, "_set_lock_timeout", lambda db: None)
+    streams.new[stream].append(("2-0", vote | {"request_id": "lock-2"}))
+    # The pending vote is read and applied again before the new entry is delivered.
+    assert worker._consume_batch(count=10) == (["1-0"], True)
+    assert streams.pending[stream] == []
+    assert worker_stats.snapshot()["replayed_events"] == 1
+    db_session.expire_all()
+    assert db_session.query(Vote).count() == 1
+    assert db_session.get(Post, post_id).points == 1
+
+    assert worker._consume_batch(count=10) == (["2-0"], True)
+
+
+@pytest.mark.unit
+def test_event_that_always_fails_is_dead_lettered_and_the_rest_commit(db_session, worker_stats, monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+
+    user = User(username="stuck", email="stuck@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.flush()
+    posts = [Post(title=f"Stuck {n}", url=None, user_id=user.id) for n in range(3)]
+    db_session.add_all(posts)
+    db_session.commit()
+    post_ids = [post.id for post in posts]
+
+    def vote(request_id, post_id):
+        return {"type": "post.vote.add", "request_id": request_id, "user_id": str(user.id), "post_id": str(post_id)}
+
+    broken = vote("bad", post_ids[0])
+    claim = worker._claim_request_ids
+
+    def claim_or_fail(db, events):
+        # Stands in for an event that can never apply, e.g. an FK violation.
+        if any(event["request_id"] == "bad" for event in events):
+            raise IntegrityError("INSERT INTO votes", {}, Exception("violates foreign key constraint"))
+        return claim(db, events)
+
+    monkeypatch.setattr(worker, "_claim_request_ids", claim_or_fail)
+    from services import queue_service
+
+    monkeypatch.setattr(queue_service, "WRITE_STREAM_PARTITIONS", 2)
+    stuck, healthy = worker.write_stream_key(0), worker.write_stream_key(1)
+    streams = _PendingStreams({
+        stuck: [("1-0", vote("v1", post_ids[0])), ("2-0", broken), ("3-0", vote("v2", post_ids[1]))],
+        healthy: [],
+    })
+    monkeypatch.setattr(worker, "redis_client", streams)
+    monkeypatch.setattr(worker, "WRITE_WORKER_PARTITIONS", [0, 1])
+    monkeypatch.setattr(worker, "_replay_streams", set())
+    monkeypatch.setattr(worker, "WRITE_MAX_DELIVERIES", 2)
+
+    assert worker._consume_batch(count=10) == (["1-0", "2-0", "3-0"], False)
+    # The stuck partition replays without holding back new entries on the other one.
+    streams.new[healthy].append(("4-0", vote("v3", post_ids[2])))
+    assert worker._consume_batch(count=10) == (["1-0", "2-0", "3-0", "4-0"], False)
+
+    assert {stream: pending for stream, pending in streams.pending.items() if pending} == {}
+    assert streams.added == {f"{stuck}:dead": [broken | {"source_id": "2-0"}]}
+    snapshot = worker_stats.snapshot()
+    assert snapshot["isolated_batches"] == 1
+    assert snapshot["dead_lettered_events"] == 1
+    db_session.expire_all()
+    assert [db_session.get(Post, post_id).points for post_id in post_ids] == [1, 1, 1]
+
+    # Once drained, both partitions read new entries again.
+    assert worker._consume_batch(count=10) == ([], True)
+    assert worker._replay_streams == set()
+
+
+@pytest.mark.unit
+def test_retry_delay_backs_off_exponentially_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(worker, "WRITE_RETRY_BACKOFF_MS", 100)
+    monkeypatch.setattr(worker, "WRITE_RETRY_MAX_MS", 1000)
+
+    assert [worker._retry_delay_seconds(failures) for failures in range(6)] == [0.0, 0.1, 0.2, 0.4, 0.8, 1.0]
@@ -0,0 +1,33 @@
+import os
+import sys
+import logging
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from database import SessionLocal
+from services.notification_service import NotificationService
+
+
+LOGGER = logging.getLogger("notification_retention")
+logging.basicConfig(level=logging.INFO)
+
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "30"))
+NOTIFICATION_PURGE_BATCH_SIZE = int(os.getenv("NOTIFICATION_PURGE_BATCH_SIZE", "5000"))
+
+
+def run_retention() -> int:
+    with SessionLocal() as db:
+        deleted = NotificationService.purge_read_notifications(
+            db,
+            older_than_days=NOTIFICATION_RETENTION_DAYS,
+            batch_size=NOTIFICATION_PURGE_BATCH_SIZE,
+        )
+    LOGGER.info("Purged %s read notifications older than %s days", deleted, NOTIFICATION_RETENTION_DAYS)
+    return deleted
+
+
+if __name__ == "__main__":
+    run_retention()
@@ -3,6 +3,7 @@ import socket
 import time
 import logging
 import sys
+from contextlib import contextmanager
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -10,13 +11,14 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 import redis
-from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy import delete, func, insert, select, text, tuple_, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import DBAPIError, IntegrityError
 
-from cache import REDIS_ENABLED, redis_client, redis_incr
+from cache import REDIS_ENABLED, REDIS_SOCKET_TIMEOUT_SECONDS, redis_client, redis_hset
 from database import SessionLocal
+from metrics import WRITE_WORKER_STATS_KEY_PREFIX
 from models import (
     Comment,
     CommentVote,
@@ -27,28 +29,286 @@ from models import (
     User,
     Vote,
 )
+from services.cache_warming_service import CacheWarmingService
 from services.comment_service import CommentService
-from services.queue_service import WRITE_STREAM_KEY, WriteEventType
+from services.event_service import EventService, LiveEventType
+from services.hydration_service import HydrationService
+from services.notification_service import NotificationService
+from services.vote_service import VoteService
+from services.queue_service import WRITE_STREAM_PARTITIONS, WriteEventType, write_stream_key
 
 
 LOGGER = logging.getLogger("write_queue_worker")
 logging.basicConfig(level=logging.INFO)
 
+
+def _owned_partitions(raw: str) -> list[int]:
+    if not raw.strip():
+        return list(range(WRITE_STREAM_PARTITIONS))
+    partitions = sorted({int(value) for value in raw.split(",") if value.strip()})
+    invalid = [p for p in partitions if not 0 <= p < WRITE_STREAM_PARTITIONS]
+    if invalid:
+        raise ValueError(f"WRITE_WORKER_PARTITIONS {invalid} outside 0..{WRITE_STREAM_PARTITIONS - 1}")
+    return partitions
+
+
+# Run one worker per partition set; the sets must not overlap, otherwise two
+# workers would apply events for the same posts concurrently.
+WRITE_WORKER_PARTITIONS = _owned_partitions(os.getenv("WRITE_WORKER_PARTITIONS", ""))
 WRITE_STREAM_GROUP = os.getenv("WRITE_STREAM_GROUP", "hn-write-workers")
-WRITE_STREAM_CONSUMER = os.getenv("WRITE_STREAM_CONSUMER", socket.gethostname())
+WRITE_STREAM_CONSUMER = os.getenv(
+    "WRITE_STREAM_CONSUMER",
+    socket.gethostname()
+    if len(WRITE_WORKER_PARTITIONS) == WRITE_STREAM_PARTITIONS
+    else f"{socket.gethostname()}:p{'-'.join(map(str, WRITE_WORKER_PARTITIONS))}",
+)
 WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "200"))
+WRITE_BATCH_MIN = int(os.getenv("WRITE_BATCH_MIN", "10"))
+WRITE_BATCH_MAX = int(os.getenv("WRITE_BATCH_MAX", "2000"))
+WRITE_TXN_TARGET_MS = float(os.getenv("WRITE_TXN_TARGET_MS", "100"))
+WRITE_LOCK_TIMEOUT_MS = int(os.getenv("WRITE_LOCK_TIMEOUT_MS", "1000"))
 WRITE_BLOCK_MS = int(os.getenv("WRITE_BLOCK_MS", "5000"))
+# After this many deliveries a failing batch is applied event by event and
+# the events that still fail go to ``<stream>:dead``.
+WRITE_MAX_DELIVERIES = int(os.getenv("WRITE_MAX_DELIVERIES", "5"))
+WRITE_DEAD_LETTER_SUFFIX = ":dead"
+WRITE_DEAD_LETTER_MAXLEN = int(os.getenv("WRITE_DEAD_LETTER_MAXLEN", "10000"))
+WRITE_RETRY_BACKOFF_MS = int(os.getenv("WRITE_RETRY_BACKOFF_MS", "100"))
+WRITE_RETRY_MAX_MS = int(os.getenv("WRITE_RETRY_MAX_MS", "5000"))
+# XREADGROUP must answer inside the client's socket timeout, so the block is
+# capped just below it; raise REDIS_SOCKET_TIMEOUT_SECONDS for longer blocks.
+if REDIS_SOCKET_TIMEOUT_SECONDS:
+    WRITE_BLOCK_MS = max(min(WRITE_BLOCK_MS, int(REDIS_SOCKET_TIMEOUT_SECONDS * 1000) - 100), 1)
 FEED_REFRESH_SECONDS = int(os.getenv("FEED_REFRESH_SECONDS", "60"))
+WARM_CHECK_SECONDS = float(os.getenv("WARM_CHECK_SECONDS", "1"))
+WORKER_STATS_INTERVAL_SECONDS = int(os.getenv("WORKER_STATS_INTERVAL_SECONDS", "60"))
+
+
+class WorkerStats:
+    """Cumulative counters and per-stage wall time for the write worker.
+
+    Counters and stage totals only grow, so they export directly as Prometheus
+    counters; the periodic log line reports the delta since the previous one.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.counters: dict[str, float] = {}
+        self.stage_seconds: dict[str, float] = {}
+        self.gauges: dict[str, float] = {}
+        self._reported: dict[str, float] = {}
+        self._reported_at = time.monotonic()
+
+    def incr(self, name: str, amount: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - started)
+
+    def snapshot(self) -> dict[str, float]:
+        snapshot = dict(self.counters)
+        snapshot.update({f"stage_seconds.{name}": round(value, 6) for name, value in self.stage_seconds.items()})
+        snapshot.update(self.gauges)
+        return snapshot
+
+    def report(self, force: bool = False) -> None:
+        """Log the interval delta and publish the cumulative snapshot for /metrics."""
+        now = time.monotonic()
+        elapsed = now - self._reported_at
+        if not force and elapsed < WORKER_STATS_INTERVAL_SECONDS:
+            return
+        snapshot = self.snapshot()
+        delta = {
+            name: value - self._reported.get(name, 0)
+            for name, value in snapshot.items()
+            if name not in self.gauges
+        }
+        batches = delta.get("batches", 0)
+        events = delta.get("events", 0)
+        stage_ms = {
+            name.removeprefix("stage_seconds."): round(value * 1000 / batches, 2)
+            for name, value in sorted(delta.items())
+            if name.startswith("stage_seconds.") and batches
+        }
+        LOGGER.info(
+            "Write worker: %.1f events/s, %d batches (avg %.1f events, target %d), %d failed, lag %.0fms, "
+            "ms/batch %s",
+            events / elapsed if elapsed > 0 else 0.0,
+            batches,
+            events / batches if batches else 0.0,
+            self.gauges.get("batch_size_target", WRITE_BATCH_SIZE),
+            delta.get("failed_batches", 0),
+            self.gauges.get("lag_ms", 0.0),
+            stage_ms,
+        )
+        redis_hset(
+            f"{WRITE_WORKER_STATS_KEY_PREFIX}{WRITE_STREAM_CONSUMER}",
+            snapshot,
+            ttl_seconds=WORKER_STATS_INTERVAL_SECONDS * 5,
+        )
+        self._reported = snapshot
+        self._reported_at = now
+
+
+stats = WorkerStats()
+
+
+class BatchController:
+    """Pick the XREADGROUP count for the next batch from how the last one went.
+
+    Additive increase while batches come back full and the transaction stays
+    under ``target_ms``; multiplicative decrease on failures, lock timeouts or
+    slow transactions, so a burst never holds hot post rows for long. Reads
+    never wait for a batch to fill, so a lone event is applied as soon as it
+    arrives whatever the current size.
+    """
+
+    def __init__(
+        self,
+        initial: int = WRITE_BATCH_SIZE,
+        minimum: int = WRITE_BATCH_MIN,
+        maximum: int = WRITE_BATCH_MAX,
+        target_ms: float = WRITE_TXN_TARGET_MS,
+    ) -> None:
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.target_ms = target_ms
+        self.size = min(max(initial, self.minimum), self.maximum)
+
+    def observe(self, read: int, txn_ms: float, failed: bool, lock_error: bool) -> int:
+        previous = self.size
+        if failed or lock_error:
+            self.size = max(self.minimum, self.size // 2)
+        elif txn_ms > self.target_ms:
+            proportional = int(self.size * self.target_ms / txn_ms)
+            self.size = max(self.minimum, self.size // 2, proportional)
+        elif read >= self.size:
+            # Only a full batch says the backlog could use a bigger one.
+            self.size = min(self.maximum, self.size + max(self.size // 4, 1))
+
+        if self.size > previous:
+            stats.incr("batch_size_increases")
+        elif self.size < previous:
+            stats.incr("batch_size_decreases")
+        stats.set_gauge("batch_size_target", self.size)
+        return self.size
+
+
+batching = BatchController()
+
+
+class CacheWarmer:
+    """Tracks which feed version and hot threads this worker has warmed.
+
+    ``refresh`` runs at startup and every ``FEED_REFRESH_SECONDS`` and flips
+    the feed and hot-thread versions onto freshly warmed entries; with several
+    workers, only the one that claims the interval does it. ``check`` runs
+    between batches and warms versions the API bumped since, adopting a peer's
+    refresh instead of warming it again.
+    Warming is best effort: failures are logged and retried on the next tick.
+    """
+
+    def __init__(self) -> None:
+        self.feed_version: int | None = None
+        self.threads: dict[int, int] = {}
+        self._checked_at = 0.0
+
+    def refresh(self) -> None:
+        try:
+            if not CacheWarmingService.claim_refresh(WRITE_STREAM_CONSUMER, FEED_REFRESH_SECONDS):
+                stats.incr("warm.refreshes_skipped")
+                return
+            with SessionLocal() as db:
+                self.feed_version, hot_post_ids = CacheWarmingService.refresh_feeds(db)
+                self.threads = CacheWarmingService.refresh_threads(db, hot_post_ids)
+            CacheWarmingService.record_refresh(self.feed_version, self.threads)
+            stats.incr("warm.refreshes")
+        except Exception:
+            LOGGER.warning("Cache refresh failed", exc_info=True)
+
+    def check(self) -> None:
+        if time.monotonic() - self._checked_at < WARM_CHECK_SECONDS:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            with SessionLocal() as db:
+                version = CacheWarmingService.current_feed_version()
+                last = CacheWarmingService.last_refresh() if version != self.feed_version else None
+                if last is not None and last["version"] == version:
+                    # A peer's refresh flipped to this version; its threads follow once warmed.
+                    if last["threads"] is not None:
+                        self.feed_version = version
+                        self.threads = last["threads"]
+                elif version is not None and version != self.feed_version:
+                    hot_post_ids = CacheWarmingService.warm_feeds(db, version)
+                    self.feed_version = version
+                    stats.incr("warm.feeds")
+                    cold = [post_id for post_id in hot_post_ids if post_id not in self.threads]
+                    self.threads = {post_id: self.threads[post_id] for post_id in hot_post_ids if post_id in self.threads}
+                    self.threads.update(CacheWarmingService.refresh_threads(db, cold))
+                stale = CacheWarmingService.warm_stale_threads(db, self.threads)
+                self.threads.update(stale)
+                stats.incr("warm.threads", len(stale))
+        except Exception:
+            LOGGER.warning("Cache warm check failed", exc_info=True)
+
+    def refresh_threads(self, post_ids: set[int]) -> None:
+        """Warm-then-flip the hot threads among ``post_ids``; the caller bumps the rest."""
+        if not post_ids:
+            return
+        try:
+            with SessionLocal() as db:
+                self.threads.update(CacheWarmingService.refresh_threads(db, sorted(post_ids)))
+            stats.incr("warm.threads", len(post_ids))
+        except Exception:
+            # Fall back to a plain bump so readers never see the old thread.
+            CommentService.bump_comments_cache_versions(sorted(post_ids))
+            LOGGER.warning("Hot thread refresh failed", exc_info=True)
+
+
+warmer = CacheWarmer()
 
 
 def _ensure_consumer_group() -> None:
     if not REDIS_ENABLED or redis_client is None:
         raise RuntimeError("Redis is not available")
-    try:
-        redis_client.xgroup_create(WRITE_STREAM_KEY, WRITE_STREAM_GROUP, id="0", mkstream=True)
-    except redis.ResponseError as exc:
-        if "BUSYGROUP" not in str(exc):
-            raise
+    for partition in WRITE_WORKER_PARTITIONS:
+        try:
+            redis_client.xgroup_create(write_stream_key(partition), WRITE_STREAM_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+
+# lock_not_available (lock_timeout expired) and deadlock_detected.
+LOCK_ERROR_CODES = {"55P03", "40P01"}
+
+
+def _set_lock_timeout(db) -> None:
+    # Fail fast instead of queueing behind a hot row so the controller can back off.
+    if WRITE_LOCK_TIMEOUT_MS > 0 and db.bind.dialect.name == "postgresql":
+        db.execute(text(f"SET LOCAL lock_timeout = {WRITE_LOCK_TIMEOUT_MS}"))
+
+
+def _is_lock_error(exc: Exception) -> bool:
+    if not isinstance(exc, DBAPIError):
+        return False
+    if getattr(exc.orig, "pgcode", None) in LOCK_ERROR_CODES:
+        return True
+    return "database is locked" in str(exc.orig)
 
 
 def _claim_request_ids(db, events: list[dict]) -> set[str]:
@@ -85,35 +345,57 @@ def _claim_request_ids(db, events: list[dict]) -> set[str]:
     return accepted
 
 
-def _create_notifications(db, comment: Comment) -> None:
-    post = db.query(Post).filter(Post.id == comment.post_id).first()
-    actor = db.query(User).filter(User.id == comment.user_id).first()
-    if not post or not actor:
-        return
-
-    if comment.user_id != post.user_id:
-        db.add(Notification(
-            user_id=post.user_id,
-            actor_id=comment.user_id,
-            type=NotificationType.COMMENT_ON_POST,
-            post_id=post.id,
-            comment_id=comment.id,
-            message=f"{actor.username} commented on your post '{post.title}'",
-        ))
-
-    if comment.parent_id:
-        parent_comment = db.query(Comment).filter(Comment.id == comment.parent_id).first()
-        if not parent_comment:
-            return
-        if comment.user_id != parent_comment.user_id:
-            db.add(Notification(
-                user_id=parent_comment.user_id,
-                actor_id=comment.user_id,
-                type=NotificationType.REPLY_TO_COMMENT,
-                post_id=post.id,
-                comment_id=comment.id,
-                message=f"{actor.username} replied to your comment",
-            ))
+def _create_notifications(db, comments: list[dict], parent_map: dict[int, dict]) -> list[dict]:
+    """Insert the post-author and parent-author notifications for a batch of new comments."""
+    if not comments:
+        return []
+    post_rows = db.execute(
+        select(Post.id, Post.user_id, Post.title).where(Post.id.in_({c["post_id"] for c in comments}))
+    ).all()
+    posts = {row[0]: {"user_id": row[1], "title": row[2]} for row in post_rows}
+    actor_rows = db.execute(
+        select(User.id, User.username).where(User.id.in_({c["user_id"] for c in comments}))
+    ).all()
+    actors = {row[0]: row[1] for row in actor_rows}
+
+    rows: list[dict] = []
+    created: list[dict] = []
+
+    def notify(recipient_id: int, notification_type: NotificationType, comment: dict, message: str) -> None:
+        rows.append({
+            "user_id": recipient_id,
+            "actor_id": comment["user_id"],
+            "type": notification_type,
+            "post_id": comment["post_id"],
+            "comment_id": comment["id"],
+            "message": message,
+        })
+        created.append({
+            "user_id": recipient_id,
+            "type": notification_type.value,
+            "post_id": comment["post_id"],
+            "comment_id": comment["id"],
+        })
+
+    for comment in comments:
+        post = posts.get(comment["post_id"])
+        actor = actors.get(comment["user_id"])
+        if not post or not actor:
+            continue
+        if comment["user_id"] != post["user_id"]:
+            notify(
+                post["user_id"],
+                NotificationType.COMMENT_ON_POST,
+                comment,
+                f"{actor} commented on your post '{post['title']}'",
+            )
+        parent = parent_map.get(comment["parent_id"]) if comment["parent_id"] else None
+        if parent and comment["user_id"] != parent["user_id"]:
+            notify(parent["user_id"], NotificationType.REPLY_TO_COMMENT, comment, f"{actor} replied to your comment")
+
+    if rows:
+        db.execute(insert(Notification), rows)
+    return created
 
 
 def _refresh_post_points(db, post_ids: set[int]) -> None:
@@ -152,6 +434,22 @@ def _refresh_comment_points(db, comment_ids: set[int]) -> None:
     )
 
 
+def _load_post_points(db, post_ids: set[int]) -> dict[int, int]:
+    if not post_ids:
+        return {}
+    rows = db.execute(select(Post.id, Post.points).where(Post.id.in_(post_ids))).all()
+    return {row[0]: row[1] for row in rows}
+
+
+def _load_comment_points(db, comment_ids: set[int]) -> list[dict]:
+    if not comment_ids:
+        return []
+    rows = db.execute(
+        select(Comment.id, Comment.post_id, Comment.points).where(Comment.id.in_(comment_ids))
+    ).all()
+    return [{"id": row[0], "post_id": row[1], "points": row[2]} for row in rows]
+
+
 def _split_events(events: list[dict]) -> dict[str, list[dict]]:
     return {
         WriteEventType.COMMENT_ADD: [e for e in events if e["type"] == WriteEventType.COMMENT_ADD],
@@ -163,6 +461,34 @@ def _split_events(events: list[dict]) -> dict[str, list[dict]]:
     }
 
 
+VOTE_EVENT_TARGETS = {
+    WriteEventType.POST_VOTE_ADD: "post_id",
+    WriteEventType.POST_VOTE_REMOVE: "post_id",
+    WriteEventType.COMMENT_VOTE_ADD: "comment_id",
+    WriteEventType.COMMENT_VOTE_REMOVE: "comment_id",
+}
+
+
+def _fold_vote_events(events: list[dict]) -> list[dict]:
+    """Keep only the last vote event per (user, target) in stream order.
+
+    Adds and removes are applied as separate set operations, so a toggle
+    inside one batch must collapse to its final state before the split.
+    Non-vote events pass through unchanged.
+    """
+    latest: dict[tuple[str, int, int], dict] = {}
+    folded: list[dict] = []
+    for event in events:
+        target = VOTE_EVENT_TARGETS.get(event["type"])
+        if target is None:
+            folded.append(event)
+            continue
+        key = (target, int(event.get("user_id") or 0), int(event.get(target) or 0))
+        latest.pop(key, None)
+        latest[key] = event
+    return folded + list(latest.values())
+
+
 def _fetch_valid_post_ids(db, post_ids: set[int]) -> set[int]:
     if not post_ids:
         return set()
@@ -181,9 +507,25 @@ def _load_parent_map(db, parent_ids: set[int]) -> dict[int, dict]:
     if not parent_ids:
         return {}
     rows = db.execute(
-        select(Comment.id, Comment.post_id, Comment.root_id).where(Comment.id.in_(parent_ids))
+        select(Comment.id, Comment.post_id, Comment.root_id, Comment.user_id).where(Comment.id.in_(parent_ids))
     ).all()
-    return {row[0]: {"post_id": row[1], "root_id": row[2]} for row in rows}
+    return {row[0]: {"post_id": row[1], "root_id": row[2], "user_id": row[3]} for row in rows}
+
+
+def _allocate_comment_ids(db, count: int) -> list[int] | None:
+    """Reserve ids for a bulk insert so top-level rows can set root_id = id in the same INSERT."""
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        return list(db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('comments', 'id')) FROM generate_series(1, :count)"),
+            {"count": count},
+        ).scalars())
+    if dialect == "sqlite":
+        # The claim insert already holds SQLite's write lock, so no other
+        # writer can take these rowids before the insert below.
+        start = db.execute(select(func.coalesce(func.max(Comment.id), 0))).scalar_one() + 1
+        return list(range(start, start + count))
+    return None
 
 
 def _apply_comment_adds(
@@ -191,8 +533,9 @@ def _apply_comment_adds(
     events: list[dict],
     valid_posts: set[int],
     parent_map: dict[int, dict],
-) -> set[int]:
-    created_comments: list[Comment] = []
+    notifications: list[dict],
+) -> list[dict]:
+    rows: list[dict] = []
     for event in events:
         post_id = int(event.get("post_id") or 0)
         if post_id not in valid_posts:
@@ -204,35 +547,44 @@ def _apply_comment_adds(
             if not parent or parent["post_id"] != post_id:
                 continue
             root_id = parent["root_id"] or parent_id
-
-        new_comment = Comment(
-            text=event.get("text") or "",
-            user_id=int(event.get("user_id") or 0),
-            post_id=post_id,
-            parent_id=parent_id,
-            root_id=root_id,
-        )
-        db.add(new_comment)
-        created_comments.append(new_comment)
-
-    comment_cache_bumps: set[int] = set()
-    if created_comments:
-        db.flush()
-        for comment in created_comments:
-            if comment.parent_id is None:
-                comment.root_id = comment.id
-            _create_notifications(db, comment)
-            comment_cache_bumps.add(comment.post_id)
-    return comment_cache_bumps
-
-
-def _apply_comment_deletes(db, events: list[dict]) -> set[int]:
+        rows.append({
+            "text": event.get("text") or "",
+            "user_id": int(event.get("user_id") or 0),
+            "post_id": post_id,
+            "parent_id": parent_id,
+            "root_id": root_id,
+        })
+    if not rows:
+        return []
+
+    ids = _allocate_comment_ids(db, len(rows))
+    if ids is not None:
+        for row, comment_id in zip(rows, ids):
+            row["id"] = comment_id
+            if row["root_id"] is None:
+                row["root_id"] = comment_id
+        db.execute(insert(Comment), rows)
+    else:
+        ids = db.execute(
+            insert(Comment).returning(Comment.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        for row, comment_id in zip(rows, ids):
+            row["id"] = comment_id
+        top_level = [row["id"] for row in rows if row["root_id"] is None]
+        if top_level:
+            db.execute(update(Comment).where(Comment.id.in_(top_level)).values(root_id=Comment.id))
+
+    notifications.extend(_create_notifications(db, rows, parent_map))
+    return [{"id": row["id"], "post_id": row["post_id"], "parent_id": row["parent_id"]} for row in rows]
+
+
+def _apply_comment_deletes(db, events: list[dict]) -> list[dict]:
     comment_ids = {int(e["comment_id"]) for e in events if e.get("comment_id")}
     if not comment_ids:
-        return set()
+        return []
     rows = db.execute(select(Comment).where(Comment.id.in_(comment_ids))).scalars().all()
     comment_map = {comment.id: comment for comment in rows}
-    comment_cache_bumps: set[int] = set()
+    deleted: list[dict] = []
     for event in events:
         comment_id = int(event.get("comment_id") or 0)
         comment = comment_map.get(comment_id)
@@ -244,11 +596,11 @@ def _apply_comment_deletes(db, events: list[dict]) -> set[int]:
             continue
         comment.is_deleted = True
         comment.text = "[deleted]"
-        comment_cache_bumps.add(comment.post_id)
-    return comment_cache_bumps
+        deleted.append({"id": comment.id, "post_id": comment.post_id})
+    return deleted
 
 
-def _apply_post_vote_adds(db, events: list[dict], valid_posts: set[int]) -> set[int]:
+def _apply_post_vote_adds(db, events: list[dict], valid_posts: set[int]) -> set[tuple[int, int]]:
     pairs = {
         (int(e.get("user_id") or 0), int(e.get("post_id") or 0))
         for e in events
@@ -264,10 +616,10 @@ def _apply_post_vote_adds(db, events: list[dict], valid_posts: set[int]) -> set[
         else sqlite_insert(Vote).values([{"user_id": u, "post_id": p} for u, p in pairs]).prefix_with("OR IGNORE")
     )
     db.execute(stmt)
-    return {p for _, p in pairs}
+    return pairs
 
 
-def _apply_post_vote_removes(db, events: list[dict], valid_posts: set[int]) -> set[int]:
+def _apply_post_vote_removes(db, events: list[dict], valid_posts: set[int]) -> set[tuple[int, int]]:
     pairs = {
         (int(e.get("user_id") or 0), int(e.get("post_id") or 0))
         for e in events
@@ -276,7 +628,7 @@ def _apply_post_vote_removes(db, events: list[dict], valid_posts: set[int]) -> s
     if not pairs:
         return set()
     db.execute(delete(Vote).where(tuple_(Vote.user_id, Vote.post_id).in_(pairs)))
-    return {p for _, p in pairs}
+    return pairs
 
 
 def _apply_comment_vote_adds(db, events: list[dict], valid_comments: set[int]) -> set[int]:
@@ -317,97 +669,343 @@ def _process_events(events: list[dict]) -> bool:
     comment_cache_bumps: set[int] = set()
     post_point_ids: set[int] = set()
     comment_point_ids: set[int] = set()
+    created_comments: list[dict] = []
+    deleted_comments: list[dict] = []
+    notifications: list[dict] = []
+    post_points: dict[int, int] = {}
+    comment_points: list[dict] = []
+    post_votes_added: set[tuple[int, int]] = set()
+    post_votes_removed: set[tuple[int, int]] = set()
+
+    stats.incr("batches")
+    stats.incr("events", len(events))
+    stats.set_gauge("last_batch_size", len(events))
 
     with SessionLocal() as db:
+        txn_started = time.perf_counter()
         try:
             with db.begin():
-                accepted = _claim_request_ids(db, events)
+                _set_lock_timeout(db)
+                with stats.stage("claim"):
+                    accepted = _claim_request_ids(db, events)
                 actionable = [event for event in events if event.get("request_id") in accepted]
+                stats.incr("duplicate_events", len(events) - len(actionable))
                 if not actionable:
                     return True
 
-                buckets = _split_events(actionable)
+                folded = _fold_vote_events(actionable)
+                stats.incr("folded_vote_events", len(actionable) - len(folded))
+                buckets = _split_events(folded)
+                for event_type, bucket in buckets.items():
+                    if bucket:
+                        stats.incr(f"events.{event_type}", len(bucket))
 
                 if buckets[WriteEventType.COMMENT_ADD]:
-                    post_ids = {int(e["post_id"]) for e in buckets[WriteEventType.COMMENT_ADD] if e.get("post_id")}
-                    parent_ids = {int(e["parent_id"]) for e in buckets[WriteEventType.COMMENT_ADD] if e.get("parent_id")}
-                    valid_posts = _fetch_valid_post_ids(db, post_ids)
-                    parent_map = _load_parent_map(db, parent_ids)
-                    comment_cache_bumps.update(
-                        _apply_comment_adds(db, buckets[WriteEventType.COMMENT_ADD], valid_posts, parent_map)
-                    )
+                    with stats.stage(f"apply.{WriteEventType.COMMENT_ADD}"):
+                        post_ids = {int(e["post_id"]) for e in buckets[WriteEventType.COMMENT_ADD] if e.get("post_id")}
+                        parent_ids = {int(e["parent_id"]) for e in buckets[WriteEventType.COMMENT_ADD] if e.get("parent_id")}
+                        valid_posts = _fetch_valid_post_ids(db, post_ids)
+                        parent_map = _load_parent_map(db, parent_ids)
+                        created_comments = _apply_comment_adds(
+                            db,
+                            buckets[WriteEventType.COMMENT_ADD],
+                            valid_posts,
+                            parent_map,
+                            notifications,
+                        )
 
                 if buckets[WriteEventType.COMMENT_DELETE]:
-                    comment_cache_bumps.update(_apply_comment_deletes(db, buckets[WriteEventType.COMMENT_DELETE]))
+                    with stats.stage(f"apply.{WriteEventType.COMMENT_DELETE}"):
+                        deleted_comments = _apply_comment_deletes(db, buckets[WriteEventType.COMMENT_DELETE])
 
                 if buckets[WriteEventType.POST_VOTE_ADD]:
-                    post_ids = {int(e.get("post_id") or 0) for e in buckets[WriteEventType.POST_VOTE_ADD]}
-                    valid_posts = _fetch_valid_post_ids(db, post_ids)
-                    post_point_ids.update(
-                        _apply_post_vote_adds(db, buckets[WriteEventType.POST_VOTE_ADD], valid_posts)
-                    )
+                    with stats.stage(f"apply.{WriteEventType.POST_VOTE_ADD}"):
+                        post_ids = {int(e.get("post_id") or 0) for e in buckets[WriteEventType.POST_VOTE_ADD]}
+                        valid_posts = _fetch_valid_post_ids(db, post_ids)
+                        post_votes_added = _apply_post_vote_adds(db, buckets[WriteEventType.POST_VOTE_ADD], valid_posts)
+                        post_point_ids.update(p for _, p in post_votes_added)
 
                 if buckets[WriteEventType.POST_VOTE_REMOVE]:
-                    post_ids = {int(e.get("post_id") or 0) for e in buckets[WriteEventType.POST_VOTE_REMOVE]}
-                    valid_posts = _fetch_valid_post_ids(db, post_ids)
-                    post_point_ids.update(
-                        _apply_post_vote_removes(db, buckets[WriteEventType.POST_VOTE_REMOVE], valid_posts)
-                    )
+                    with stats.stage(f"apply.{WriteEventType.POST_VOTE_REMOVE}"):
+                        post_ids = {int(e.get("post_id") or 0) for e in buckets[WriteEventType.POST_VOTE_REMOVE]}
+                        valid_posts = _fetch_valid_post_ids(db, post_ids)
+                        post_votes_removed = _apply_post_vote_removes(
+                            db, buckets[WriteEventType.POST_VOTE_REMOVE], valid_posts
+                        )
+                        post_point_ids.update(p for _, p in post_votes_removed)
 
                 if buckets[WriteEventType.COMMENT_VOTE_ADD]:
-                    comment_ids = {int(e.get("comment_id") or 0) for e in buckets[WriteEventType.COMMENT_VOTE_ADD]}
-                    valid_comments = _fetch_valid_comment_ids(db, comment_ids)
-                    comment_point_ids.update(
-                        _apply_comment_vote_adds(db, buckets[WriteEventType.COMMENT_VOTE_ADD], valid_comments)
-                    )
+                    with stats.stage(f"apply.{WriteEventType.COMMENT_VOTE_ADD}"):
+                        comment_ids = {int(e.get("comment_id") or 0) for e in buckets[WriteEventType.COMMENT_VOTE_ADD]}
+                        valid_comments = _fetch_valid_comment_ids(db, comment_ids)
+                        comment_point_ids.update(
+                            _apply_comment_vote_adds(db, buckets[WriteEventType.COMMENT_VOTE_ADD], valid_comments)
+                        )
 
                 if buckets[WriteEventType.COMMENT_VOTE_REMOVE]:
-                    comment_ids = {int(e.get("comment_id") or 0) for e in buckets[WriteEventType.COMMENT_VOTE_REMOVE]}
-                    valid_comments = _fetch_valid_comment_ids(db, comment_ids)
-                    comment_point_ids.update(
-                        _apply_comment_vote_removes(db, buckets[WriteEventType.COMMENT_VOTE_REMOVE], valid_comments)
-                    )
-
-                _refresh_post_points(db, post_point_ids)
-                _refresh_comment_points(db, comment_point_ids)
-        except Exception:
+                    with stats.stage(f"apply.{WriteEventType.COMMENT_VOTE_REMOVE}"):
+                        comment_ids = {int(e.get("comment_id") or 0) for e in buckets[WriteEventType.COMMENT_VOTE_REMOVE]}
+                        valid_comments = _fetch_valid_comment_ids(db, comment_ids)
+                        comment_point_ids.update(
+                            _apply_comment_vote_removes(db, buckets[WriteEventType.COMMENT_VOTE_REMOVE], valid_comments)
+                        )
+
+                with stats.stage("points"):
+                    _refresh_post_points(db, post_point_ids)
+                    _refresh_comment_points(db, comment_point_ids)
+                    post_points = _load_post_points(db, post_point_ids)
+                    comment_points = _load_comment_points(db, comment_point_ids)
+                commit_started = time.perf_counter()
+            stats.add_stage("commit", time.perf_counter() - commit_started)
+        except Exception as exc:
+            stats.incr("failed_batches")
+            if _is_lock_error(exc):
+                stats.incr("lock_errors")
             LOGGER.exception("Failed processing write events batch")
             return False
+        finally:
+            stats.set_gauge("txn_ms", round((time.perf_counter() - txn_started) * 1000, 2))
+
+    with stats.stage("cache_bump"):
+        comment_cache_bumps.update(c["post_id"] for c in created_comments)
+        comment_cache_bumps.update(c["post_id"] for c in deleted_comments)
+        hot_thread_bumps = comment_cache_bumps & warmer.threads.keys()
+        CommentService.bump_comments_cache_versions(sorted(comment_cache_bumps - hot_thread_bumps))
+        unread_bumps: dict[int, int] = {}
+        for notification in notifications:
+            unread_bumps[notification["user_id"]] = unread_bumps.get(notification["user_id"], 0) + 1
+        NotificationService.bump_unread_counts(unread_bumps)
+        _record_post_votes(post_votes_added, post_votes_removed)
+        HydrationService.bump_post_versions(sorted(comment_cache_bumps | post_point_ids))
+        CommentService.record_recent_comments(sorted(c["id"] for c in created_comments))
+        HydrationService.invalidate_comments(sorted({c["id"] for c in deleted_comments} | comment_point_ids))
+
+    with stats.stage("warm"):
+        warmer.refresh_threads(hot_thread_bumps)
+
+    with stats.stage("publish"):
+        _publish_live_events(created_comments, deleted_comments, notifications, post_points, comment_points)
+    return True
 
-    for post_id in comment_cache_bumps:
-        CommentService.bump_comments_cache_version(post_id)
 
-    return True
+def _record_post_votes(added: set[tuple[int, int]], removed: set[tuple[int, int]]) -> None:
+    by_user: dict[int, tuple[list[int], list[int]]] = {}
+    for user_id, post_id in added:
+        by_user.setdefault(user_id, ([], []))[0].append(post_id)
+    for user_id, post_id in removed:
+        by_user.setdefault(user_id, ([], []))[1].append(post_id)
+    VoteService.record_post_votes_many(by_user)
+
+
+def _publish_live_events(
+    created_comments: list[dict],
+    deleted_comments: list[dict],
+    notifications: list[dict],
+    post_points: dict[int, int],
+    comment_points: list[dict],
+) -> None:
+    for comment in created_comments:
+        EventService.publish_thread_event(
+            comment["post_id"],
+            LiveEventType.COMMENT_CREATED,
+            {"comment_id": comment["id"], "parent_id": comment["parent_id"]},
+        )
+    for comment in deleted_comments:
+        EventService.publish_thread_event(
+            comment["post_id"],
+            LiveEventType.COMMENT_DELETED,
+            {"comment_id": comment["id"]},
+        )
+    for post_id, points in post_points.items():
+        EventService.publish_thread_event(post_id, LiveEventType.POST_POINTS, {"points": points})
+    for comment in comment_points:
+        EventService.publish_thread_event(
+            comment["post_id"],
+            LiveEventType.COMMENT_POINTS,
+            {"comment_id": comment["id"], "points": comment["points"]},
+        )
+    for notification in notifications:
+        EventService.publish_notification(
+            notification["user_id"],
+            {key: value for key, value in notification.items() if key != "user_id"},
+        )
+
+
+def _stream_lag_ms(message_id: str) -> float:
+    # Stream ids start with the enqueue time in milliseconds.
+    return max(time.time() * 1000 - int(message_id.split("-", 1)[0]), 0.0)
+
+
+# Streams whose pending list may hold entries for this consumer: a failed
+# batch stays unacked there, and at startup it holds whatever a crashed or
+# restarted worker left behind. Each is re-read from "0" (smaller, once
+# ``batching`` backs off) until it comes back empty, while the other owned
+# partitions keep reading new entries.
+_replay_streams = {write_stream_key(partition) for partition in WRITE_WORKER_PARTITIONS}
+
+
+def _read_batch(count: int, block_ms: int) -> tuple[list, set[str]]:
+    """XREADGROUP pending entries on partitions that have some, new ones on the rest.
+
+    Returns the response and the streams whose entries were replayed. Reads
+    only block when no partition is replaying.
+    """
+    streams = {
+        stream: "0" if stream in _replay_streams else ">"
+        for stream in map(write_stream_key, WRITE_WORKER_PARTITIONS)
+    }
+    replaying = {stream for stream, position in streams.items() if position == "0"}
+    response = redis_client.xreadgroup(
+        WRITE_STREAM_GROUP,
+        WRITE_STREAM_CONSUMER,
+        streams,
+        count=count,
+        block=None if replaying else block_ms,
+    )
+    replayed = {stream for stream, messages in response or [] if messages and stream in replaying}
+    _replay_streams.difference_update(replaying - replayed)
+    if replaying and not any(messages for _, messages in response or []):
+        # Every pending list came back empty; read (and block for) new entries instead.
+        return _read_batch(count, block_ms)
+    return response, replayed
+
+
+def _dead_letter_key(stream: str) -> str:
+    return f"{stream}{WRITE_DEAD_LETTER_SUFFIX}"
+
+
+def _times_delivered(acks: dict[str, list[str]]) -> int:
+    """The most times any of these pending entries has been delivered, from XPENDING."""
+    delivered = 0
+    for stream, stream_ids in acks.items():
+        ordered = sorted(stream_ids, key=lambda message_id: tuple(map(int, message_id.split("-", 1))))
+        for entry in redis_client.xpending_range(
+            stream,
+            WRITE_STREAM_GROUP,
+            min=ordered[0],
+            max=ordered[-1],
+            count=len(ordered),
+            consumername=WRITE_STREAM_CONSUMER,
+        ):
+            delivered = max(delivered, int(entry["times_delivered"]))
+    return delivered
+
+
+def _apply_one_at_a_time(entries: list[tuple[str, str, dict]]) -> None:
+    """Apply a batch that keeps failing event by event, dead-lettering the ones that fail.
+
+    A lock timeout says nothing about the event itself, so it stays pending
+    together with everything after it on its partition, keeping per-post order.
+    """
+    blocked: set[str] = set()
+    for stream, message_id, event in entries:
+        if stream in blocked:
+            continue
+        lock_errors = stats.counters.get("lock_errors", 0)
+        if _process_events([event]):
+            redis_client.xack(stream, WRITE_STREAM_GROUP, message_id)
+            continue
+        if stats.counters.get("lock_errors", 0) > lock_errors:
+            blocked.add(stream)
+            continue
+        redis_client.xadd(
+            _dead_letter_key(stream),
+            {key: value for key, value in event.items() if key != "id"} | {"source_id": message_id},
+            maxlen=WRITE_DEAD_LETTER_MAXLEN,
+            approximate=True,
+        )
+        redis_client.xack(stream, WRITE_STREAM_GROUP, message_id)
+        stats.incr("dead_lettered_events")
+        LOGGER.error("Moved write event %s from %s to %s", message_id, stream, _dead_letter_key(stream))
+
+
+def _consume_batch(count: int | None = None, block_ms: int = WRITE_BLOCK_MS) -> tuple[list[str], bool]:
+    """Read, apply and ack one batch; returns the message ids read and whether it applied.
+
+    Without ``count`` the batch size comes from ``batching`` and the outcome is
+    fed back to it. ``count`` applies per owned partition; a post only ever
+    maps to one partition, so stream order is kept for every post. A batch
+    that fails is read again from its partitions' pending lists on the next
+    calls; ``_claim_request_ids`` makes applying it twice safe. Once an entry
+    has been delivered ``WRITE_MAX_DELIVERIES`` times, the failing batch is
+    applied one event at a time and the events that still fail are moved to
+    the partition's dead-letter stream.
+    """
+    adaptive = count is None
+    if adaptive:
+        count = batching.size
+    response, replayed = _read_batch(count, block_ms)
+    if not response:
+        return [], True
+
+    message_ids = []
+    acks: dict[str, list[str]] = {}
+    entries: list[tuple[str, str, dict]] = []
+    for stream, messages in response:
+        for message_id, fields in messages:
+            acks.setdefault(stream, []).append(message_id)
+            if fields is None:
+                # Trimmed from the stream while pending; nothing is left to apply.
+                continue
+            message_ids.append(message_id)
+            entries.append((stream, message_id, fields | {"id": message_id}))
+    if not message_ids:
+        for stream, stream_ids in acks.items():
+            redis_client.xack(stream, WRITE_STREAM_GROUP, *stream_ids)
+        return [], True
+    if replayed:
+        stats.incr("replayed_events", sum(1 for stream, _, _ in entries if stream in replayed))
+
+    oldest = min(message_ids, key=lambda message_id: int(message_id.split("-", 1)[0]))
+    stats.set_gauge("lag_ms", round(_stream_lag_ms(oldest), 1))
+    lock_errors = stats.counters.get("lock_errors", 0)
+    started = time.perf_counter()
+    applied = _process_events([event for _, _, event in entries])
+    if applied:
+        for stream, stream_ids in acks.items():
+            redis_client.xack(stream, WRITE_STREAM_GROUP, *stream_ids)
+    else:
+        _replay_streams.update(acks)
+        if _times_delivered(acks) >= WRITE_MAX_DELIVERIES:
+            stats.incr("isolated_batches")
+            _apply_one_at_a_time(entries)
+    stats.add_stage("batch", time.perf_counter() - started)
+    if adaptive:
+        batching.observe(
+            len(message_ids),
+            stats.gauges.get("txn_ms", 0.0),
+            failed=not applied,
+            lock_error=stats.counters.get("lock_errors", 0) > lock_errors,
+        )
+    return message_ids, applied
+
+
+def _retry_delay_seconds(failures: int) -> float:
+    """Exponential backoff after consecutive failed batches, capped at ``WRITE_RETRY_MAX_MS``."""
+    if failures <= 0:
+        return 0.0
+    return min(WRITE_RETRY_BACKOFF_MS * 2 ** (failures - 1), WRITE_RETRY_MAX_MS) / 1000
 
 
 def run_worker() -> None:
     _ensure_consumer_group()
+    # Covers deploys: the first visitors after a restart find the front pages warm.
+    warmer.refresh()
     last_feed_bump = time.monotonic()
-    LOGGER.info("Write queue worker started")
+    failures = 0
+    LOGGER.info("Write queue worker started for partitions %s of %d", WRITE_WORKER_PARTITIONS, WRITE_STREAM_PARTITIONS)
     while True:
         if time.monotonic() - last_feed_bump >= FEED_REFRESH_SECONDS:
-            redis_incr("feed:version")
+            warmer.refresh()
             last_feed_bump = time.monotonic()
 
-        response = redis_client.xreadgroup(
-            WRITE_STREAM_GROUP,
-            WRITE_STREAM_CONSUMER,
-            {WRITE_STREAM_KEY: ">"},
-            count=WRITE_BATCH_SIZE,
-            block=WRITE_BLOCK_MS,
-        )
-        if not response:
-            continue
-
-        message_ids = []
-        events = []
-        for _, messages in response:
-            for message_id, fields in messages:
-                message_ids.append(message_id)
-                events.append(fields | {"id": message_id})
-
-        if _process_events(events):
-            redis_client.xack(WRITE_STREAM_KEY, WRITE_STREAM_GROUP, *message_ids)
+        _, applied = _consume_batch()
+        failures = 0 if applied else failures + 1
+        if failures:
+            # Replays do not block, so wait before trying Postgres again.
+            time.sleep(_retry_delay_seconds(failures))
+        warmer.check()
+        stats.report()
 
 
 if __name__ == "__main__":
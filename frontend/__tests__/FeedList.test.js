@@ -12,7 +12,6 @@ jest.mock('../lib/api', () => ({
   postsAPI: {
     getPosts: jest.fn(),
     vote: jest.fn(),
-    getVotesBulk: jest.fn(),
     unvote: jest.fn(),
   },
 }));
@@ -51,10 +50,10 @@ describe('FeedList', () => {
           user_id: 1,
           username: 'alice',
           created_at: '2024-01-01T00:00:00Z',
+          vote_type: 0,
         },
       ],
     });
-    postsAPI.getVotesBulk.mockResolvedValue({ data: [{ post_id: 1, vote_type: 0 }] });
   });
 
   it('renders posts after loading', async () => {
@@ -94,6 +93,24 @@ describe('FeedList', () => {
     );
   });
 
+  it('asks for embedded vote state only when logged in', async () => {
+    postsAPI.getPosts.mockClear();
+    Cookies.get.mockReturnValue('token');
+    const { unmount } = render(<FeedList />);
+
+    await waitFor(() => expect(postsAPI.getPosts).toHaveBeenCalled());
+    expect(postsAPI.getPosts).toHaveBeenLastCalledWith(
+      expect.objectContaining({ include_votes: true }),
+    );
+    unmount();
+
+    Cookies.get.mockReturnValue(undefined);
+    render(<FeedList />);
+
+    await waitFor(() => expect(postsAPI.getPosts).toHaveBeenCalledTimes(2));
+    expect(postsAPI.getPosts.mock.calls[1][0]).not.toHaveProperty('include_votes');
+  });
+
   it('includes sort param in More link when non-default', async () => {
     Cookies.get.mockReturnValue('token');
     searchParamsValue = 'sort=past';
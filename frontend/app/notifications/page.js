@@ -39,6 +39,16 @@ export default function Notifications() {
     }
   };
 
+  const markAllAsRead = async () => {
+    const upToId = Math.max(...notifications.map((n) => n.id));
+    try {
+      await notificationsAPI.markManyAsRead({ up_to_id: upToId });
+      setNotifications(notifications.map((n) => ({ ...n, read: true })));
+    } catch (error) {
+      setError(getErrorMessage(error, 'Failed to mark notifications as read.'));
+    }
+  };
+
   if (loading) {
     return <div className="hn-loading">Loading...</div>;
   }
@@ -51,7 +61,17 @@ export default function Notifications() {
     <table border="0" cellPadding="0" cellSpacing="0">
       <tbody>
         <tr>
-          <td className="title pb-2.5">Notifications</td>
+          <td className="title pb-2.5">
+            Notifications
+            {notifications.some((n) => !n.read) && (
+              <button
+                onClick={markAllAsRead}
+                className="ml-2 text-[#ff6600] no-underline text-[8pt]"
+              >
+                [mark all as read]
+              </button>
+            )}
+          </td>
         </tr>
         <tr>
           <td>
@@ -4,25 +4,29 @@ import { useState, useEffect } from 'react';
 import { useParams, useRouter, useSearchParams } from 'next/navigation';
 import Cookies from 'js-cookie';
 import CommentItem from '../../../components/CommentItem';
-import { postsAPI, commentsAPI, authAPI } from '../../../lib/api';
+import { postsAPI, commentsAPI, authAPI, itemsAPI } from '../../../lib/api';
 import { pointsLabel, safeHostname, timeAgo } from '../../../lib/format';
 import { getErrorMessage } from '../../../lib/errors';
 import InlineError from '../../../components/InlineError';
 
-const collectCommentIds = (commentList) => {
-  const ids = [];
-  const stack = [...commentList];
-  while (stack.length) {
-    const current = stack.pop();
-    if (!current) continue;
-    ids.push(current.id);
-    if (current.replies && current.replies.length) {
-      stack.push(...current.replies);
-    }
-  }
-  return ids;
+const commentVoteMap = (viewer) => {
+  if (!viewer) return {};
+  return viewer.comment_votes.reduce((accumulator, vote) => {
+    accumulator[vote.comment_id] = vote.vote_type;
+    return accumulator;
+  }, {});
 };
 
+const withCommentPoints = (comments, commentId, points) => comments.map((comment) => {
+  if (comment.id === commentId) {
+    return { ...comment, points };
+  }
+  if (!comment.replies) {
+    return comment;
+  }
+  return { ...comment, replies: withCommentPoints(comment.replies, commentId, points) };
+});
+
 export default function PostDetail() {
   const { id } = useParams();
   const router = useRouter();
@@ -56,10 +60,28 @@ export default function PostDetail() {
 
   useEffect(() => {
     if (id) {
-      // Fetch post and comments when the route param is available.
-      fetchPost();
-      fetchComments();
+      // Fetch the post, its thread and our votes in one request.
+      fetchItem();
+    }
+  }, [id]);
+
+  useEffect(() => {
+    if (!id || typeof window === 'undefined' || !window.EventSource) {
+      return undefined;
     }
+    // Points are merged in place; new and deleted comments reload the thread.
+    const stream = commentsAPI.openStream(id);
+    stream.addEventListener('post.points', (event) => {
+      const { points } = JSON.parse(event.data);
+      setPost((current) => (current ? { ...current, points } : current));
+    });
+    stream.addEventListener('comment.points', (event) => {
+      const { comment_id: commentId, points } = JSON.parse(event.data);
+      setComments((current) => withCommentPoints(current, commentId, points));
+    });
+    stream.addEventListener('comment.created', () => fetchComments());
+    stream.addEventListener('comment.deleted', () => fetchComments());
+    return () => stream.close();
   }, [id]);
 
   useEffect(() => {
@@ -70,46 +92,27 @@ export default function PostDetail() {
     }
   }, [comments, focusedCommentId]);
 
-  useEffect(() => {
-    if (!isLoggedIn) {
-      setCommentVotes({});
-      return;
-    }
-    const ids = collectCommentIds(comments);
-    if (ids.length === 0) {
-      setCommentVotes({});
-      return;
-    }
-    const fetchCommentVotes = async () => {
-      try {
-        const response = await commentsAPI.getVotesBulk(ids);
-        const voteMap = response.data.reduce((accumulator, vote) => {
-          accumulator[vote.comment_id] = vote.vote_type;
-          return accumulator;
-        }, {});
-        setCommentVotes(voteMap);
-      } catch (error) {
-        setCommentVotes({});
-      }
-    };
-    fetchCommentVotes();
-  }, [comments, isLoggedIn]);
+  const applyViewer = (viewer) => {
+    setUserVote(viewer ? viewer.post_vote : 0);
+    setCommentVotes(commentVoteMap(viewer));
+  };
 
-  useEffect(() => {
-    if (!id || !isLoggedIn) {
-      setUserVote(0);
-      return;
+  const fetchItem = async () => {
+    try {
+      setPostError('');
+      setCommentsError('');
+      const response = await itemsAPI.getItem(id);
+      setPost(response.data.post);
+      setComments(response.data.comments);
+      applyViewer(response.data.viewer);
+    } catch (error) {
+      setPost(null);
+      setComments([]);
+      setPostError(getErrorMessage(error, 'Failed to fetch post.'));
+    } finally {
+      setLoading(false);
     }
-    const fetchVote = async () => {
-      try {
-        const response = await postsAPI.getVote(id);
-        setUserVote(response.data.vote_type);
-      } catch (error) {
-        // Ignore vote lookup failures.
-      }
-    };
-    fetchVote();
-  }, [id, isLoggedIn]);
+  };
 
   const fetchPost = async () => {
     try {
@@ -125,13 +128,12 @@ export default function PostDetail() {
   const fetchComments = async () => {
     try {
       setCommentsError('');
-      const response = await commentsAPI.getComments(id);
-      setComments(response.data);
+      const response = await itemsAPI.getItem(id);
+      setComments(response.data.comments);
+      applyViewer(response.data.viewer);
     } catch (error) {
       setComments([]);
       setCommentsError(getErrorMessage(error, 'Failed to fetch comments.'));
-    } finally {
-      setLoading(false);
     }
   };
 
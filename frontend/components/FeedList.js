@@ -70,23 +70,6 @@ export default function FeedList({ defaultSort = 'new', postType = null }) {
     setIsLoggedIn(!!authStatus);
   }, []);
 
-  useEffect(() => {
-    if (!isLoggedIn || posts.length === 0) {
-      setUserVotes({});
-      return;
-    }
-    const fetchVotes = async () => {
-      try {
-        const response = await postsAPI.getVotesBulk(posts.map((post) => post.id));
-        const entries = response.data.map(({ post_id, vote_type }) => [post_id, vote_type]);
-        setUserVotes(Object.fromEntries(entries));
-      } catch (error) {
-        // Ignore vote lookup failures to keep the feed usable.
-      }
-    };
-    fetchVotes();
-  }, [isLoggedIn, posts]);
-
   const fetchPosts = async () => {
     try {
       setLoading(true);
@@ -98,8 +81,16 @@ export default function FeedList({ defaultSort = 'new', postType = null }) {
       if (postType) {
         params.post_type = postType;
       }
+      if (Cookies.get('auth_status')) {
+        // The API merges our vote state into the shared feed page.
+        params.include_votes = true;
+      }
       const response = await postsAPI.getPosts(params);
       setPosts(response.data);
+      const entries = response.data
+        .filter((post) => post.vote_type !== null && post.vote_type !== undefined)
+        .map((post) => [post.id, post.vote_type]);
+      setUserVotes(Object.fromEntries(entries));
     } catch (error) {
       setError(getErrorMessage(error, 'Failed to fetch posts.'));
     } finally {
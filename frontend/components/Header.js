@@ -25,6 +25,18 @@ export default function Header() {
     }
   }, [pathname]);
 
+  useEffect(() => {
+    if (!isLoggedIn || typeof window === 'undefined' || !window.EventSource) {
+      return undefined;
+    }
+    // Pushed deltas keep the badge current without re-polling the count.
+    const stream = notificationsAPI.openStream();
+    stream.addEventListener('notification.created', () => {
+      setUnreadCount((count) => count + 1);
+    });
+    return () => stream.close();
+  }, [isLoggedIn]);
+
   const maybeFetchUnreadCount = async () => {
     const now = Date.now();
     if (now - lastUnreadFetchRef.current < UNREAD_FETCH_TTL_MS) {
@@ -57,6 +57,7 @@ export const postsAPI = {
 
 export const commentsAPI = {
   getComments: (postId) => api.get(`/posts/${postId}/comments`),
+  openStream: (postId) => new EventSource(`${API_BASE_URL}/posts/${postId}/comments/stream`, { withCredentials: true }),
   getComment: (commentId) => api.get(`/comments/${commentId}`),
   createComment: (postId, commentData) => api.post(`/posts/${postId}/comments`, commentData),
   updateComment: (commentId, commentData) => api.put(`/comments/${commentId}`, commentData),
@@ -68,10 +69,16 @@ export const commentsAPI = {
   unvote: (commentId) => api.delete(`/comments/${commentId}/vote`),
 };
 
+export const itemsAPI = {
+  getItem: (postId) => api.get(`/items/${postId}`),
+};
+
 export const notificationsAPI = {
   getNotifications: (params) => api.get('/notifications/', { params }),
   markAsRead: (id) => api.put(`/notifications/${id}/read`),
+  markManyAsRead: (payload) => api.put('/notifications/read', payload),
   getUnreadCount: () => api.get('/notifications/unread/count'),
+  openStream: () => new EventSource(`${API_BASE_URL}/notifications/stream`, { withCredentials: true }),
 };
 
 export default api;